@@ -17,24 +17,27 @@ AJUSTE (LOCAL):
 
 Importante:
 - Essa abordagem evita webdriver DURANTE o login, reduzindo chance de CAPTCHA.
+
+Os endpoints só agendam os jobs (services.job_runner); a sequência em si
+está em services/coleta_unificada.py.
 """
 
 from __future__ import annotations
 
 import logging
 import os
+from typing import List, Optional
 
 from fastapi import APIRouter, BackgroundTasks, HTTPException
 from pydantic import BaseModel
 
-from backend.app.services.pgc_service import coleta_pgc
-from backend.app.services.pncp_service import coleta_pncp
-from backend.app.rpa.chrome_attach import (
-    open_url_via_devtools,
-    start_manual_login_session_local,
-    wait_until_logged_in,
+from backend.app.services.job_runner import agendar, is_worker_mode
+from backend.app.services.coleta_pool import (
+    FONTES_VALIDAS,
+    abrir_sessoes,
+    montar_unidades,
 )
-from backend.app.rpa.driver_factory import create_attached_driver
+from backend.app.rpa.chrome_attach import ManualLoginSession, start_manual_login_session_local
 
 logger = logging.getLogger(__name__)
 
@@ -45,97 +48,10 @@ class ColetaRequest(BaseModel):
     ano_ref: int
 
 
-def executar_coletas_sequenciais(
-    ano_ref: int,
-    preopened_session: ManualLoginSession | None = None,
-) -> None:
-    """
-    Fluxo "attach pós-login" (docker_attach ou local_attach):
-    - Um Chrome é iniciado SEM WebDriver.
-    - Usuário faz login manualmente.
-    - Backend detecta pós-login via DevTools (/json).
-    - Só então anexa Selenium e executa PGC -> PNCP reaproveitando o driver.
-    """
-    ano_str = str(ano_ref)
-
-    driver = None
-    try:
-        login_mode = os.getenv("LOGIN_MODE", "local_attach").lower().strip()
-        start_url = os.getenv("PGC_URL", "https://www.comprasnet.gov.br/seguro/loginPortalUASG.asp")
-
-        host: str
-        port: int
-
-        if login_mode == "docker_attach":
-            # Chrome no container (via docker-compose) com DevTools exposto
-            host = os.getenv("CHROME_DEBUG_HOST", "chrome-login")
-            port = int(os.getenv("CHROME_DEBUG_PORT", "9222"))
-
-            # (Opcional) manda abrir a URL de login na instância do Chrome do container
-            open_url_via_devtools(host, port, start_url)
-
-            logger.info(
-                "LOGIN_MODE=docker_attach ativo. Aguardando login manual via noVNC "
-                "antes de anexar o Selenium..."
-            )
-
-        elif login_mode == "local_attach":
-            # Chrome LOCAL (Windows) sem Selenium até terminar login
-            session = preopened_session or start_manual_login_session_local(start_url=start_url)
-            host = "127.0.0.1"
-            port = int(session.port)
-
-            logger.info(
-                "LOGIN_MODE=local_attach ativo. Um Chrome LOCAL foi aberto. "
-                "Faça o login manualmente nessa janela e mantenha-a aberta "
-                "para o Selenium anexar depois."
-            )
-
-        else:
-            raise RuntimeError(
-                f"LOGIN_MODE inválido: {login_mode}. "
-                "Use 'docker_attach' (Opção 1) ou 'local_attach' (modo local)."
-            )
-
-        # Aguarda login manual detectando mudança de URL em /json (VBA-like)
-        wait_until_logged_in(
-            host=host,
-            port=port,
-            timeout_s=int(os.getenv("LOGIN_TIMEOUT_S", "600")),
-        )
-
-        # Após login: Selenium "assume"
-        debugger_address = f"{host}:{port}"
-        driver = create_attached_driver(debugger_address=debugger_address)
-
-        # Coleta PGC
-        logger.info(f"Iniciando sequência de coleta para o ano {ano_ref}")
-        logger.info("Passo 1/2: Iniciando coleta PGC...")
-        coleta_pgc(ano_str, driver=driver, close_driver=False)
-        logger.info("Passo 1/2: Coleta PGC finalizada com sucesso.")
-
-        # Coleta PNCP reaproveitando driver
-        logger.info("Passo 2/2: Iniciando coleta PNCP...")
-        coleta_pncp(
-            username="",
-            password="",
-            ano_ref=ano_str,
-            driver=driver,
-            close_driver=False,
-            reuse_driver=True,
-        )
-        logger.info("Passo 2/2: Coleta PNCP finalizada com sucesso.")
-        logger.info(f"Sequência de coleta para o ano {ano_ref} concluída.")
-
-    except Exception as e:
-        logger.error(f"Erro durante a sequência de coleta: {e}", exc_info=True)
-
-    finally:
-        if driver is not None:
-            try:
-                driver.quit()
-            except Exception:
-                pass
+class ColetaLoteRequest(BaseModel):
+    anos: List[int]
+    fontes: List[str] = list(FONTES_VALIDAS)
+    sessoes: Optional[int] = None
 
 
 @router.post("/iniciar")
@@ -161,6 +77,14 @@ async def iniciar_coleta_unificada(request: ColetaRequest, background_tasks: Bac
             if vnc_url:
                 msg += f" noVNC: {vnc_url}"
 
+        elif login_mode == "local_attach" and is_worker_mode():
+            # O Chrome é aberto pelo worker, na máquina onde ele roda
+            msg = (
+                "Sequência de coleta (PGC -> PNCP) enfileirada em modo local_attach. "
+                "Quando o worker assumir o job, um Chrome LOCAL será aberto na máquina do worker: "
+                "faça o login manualmente e mantenha a janela aberta."
+            )
+
         elif login_mode == "local_attach":
             start_url = os.getenv("PGC_URL", "https://www.comprasnet.gov.br/seguro/loginPortalUASG.asp")
             preopened_session = start_manual_login_session_local(start_url=start_url)
@@ -178,9 +102,72 @@ async def iniciar_coleta_unificada(request: ColetaRequest, background_tasks: Bac
                 "Ajuste para 'docker_attach' ou 'local_attach'."
             )
 
-        background_tasks.add_task(executar_coletas_sequenciais, request.ano_ref, preopened_session)
-        return {"status": "started", "ano_ref": request.ano_ref, "message": msg}
+        job_id = agendar(
+            background_tasks,
+            "coleta_unificada",
+            {"ano_ref": request.ano_ref, "login_mode": login_mode},
+            preopened_session=preopened_session,
+        )
+        return {"status": "started", "job_id": job_id, "ano_ref": request.ano_ref, "message": msg}
 
     except Exception as e:
         logger.error(f"Erro ao iniciar coleta unificada: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/iniciar-lote")
+async def iniciar_coleta_lote(request: ColetaLoteRequest, background_tasks: BackgroundTasks):
+    """
+    Dispara vários anos/fontes em paralelo, um Chrome logado por sessão.
+
+    O número de sessões vem do corpo ou de COLETA_POOL_SIZE (padrão 2),
+    limitado ao número de unidades. Cada janela/noVNC precisa de login manual
+    (a UASG coletada é a do login de cada sessão).
+    """
+    try:
+        unidades = montar_unidades(request.anos, request.fontes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not unidades:
+        raise HTTPException(status_code=400, detail="Informe ao menos um ano.")
+
+    try:
+        n = request.sessoes or int(os.getenv("COLETA_POOL_SIZE", "2"))
+        n = max(1, min(n, len(unidades)))
+        params = {"anos": request.anos, "fontes": sorted({u.fonte for u in unidades}), "sessoes": n}
+
+        if is_worker_mode():
+            # Sessões Chrome abertas pelo worker ao assumir o job
+            job_id = agendar(background_tasks, "coleta_lote", params)
+            return {
+                "status": "started",
+                "job_id": job_id,
+                "unidades": [{"ano_ref": u.ano_ref, "fonte": u.fonte} for u in unidades],
+                "message": (
+                    f"Coleta em lote enfileirada ({n} sessão(ões) Chrome). Quando o worker "
+                    "assumir o job, faça o login MANUALMENTE em cada janela aberta."
+                ),
+            }
+
+        start_url = os.getenv("PGC_URL", "https://www.comprasnet.gov.br/seguro/loginPortalUASG.asp")
+        sessoes = abrir_sessoes(n, start_url)
+        if not sessoes:
+            raise RuntimeError("Nenhuma sessão Chrome disponível para o lote.")
+
+        params["sessoes"] = len(sessoes)
+        job_id = agendar(background_tasks, "coleta_lote", params, sessoes=sessoes)
+        return {
+            "status": "started",
+            "job_id": job_id,
+            "unidades": [{"ano_ref": u.ano_ref, "fonte": u.fonte} for u in unidades],
+            "sessoes": [f"{h}:{p}" for h, p in sessoes],
+            "message": (
+                f"Coleta em lote iniciada em {len(sessoes)} sessão(ões) Chrome. "
+                "Faça o login MANUALMENTE em cada janela; cada sessão começa a coletar "
+                "assim que o pós-login for detectado."
+            ),
+        }
+
+    except Exception as e:
+        logger.error(f"Erro ao iniciar coleta em lote: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
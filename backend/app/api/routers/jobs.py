@@ -0,0 +1,82 @@
+"""
+Arquivo: jobs.py
+Router de consulta dos jobs de coleta (estado, progresso e resultados).
+"""
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from backend.app.services.jobs import get_jobs_repository
+from backend.app.services.job_events import stream_job
+from backend.app.services.job_runner import is_worker_mode
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+@router.get("")
+async def listar_jobs(
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    """Jobs mais recentes primeiro."""
+    jobs = get_jobs_repository().listar(limit=limit, offset=offset)
+    return {"limit": limit, "offset": offset, "jobs": jobs}
+
+
+@router.get("/{job_id}")
+async def obter_job(job_id: str):
+    """Estado, progresso por etapa (aba/página/itens/s), resumo e erro do job."""
+    job = get_jobs_repository().obter(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} não encontrado.")
+    return job
+
+
+@router.get("/{job_id}/resultados")
+async def listar_resultados(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    fonte: Optional[str] = Query(None, description="PGC ou PNCP"),
+):
+    """Itens coletados pelo job, paginados na ordem de coleta."""
+    repo = get_jobs_repository()
+    job = repo.obter(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} não encontrado.")
+    itens = repo.listar_resultados(job_id, offset=offset, limit=limit, fonte=fonte.upper() if fonte else None)
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "total": job["total_resultados"],
+        "offset": offset,
+        "limit": limit,
+        "itens": itens,
+    }
+
+
+@router.get("/{job_id}/stream")
+async def stream(
+    job_id: str,
+    formato: str = Query("sse", pattern="^(sse|ndjson)$"),
+):
+    """
+    Stream dos itens validados e do progresso à medida que são produzidos.
+
+    formato=sse (text/event-stream; eventos item/progresso/aviso/fim) ou
+    formato=ndjson (um JSON por linha). Jobs de outro processo ou já
+    finalizados são servidos a partir do registro.
+    """
+    repo = get_jobs_repository()
+    if repo.obter(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} não encontrado.")
+    media_type = "text/event-stream" if formato == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_job(repo, job_id, formato, ao_vivo=not is_worker_mode()),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,19 @@
+"""
+metrics.py
+Endpoint de scrape do Prometheus (ver core/metrics.py).
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse, Response
+
+from backend.app.core import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def exportar_metricas():
+    conteudo = metrics.exportar()
+    if conteudo is None:
+        return PlainTextResponse("Métricas desabilitadas (prometheus_client ausente ou METRICS_ENABLED=false).\n",
+                                 status_code=503)
+    return Response(content=conteudo, headers={"Content-Type": metrics.CONTENT_TYPE_LATEST})
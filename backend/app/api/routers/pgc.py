@@ -6,7 +6,7 @@ Router para PGC scraping.
 from fastapi import APIRouter, BackgroundTasks, HTTPException
 from pydantic import BaseModel
 from backend.app.config import settings
-from backend.app.services.pgc_service import coleta_pgc
+from backend.app.services.job_runner import agendar
 
 router = APIRouter(prefix="/api/pgc", tags=["pgc"])
 
@@ -16,14 +16,12 @@ class PGCRequest(BaseModel):
 @router.post("/iniciar")
 async def iniciar_coleta_pgc(request: PGCRequest, background_tasks: BackgroundTasks):
     try:
-        # Executa em background
-        background_tasks.add_task(
-            coleta_pgc,
-            str(request.ano_ref)
-        )
+        # Executa em background (ou enfileira para o worker)
+        job_id = agendar(background_tasks, "pgc", {"ano_ref": request.ano_ref})
 
         return {
             "status": "started",
+            "job_id": job_id,
             "ano_ref": request.ano_ref,
             "message": "Abra o VNC em http://localhost:7900 para fazer login manual"
         }
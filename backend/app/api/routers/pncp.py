@@ -6,7 +6,7 @@ Implementação do Passo 16: Suporte a Feature Flags na rota da API.
 from fastapi import APIRouter, BackgroundTasks, HTTPException
 from pydantic import BaseModel
 from typing import Optional
-from backend.app.services.pncp_service import coleta_pncp
+from backend.app.services.job_runner import agendar
 from backend.app.rpa.config_vba import is_pncp_real_enabled
 import logging
 
@@ -27,16 +27,12 @@ async def iniciar_coleta(request: PNCPRequest, background_tasks: BackgroundTasks
     try:
         logger.info(f"Recebida requisição PNCP Real para o ano {request.ano_ref}")
         
-        # Executa em background
-        background_tasks.add_task(
-            coleta_pncp,
-            "", # username (login manual)
-            "", # password (login manual)
-            str(request.ano_ref)
-        )
+        # Executa em background (ou enfileira para o worker)
+        job_id = agendar(background_tasks, "pncp", {"ano_ref": request.ano_ref})
         
         return {
             "status": "started",
+            "job_id": job_id,
             "ano_ref": request.ano_ref,
             "modo_execucao": "REAL",
             "message": f"Coleta PNCP REAL iniciada para o ano {request.ano_ref}. Acompanhe pelo VNC em http://localhost:7900"
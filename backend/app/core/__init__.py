@@ -6,19 +6,22 @@ Descrição: Este arquivo faz parte do projeto e foi comentado para explicar a f
 # backend/app/core/__init__.py
 """
 Módulo core - componentes fundamentais do sistema.
-"""
-from backend.app.core.base_scraper import (
-    BasePortalScraper,
-    ScraperError,
-    LoginFailedError,
-    ElementNotFoundError,
-    PaginationError
-)
 
+base_scraper é carregado sob demanda: ele importa rpa.driver_factory, e os
+módulos de rpa importam core.metrics/core.job_context. Importar o scraper
+base aqui criaria o ciclo core -> rpa -> core ao importar o rpa primeiro.
+"""
 __all__ = [
     "BasePortalScraper",
     "ScraperError",
     "LoginFailedError",
     "ElementNotFoundError",
     "PaginationError",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(nome):
+    if nome in __all__:
+        from backend.app.core import base_scraper
+        return getattr(base_scraper, nome)
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
@@ -0,0 +1,45 @@
+"""
+auditoria.py
+Auditoria por item ([AUDITORIA-ITEM]) em blocos, fora do caminho quente.
+
+auditar_itens() recebe os itens de um bloco de extração (ou de uma rodada
+de rolagem) de uma vez:
+- log principal: uma linha de resumo por bloco e o detalhe de 1 a cada
+  AUDIT_LOG_SAMPLE itens (padrão 100; 1 = todos, como no VBA; 0 = só o resumo);
+- trilha completa: um único registro com o bloco inteiro no logger
+  "auditoria.itens", que logging_config grava em AUDIT_LOG_FILE (uma linha
+  JSON por item). Com LOG_ASYNC a serialização fica no thread do listener.
+"""
+import logging
+import os
+from typing import Any, Sequence, Tuple
+
+from .logging_config import TRILHA_LOGGER
+
+logger = logging.getLogger(__name__)
+
+AUDIT_LOG_SAMPLE = max(0, int(os.getenv("AUDIT_LOG_SAMPLE", "100")))
+
+_trilha = logging.getLogger(TRILHA_LOGGER)
+# Sem setup_logging (scripts, benchmarks) a trilha não vai parar no console
+_trilha.propagate = False
+
+
+def auditar_itens(fonte: str, aba: str, itens: Sequence[Tuple[int, Any, Any]], total: int) -> None:
+    """`itens`: (posição, identificador, status) de cada item do bloco."""
+    if not itens:
+        return
+    if _trilha.handlers:
+        _trilha.info("itens", extra={"fonte": fonte, "aba": aba, "total": total, "itens": tuple(itens)})
+
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    if AUDIT_LOG_SAMPLE:
+        for i, id_item, status in itens:
+            if i % AUDIT_LOG_SAMPLE == 0:
+                logger.info("[AUDITORIA-ITEM] %s/%s | ID: %s | Status: %s", i, total, id_item, status)
+    logger.info(
+        "[AUDITORIA-ITEM] %s %s: itens %s-%s/%s (%s no bloco)",
+        fonte, aba.upper(), itens[0][0], itens[-1][0], total, len(itens),
+        extra={"fonte": fonte, "aba": aba, "de": itens[0][0], "ate": itens[-1][0], "total": total},
+    )
@@ -0,0 +1,163 @@
+"""
+job_context.py
+Job "corrente" (ContextVar) e os ganchos chamados pelos scrapers durante a coleta.
+
+Fica em core e não importa services: os scrapers (rpa) importam
+publicar_item()/reportar_progresso() daqui sem passar por services/__init__
+(que importa os services, que importam os scrapers). services.jobs cria o
+JobContexto em executar_job e reaproveita estes ganchos.
+
+Itens publicados vão para o registro do job (job_resultados) em lotes, à
+medida que chegam (no máximo 1x/s ou a cada RESULTS_FLUSH_ITEMS): o stream
+de GET /api/jobs/{id}/stream lê dali quando o job roda em outro processo.
+Cada item entra uma vez por chave de negócio (diff_coletas.chave_item),
+qualquer que seja o thread que o publicou: abas PNCP em janelas paralelas
+publicam de threads próprios e uma aba refeita na janela principal publica
+de novo os itens que já tinham chegado.
+
+Sem job corrente (CLI, scripts) os ganchos não registram nada; os itens
+continuam indo para a gravação bruta NDJSON em curso (ndjson_store).
+"""
+import contextvars
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from ..db import ndjson_store
+from ..db.diff_coletas import chave_item
+
+logger = logging.getLogger(__name__)
+
+# Intervalo mínimo entre gravações de progresso da mesma etapa (e de itens)
+PROGRESS_MIN_INTERVAL_S = 1.0
+# Itens pendentes que forçam a gravação antes do intervalo
+RESULTS_FLUSH_ITEMS = 500
+
+_job_atual: contextvars.ContextVar[Optional["JobContexto"]] = contextvars.ContextVar("job_atual", default=None)
+
+
+class JobContexto:
+    """
+    Estado do job em execução. `repo` é o JobsRepository e `publicar` entrega
+    um evento ao stream ao vivo (services.job_events.publicar).
+    """
+
+    def __init__(self, job_id: str, repo: Any, publicar: Callable[[str, Dict[str, Any]], None]):
+        self.job_id = job_id
+        self.repo = repo
+        self.publicar = publicar
+        self.progresso: Dict[str, Any] = {}
+        self.inicio_etapa = time.time()
+        self.ultima_gravacao = 0.0
+        # Itens publicados ainda não gravados; por fonte, as chaves que já
+        # estão no registro e quantos itens sem chave foram publicados e ainda
+        # não conferidos por registrar_resultados
+        self.pendentes: List[Tuple[str, Dict[str, Any]]] = []
+        self.publicados: Dict[str, Set[str]] = {}
+        self.sem_chave: Dict[str, int] = {}
+        self.ultima_descarga = 0.0
+        self.lock = threading.Lock()
+
+
+def nome_processo() -> str:
+    """Identifica o processo que executa o job: "<host>-<pid>" (coluna worker)."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def job_atual() -> Optional[JobContexto]:
+    return _job_atual.get()
+
+
+def job_atual_id() -> Optional[str]:
+    ctx = _job_atual.get()
+    return ctx.job_id if ctx else None
+
+
+def ativar(ctx: JobContexto) -> contextvars.Token:
+    return _job_atual.set(ctx)
+
+
+def desativar(token: contextvars.Token) -> None:
+    _job_atual.reset(token)
+
+
+def reportar_progresso(etapa: Optional[str] = None, **campos: Any) -> None:
+    """
+    Atualiza o progresso do job corrente, ex.:
+        reportar_progresso("PNCP", aba="aprovadas", itens=120)
+        reportar_progresso("PGC", pagina=3, paginas=10, itens=300)
+
+    `itens` é cumulativo dentro da etapa; itens_por_s é derivado dele.
+    Troca de etapa grava na hora; dentro da etapa, no máximo 1x/s.
+    """
+    ctx = _job_atual.get()
+    if ctx is None:
+        return
+    try:
+        with ctx.lock:
+            mudou_etapa = etapa is not None and etapa != ctx.progresso.get("etapa")
+            if mudou_etapa:
+                ctx.progresso = {"etapa": etapa}
+                ctx.inicio_etapa = time.time()
+            ctx.progresso.update(campos)
+            if "itens" in campos:
+                decorrido = max(time.time() - ctx.inicio_etapa, 1e-6)
+                ctx.progresso["itens_por_s"] = round(float(campos["itens"]) / decorrido, 2)
+            gravar_progresso(ctx, forcar=mudou_etapa)
+            evento = {"evento": "progresso", **ctx.progresso}
+        ctx.publicar(ctx.job_id, evento)
+    except Exception as e:
+        # Progresso nunca derruba a coleta
+        logger.debug(f"[JOB] Falha ao gravar progresso: {e}")
+
+
+def publicar_item(fonte: str, item: Dict[str, Any]) -> None:
+    """
+    Chamado a cada item validado assim que é coletado: anexa ao NDJSON da
+    gravação bruta em curso e envia ao stream do job corrente.
+    """
+    ndjson_store.anexar_item(fonte, item)
+    ctx = _job_atual.get()
+    if ctx is None:
+        return
+    chave = chave_item(fonte, item)
+    try:
+        with ctx.lock:
+            chaves = ctx.publicados.setdefault(fonte, set())
+            if chave is None:
+                ctx.sem_chave[fonte] = ctx.sem_chave.get(fonte, 0) + 1
+            elif chave in chaves:
+                # Item recoletado (ex.: aba refeita na janela principal)
+                return
+            else:
+                chaves.add(chave)
+            ctx.pendentes.append((fonte, item))
+            if (len(ctx.pendentes) >= RESULTS_FLUSH_ITEMS
+                    or time.time() - ctx.ultima_descarga >= PROGRESS_MIN_INTERVAL_S):
+                descarregar_resultados(ctx)
+    except Exception as e:
+        logger.debug(f"[JOB] Falha ao gravar itens: {e}")
+    ctx.publicar(ctx.job_id, {"evento": "item", "fonte": fonte, "item": item})
+
+
+def descarregar_resultados(ctx: JobContexto) -> None:
+    """Grava os itens pendentes no registro do job (chamar com ctx.lock)."""
+    ctx.ultima_descarga = time.time()
+    pendentes, ctx.pendentes = ctx.pendentes, []
+    inicio = 0
+    for i in range(1, len(pendentes) + 1):
+        # Um adicionar_resultados por sequência de itens da mesma fonte
+        if i == len(pendentes) or pendentes[i][0] != pendentes[inicio][0]:
+            ctx.repo.adicionar_resultados(ctx.job_id, pendentes[inicio][0], [it for _, it in pendentes[inicio:i]])
+            inicio = i
+
+
+def gravar_progresso(ctx: JobContexto, forcar: bool = False) -> None:
+    agora = time.time()
+    if not forcar and agora - ctx.ultima_gravacao < PROGRESS_MIN_INTERVAL_S:
+        return
+    ctx.ultima_gravacao = agora
+    ctx.repo.atualizar_progresso(ctx.job_id, dict(ctx.progresso))
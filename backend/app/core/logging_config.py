@@ -1,20 +1,139 @@
 """
 Arquivo: logging_config.py
-Descrição: Este arquivo faz parte do projeto e foi comentado para explicar a função de cada bloco de código.
-"""
+Descrição: Configuração de logging da API e do worker.
 
-# Patched logging_config.py
-# - small enhancement: include process and thread id and ISO timestamp
+- LOG_LEVEL (settings/.env): nível do log principal.
+- LOG_FORMAT=text|json: texto (padrão, com processo:thread e timestamp ISO)
+  ou uma linha JSON por registro, com os campos passados em extra={...}.
+- LOG_ASYNC=true: os registros vão para uma fila (QueueHandler) e são
+  formatados/gravados por um QueueListener em outro thread; a coleta só
+  paga o enfileiramento.
+- AUDIT_LOG_FILE: trilha completa do [AUDITORIA-ITEM] (ver core/auditoria.py),
+  uma linha JSON compacta por item, fora do log principal. Vazio desativa.
+"""
+import atexit
+import copy
+import json
 import logging
-import time
+import logging.handlers
+import os
+import queue
+from typing import List, Optional
 
-def setup_logging():
+from backend.app.config import settings
+
+FORMATO_TEXTO = "%(asctime)s | %(levelname)s | %(process)d:%(thread)d | %(name)s | %(message)s"
+DATEFMT = "%Y-%m-%dT%H:%M:%S%z"
+
+# Logger da trilha de auditoria por item (não propaga para o log principal)
+TRILHA_LOGGER = "auditoria.itens"
+
+# Atributos do LogRecord; o que sobrar veio de extra={...}
+_ATRIBUTOS_PADRAO = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class FormatoJson(logging.Formatter):
+    """Uma linha JSON por registro (LOG_FORMAT=json)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        dados = {
+            "ts": self.formatTime(record, DATEFMT),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "processo": record.process,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        for chave, valor in vars(record).items():
+            if chave not in _ATRIBUTOS_PADRAO:
+                dados[chave] = valor
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            dados["exc"] = record.exc_text
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+class FormatoTrilha(logging.Formatter):
+    """Expande o bloco de auditoria.auditar_itens em uma linha JSON compacta por item."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        ts = self.formatTime(record, DATEFMT)
+        return "\n".join(
+            json.dumps(
+                {"ts": ts, "fonte": record.fonte, "aba": record.aba, "i": i, "total": record.total,
+                 "id": id_item, "status": status},
+                ensure_ascii=False, separators=(",", ":"), default=str,
+            )
+            for i, id_item, status in record.itens
+        )
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
     """
-    Função setup_logging:
-    Executa a lógica principal definida nesta função.
+    O prepare() padrão formata o registro inteiro no thread de quem loga;
+    aqui só a mensagem e a exceção são resolvidas (podem mudar depois) e o
+    formatter roda no thread do QueueListener.
     """
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s | %(levelname)s | %(process)d:%(thread)d | %(name)s | %(message)s",
-        datefmt="%Y-%m-%dT%H:%M:%S%z"
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _handler_trilha(caminho: str) -> logging.Handler:
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(
+        caminho, maxBytes=50 * 1024 * 1024, backupCount=5, encoding="utf-8", delay=True
     )
+    handler.setFormatter(FormatoTrilha())
+    handler.addFilter(logging.Filter(TRILHA_LOGGER))
+    return handler
+
+
+def setup_logging():
+    """
+    Configura o log principal e a trilha de auditoria. Como o basicConfig,
+    não faz nada se o root logger já tiver handlers.
+    """
+    global _listener
+    raiz = logging.getLogger()
+    if raiz.handlers:
+        return
+
+    if os.getenv("LOG_FORMAT", "text").lower() == "json":
+        formato: logging.Formatter = FormatoJson()
+    else:
+        formato = logging.Formatter(FORMATO_TEXTO, DATEFMT)
+    console = logging.StreamHandler()
+    console.setFormatter(formato)
+    console.addFilter(lambda record: not record.name.startswith(TRILHA_LOGGER))
+    handlers: List[logging.Handler] = [console]
+
+    trilha = logging.getLogger(TRILHA_LOGGER)
+    trilha.propagate = False
+    trilha.setLevel(logging.INFO)
+    caminho = os.getenv("AUDIT_LOG_FILE", os.path.join(os.getcwd(), "dados_locais_temp", "auditoria_itens.ndjson"))
+    if caminho:
+        handlers.append(_handler_trilha(caminho))
+
+    if os.getenv("LOG_ASYNC", "true").lower() in ("1", "true", "yes", "on"):
+        fila: queue.SimpleQueue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(fila, *handlers, respect_handler_level=True)
+        _listener.start()
+        # Esvazia a fila na saída do processo
+        atexit.register(_listener.stop)
+        handlers = [_QueueHandler(fila)]
+
+    raiz.setLevel(settings.LOG_LEVEL.upper())
+    for handler in handlers:
+        raiz.addHandler(handler)
+        if caminho:
+            trilha.addHandler(handler)
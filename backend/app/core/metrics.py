@@ -0,0 +1,129 @@
+"""
+metrics.py
+Métricas Prometheus da coleta, expostas em GET /metrics.
+
+Contadores e histogramas (prefixo coleta_):
+- itens_total{fonte,aba}: itens coletados (PGC usa aba="dfd");
+- paginas_total{fonte}: páginas de tabela percorridas (paginador do PGC);
+- rolagens_total{fonte,aba}: passos de rolagem da lista virtualizada do PNCP;
+- spinner_espera_segundos: cada VBACompat.testa_spinner;
+- webdriver_comando_segundos{comando}: cada driver.execute (driver_factory);
+- gravacao_segundos{destino}: Excel (por abertura/save), NDJSON e Parquet;
+- ocr_paginas_total / ocr_segundos: páginas/s = rate(paginas) / rate(segundos_sum);
+- job_duracao_segundos{tipo,status}: jobs executados pelo job_runner;
+- http_requisicao_segundos{metodo,rota,status}: middleware da API (rota = template).
+
+Depende de prometheus_client (requirements.txt). Com METRICS_ENABLED=false, ou
+num ambiente sem o pacote (avisado no log), as métricas são objetos nulos: as
+chamadas nos scrapers/services não custam nada e /metrics responde 503.
+
+Worker em outro processo (JOBS_USE_WORKER=true): defina PROMETHEUS_MULTIPROC_DIR
+(diretório vazio a cada partida) na API e nos workers; /metrics agrega os
+arquivos de todos os processos.
+"""
+import logging
+import os
+import time
+from typing import Optional, Tuple
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+    from prometheus_client import multiprocess
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_METRICS_PEDIDAS = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+METRICS_ENABLED = PROMETHEUS_AVAILABLE and _METRICS_PEDIDAS
+if _METRICS_PEDIDAS and not PROMETHEUS_AVAILABLE:
+    logger.warning("[AVISO] METRICS_ENABLED=true mas prometheus_client não está instalado; /metrics desabilitado.")
+
+# Esperas de spinner/rede e comandos WebDriver: de milissegundos a minutos
+_BUCKETS_ESPERA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+_BUCKETS_LONGOS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200)
+
+
+class _MetricaNula:
+    """Mesma interface usada das métricas do prometheus_client, sem efeito."""
+
+    def labels(self, *args, **kwargs) -> "_MetricaNula":
+        return self
+
+    def inc(self, valor: float = 1) -> None:
+        pass
+
+    def observe(self, valor: float) -> None:
+        pass
+
+    def time(self) -> "_MetricaNula":
+        return self
+
+    def __enter__(self) -> "_MetricaNula":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def __call__(self, func):
+        return func
+
+
+def _counter(nome: str, descricao: str, rotulos: Tuple[str, ...] = ()):
+    if not METRICS_ENABLED:
+        return _MetricaNula()
+    return Counter(nome, descricao, rotulos, namespace="coleta")
+
+
+def _histogram(nome: str, descricao: str, rotulos: Tuple[str, ...] = (), buckets: Optional[Tuple[float, ...]] = None):
+    if not METRICS_ENABLED:
+        return _MetricaNula()
+    if buckets is None:
+        return Histogram(nome, descricao, rotulos, namespace="coleta")
+    return Histogram(nome, descricao, rotulos, namespace="coleta", buckets=buckets)
+
+
+ITENS = _counter("itens", "Itens coletados por fonte/aba.", ("fonte", "aba"))
+PAGINAS = _counter("paginas", "Páginas de tabela percorridas (paginador).", ("fonte",))
+ROLAGENS = _counter("rolagens", "Passos de rolagem em listas virtualizadas.", ("fonte", "aba"))
+SPINNER = _histogram("spinner_espera_segundos", "Espera pelo spinner do portal (testa_spinner).",
+                     buckets=_BUCKETS_ESPERA)
+WEBDRIVER = _histogram("webdriver_comando_segundos", "Latência dos comandos WebDriver.", ("comando",),
+                       buckets=_BUCKETS_ESPERA)
+GRAVACAO = _histogram("gravacao_segundos", "Duração das gravações de resultado.", ("destino",))
+OCR_PAGINAS = _counter("ocr_paginas", "Páginas processadas pelo OCR.")
+OCR_SEGUNDOS = _histogram("ocr_segundos", "Duração do OCR por documento.")
+JOBS = _histogram("job_duracao_segundos", "Duração dos jobs de coleta.", ("tipo", "status"),
+                  buckets=_BUCKETS_LONGOS)
+HTTP = _histogram("http_requisicao_segundos", "Duração das requisições da API.", ("metodo", "rota", "status"))
+
+
+def instrumentar_driver(driver):
+    """Passa a medir driver.execute (idempotente). Retorna o driver."""
+    if not METRICS_ENABLED or getattr(driver, "_metricas_prometheus", False):
+        return driver
+    original = driver.execute
+
+    def execute(driver_command, params=None):
+        inicio = time.perf_counter()
+        try:
+            return original(driver_command, params)
+        finally:
+            WEBDRIVER.labels(comando=driver_command).observe(time.perf_counter() - inicio)
+
+    driver.execute = execute
+    driver._metricas_prometheus = True
+    return driver
+
+
+def exportar() -> Optional[bytes]:
+    """Texto no formato de exposição do Prometheus (None se desabilitado)."""
+    if not METRICS_ENABLED:
+        return None
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+        return generate_latest(registro)
+    return generate_latest()
@@ -0,0 +1,161 @@
+"""
+diff_coletas.py
+Detecção de mudanças entre coletas consecutivas da mesma fonte/ano.
+
+Cada item é identificado pela chave de negócio (PNCP: col_a_contratacao;
+PGC: DFD) e resumido num hash do conteúdo. O snapshot da coleta anterior
+(snapshot_{fonte}_{ano}.json em dados_locais_temp) guarda só chave -> hash,
+então a comparação com a coleta nova é O(n) e não relê o NDJSON antigo.
+
+O resultado (DiffColeta) traz os conjuntos inseridos / atualizados /
+removidos; os sinks aplicam apenas o delta:
+- Excel: nada é gravado se nada mudou; aba PNCP atualizada no lugar
+  (linhas alteradas/removidas) ou, com EXCEL_STREAMING_WRITE, reescrita em
+  streaming (mais barato que abrir o workbook); abas PGC e Geral só com os
+  DFDs alterados.
+- Postgres: só inseridos/atualizados vão para o staging.
+- NDJSON: já é gravado durante o scraping; o manifesto registra o resumo.
+
+O snapshot só avança (DiffColeta.confirmar) depois que NDJSON/Postgres e
+Excel gravaram o delta — na sessão do Excel, depois do save da sessão. Se um
+sink (ou uma aba do Excel) falhar, a coleta seguinte compara com a mesma base
+e regrava o delta.
+
+Habilitado com COLETA_DIFF=true. Sem snapshot anterior (ou removendo o
+arquivo) o diff é "completo" e todos os sinks recebem a coleta inteira.
+"""
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+from .ndjson_store import diretorio_padrao
+
+logger = logging.getLogger(__name__)
+
+
+def is_diff_enabled() -> bool:
+    return os.getenv("COLETA_DIFF", "false").lower() in ("1", "true", "yes", "on")
+
+
+def chave_item(fonte: str, item: Dict[str, Any]) -> Optional[str]:
+    """Chave de negócio do item (None se ausente)."""
+    if fonte == "PNCP":
+        valor = item.get("col_a_contratacao")
+    else:
+        valor = item.get("DFD", item.get("dfd"))
+    if valor is None:
+        return None
+    valor = str(valor).strip()
+    return valor or None
+
+
+def hash_item(item: Dict[str, Any]) -> str:
+    conteudo = json.dumps(item, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(conteudo.encode("utf-8")).hexdigest()
+
+
+def caminho_snapshot(diretorio: str, fonte: str, ano_ref: Optional[str]) -> str:
+    return os.path.join(diretorio, f"snapshot_{fonte}_{ano_ref or 'sem_ano'}.json")
+
+
+def ler_snapshot(diretorio: str, fonte: str, ano_ref: Optional[str]) -> Optional[Dict[str, str]]:
+    """Chave -> hash da última coleta confirmada (None se não houver)."""
+    try:
+        with open(caminho_snapshot(diretorio, fonte, ano_ref), "r", encoding="utf-8") as f:
+            return json.load(f)["itens"]
+    except FileNotFoundError:
+        return None
+    except (ValueError, KeyError) as e:
+        logger.warning(f"[AVISO] Snapshot de {fonte} ilegível ({e}); diff completo")
+        return None
+
+
+class DiffColeta:
+    """Delta de uma coleta em relação à anterior."""
+
+    def __init__(self, fonte: str, ano_ref: Optional[str], diretorio: str,
+                 anterior: Optional[Dict[str, str]], dados: List[Dict[str, Any]]):
+        self.fonte = fonte
+        self.ano_ref = ano_ref
+        self.diretorio = diretorio
+        # Sem coleta anterior não há base de comparação: tudo é inserção
+        self.completo = anterior is None
+        anterior = anterior or {}
+
+        self.inseridos: List[Dict[str, Any]] = []
+        self.sem_chave = 0
+        self.atualizados: List[Dict[str, Any]] = []
+        self.inalterados = 0
+        self._atuais: Dict[str, str] = {}
+        # A ocorrência mais recente de uma chave repetida prevalece
+        por_chave: Dict[str, Dict[str, Any]] = {}
+        for item in dados:
+            chave = chave_item(fonte, item)
+            if chave is None:
+                # Sem chave não há como casar com a coleta anterior
+                self.inseridos.append(item)
+                self.sem_chave += 1
+                continue
+            por_chave[chave] = item
+
+        for chave, item in por_chave.items():
+            h = hash_item(item)
+            self._atuais[chave] = h
+            antes = anterior.get(chave)
+            if antes is None:
+                self.inseridos.append(item)
+            elif antes != h:
+                self.atualizados.append(item)
+            else:
+                self.inalterados += 1
+        self.removidos: List[str] = [c for c in anterior if c not in self._atuais]
+
+    @property
+    def alterados(self) -> List[Dict[str, Any]]:
+        """Inseridos + atualizados (o que precisa ser gravado)."""
+        return self.inseridos + self.atualizados
+
+    @property
+    def vazio(self) -> bool:
+        return not (self.completo or self.inseridos or self.atualizados or self.removidos)
+
+    def chaves_alteradas(self) -> List[str]:
+        return [c for c in (chave_item(self.fonte, i) for i in self.alterados) if c is not None]
+
+    def resumo(self) -> Dict[str, Any]:
+        return {
+            "completo": self.completo,
+            "inseridos": len(self.inseridos),
+            "atualizados": len(self.atualizados),
+            "removidos": len(self.removidos),
+            "inalterados": self.inalterados,
+            "sem_chave": self.sem_chave,
+        }
+
+    def confirmar(self) -> None:
+        """Grava a coleta atual como snapshot (base do próximo diff)."""
+        os.makedirs(self.diretorio, exist_ok=True)
+        caminho = caminho_snapshot(self.diretorio, self.fonte, self.ano_ref)
+        tmp = f"{caminho}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"fonte": self.fonte, "ano_ref": self.ano_ref, "itens": self._atuais}, f,
+                      ensure_ascii=False)
+        os.replace(tmp, caminho)
+
+
+def calcular_diff(fonte: str, ano_ref: Optional[str], dados: List[Dict[str, Any]],
+                  diretorio: Optional[str] = None) -> DiffColeta:
+    """Compara `dados` com o snapshot da coleta anterior da fonte/ano."""
+    diretorio = diretorio or diretorio_padrao()
+    diff = DiffColeta(fonte, ano_ref, diretorio, ler_snapshot(diretorio, fonte, ano_ref), dados)
+    r = diff.resumo()
+    if diff.completo:
+        logger.info(f"[LOCAL] Diff {fonte}: sem coleta anterior, {len(dados)} itens gravados por inteiro")
+    else:
+        logger.info(
+            f"[LOCAL] Diff {fonte}: +{r['inseridos']} ~{r['atualizados']} -{r['removidos']} "
+            f"({r['inalterados']} inalterados)"
+        )
+    return diff
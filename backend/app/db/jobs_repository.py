@@ -0,0 +1,253 @@
+"""
+jobs_repository.py
+Registro persistente de jobs de coleta (estado, progresso e resultados).
+
+Usa SQLite (arquivo compartilhado, modo WAL) para funcionar no MODO LOCAL,
+sem Postgres, e permitir que vários workers da API leiam o mesmo estado.
+Caminho configurável por JOBS_DB_PATH (padrão: dados_locais_temp/jobs.sqlite3).
+"""
+import json
+import logging
+import os
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    tipo TEXT NOT NULL,
+    params TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL,
+    progresso TEXT NOT NULL DEFAULT '{}',
+    resumo TEXT,
+    erro TEXT,
+    total_resultados INTEGER NOT NULL DEFAULT 0,
+    criado_em TEXT NOT NULL,
+    iniciado_em TEXT,
+    finalizado_em TEXT,
+    atualizado_em TEXT NOT NULL,
+    worker TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_criado_em ON jobs (criado_em);
+CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status, criado_em);
+CREATE TABLE IF NOT EXISTS job_resultados (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    fonte TEXT NOT NULL,
+    item TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+
+def _agora() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _default_db_path() -> str:
+    return os.getenv("JOBS_DB_PATH") or os.path.join(os.getcwd(), "dados_locais_temp", "jobs.sqlite3")
+
+
+class JobsRepository:
+    """
+    Acesso ao registro de jobs. Cada operação abre a própria conexão, então a
+    instância pode ser usada por threads de background e por requests da API.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or _default_db_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            colunas = {r["name"] for r in conn.execute("PRAGMA table_info(jobs)")}
+            if "worker" not in colunas:
+                conn.execute("ALTER TABLE jobs ADD COLUMN worker TEXT")
+
+    @contextmanager
+    def _connect(self):
+        """Conexão curta: commit (ou rollback) e fechamento ao sair do bloco."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def criar(self, tipo: str, params: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        agora = _agora()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, tipo, params, status, criado_em, atualizado_em) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, tipo, json.dumps(params, ensure_ascii=False, default=str), STATUS_QUEUED, agora, agora),
+            )
+        return job_id
+
+    def marcar_inicio(self, job_id: str, worker: Optional[str] = None) -> None:
+        """running; `worker` identifica o processo se reservar_proximo ainda não o fez."""
+        agora = _agora()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = COALESCE(worker, ?), iniciado_em = ?, atualizado_em = ? "
+                "WHERE id = ?",
+                (STATUS_RUNNING, worker, agora, agora, job_id),
+            )
+
+    def reservar_proximo(self, worker: str, tipos: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Fila: reserva o job "queued" mais antigo para `worker` (status running).
+
+        BEGIN IMMEDIATE pega o lock de escrita do SQLite antes do SELECT, então
+        dois workers nunca reservam o mesmo job (papel do SKIP LOCKED no Postgres).
+        """
+        sql = "SELECT id FROM jobs WHERE status = ?"
+        args: List[Any] = [STATUS_QUEUED]
+        if tipos:
+            sql += f" AND tipo IN ({','.join('?' for _ in tipos)})"
+            args += list(tipos)
+        sql += " ORDER BY criado_em, rowid LIMIT 1"
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(sql, args).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, atualizado_em = ? WHERE id = ?",
+                (STATUS_RUNNING, worker, _agora(), row["id"]),
+            )
+            job = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+        return self._row_to_job(job)
+
+    def falhar_orfaos(self, worker: Optional[str], erro: str = "Worker reiniciado durante a execução.") -> int:
+        """Jobs que ficaram "running" neste worker (processo anterior morreu)."""
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, erro = ?, finalizado_em = ?, atualizado_em = ? "
+                "WHERE status = ? AND worker IS ?",
+                (STATUS_FAILED, erro, _agora(), _agora(), STATUS_RUNNING, worker),
+            )
+            return cur.rowcount
+
+    def workers_em_execucao(self) -> List[Optional[str]]:
+        """Workers (nome do processo) com jobs "running"; None para jobs sem worker registrado."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT DISTINCT worker FROM jobs WHERE status = ?", (STATUS_RUNNING,)).fetchall()
+        return [r["worker"] for r in rows]
+
+    def atualizar_progresso(self, job_id: str, progresso: Dict[str, Any]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET progresso = ?, atualizado_em = ? WHERE id = ?",
+                (json.dumps(progresso, ensure_ascii=False, default=str), _agora(), job_id),
+            )
+
+    def finalizar(
+        self,
+        job_id: str,
+        status: str,
+        resumo: Optional[Any] = None,
+        erro: Optional[str] = None,
+    ) -> None:
+        agora = _agora()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, resumo = ?, erro = ?, finalizado_em = ?, atualizado_em = ? "
+                "WHERE id = ?",
+                (
+                    status,
+                    json.dumps(resumo, ensure_ascii=False, default=str) if resumo is not None else None,
+                    erro,
+                    agora,
+                    agora,
+                    job_id,
+                ),
+            )
+
+    def adicionar_resultados(self, job_id: str, fonte: str, itens: List[Dict[str, Any]]) -> int:
+        """Anexa itens ao job (ordem preservada por `seq`). Retorna o novo total."""
+        if not itens:
+            return self.total_resultados(job_id)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM job_resultados WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            inicio = int(row[0]) + 1
+            conn.executemany(
+                "INSERT INTO job_resultados (job_id, seq, fonte, item) VALUES (?, ?, ?, ?)",
+                [
+                    (job_id, inicio + i, fonte, json.dumps(item, ensure_ascii=False, default=str))
+                    for i, item in enumerate(itens)
+                ],
+            )
+            total = inicio + len(itens) - 1
+            conn.execute(
+                "UPDATE jobs SET total_resultados = ?, atualizado_em = ? WHERE id = ?",
+                (total, _agora(), job_id),
+            )
+        return total
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def obter(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def listar(self, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs ORDER BY criado_em DESC, rowid DESC LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+        return [self._row_to_job(r) for r in rows]
+
+    def total_resultados(self, job_id: str) -> int:
+        with self._connect() as conn:
+            row = conn.execute("SELECT total_resultados FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def listar_resultados(
+        self,
+        job_id: str,
+        offset: int = 0,
+        limit: int = 100,
+        fonte: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        sql = "SELECT seq, fonte, item FROM job_resultados WHERE job_id = ?"
+        args: List[Any] = [job_id]
+        if fonte:
+            sql += " AND fonte = ?"
+            args.append(fonte)
+        sql += " ORDER BY seq LIMIT ? OFFSET ?"
+        args += [limit, offset]
+        with self._connect() as conn:
+            rows = conn.execute(sql, args).fetchall()
+        return [{"seq": r["seq"], "fonte": r["fonte"], "item": json.loads(r["item"])} for r in rows]
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        for campo in ("params", "progresso", "resumo"):
+            if job.get(campo):
+                job[campo] = json.loads(job[campo])
+        return job
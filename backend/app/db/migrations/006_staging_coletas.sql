@@ -0,0 +1,44 @@
+-- 006_staging_coletas.sql
+-- Ingestão em lote das coletas: cada execução vira um registro em
+-- coletas_execucoes e seus itens são carregados via COPY FROM STDIN nas
+-- tabelas de staging normalizadas (em vez de um JSONB único em `coletas`).
+-- Do staging, PGC_2025 e PNCP recebem upsert em SQL (ver pg_ingest.py).
+
+CREATE TABLE IF NOT EXISTS coletas_execucoes (
+    id BIGSERIAL PRIMARY KEY,
+    fonte VARCHAR(10) NOT NULL CHECK (fonte IN ('PGC', 'PNCP')),
+    ano_ref INT,
+    total_itens INT NOT NULL DEFAULT 0,
+    aplicados INT,
+    criado_em TIMESTAMP WITHOUT TIME ZONE DEFAULT (now() at time zone 'utc')
+);
+
+CREATE INDEX IF NOT EXISTS idx_coletas_execucoes_fonte ON coletas_execucoes (fonte, id);
+
+-- Linhas da tabela do PGC (dict do scraper: DFD, Requisitante, Descrição, Valor, Situação)
+CREATE TABLE IF NOT EXISTS stg_pgc_itens (
+    execucao_id BIGINT NOT NULL REFERENCES coletas_execucoes(id) ON DELETE CASCADE,
+    seq INT NOT NULL,
+    dfd TEXT,
+    requisitante TEXT,
+    descricao TEXT,
+    valor NUMERIC(15,2),
+    situacao TEXT,
+    PRIMARY KEY (execucao_id, seq)
+);
+
+-- Itens PNCP (PNCPItemSchema, colunas A a I)
+CREATE TABLE IF NOT EXISTS stg_pncp_itens (
+    execucao_id BIGINT NOT NULL REFERENCES coletas_execucoes(id) ON DELETE CASCADE,
+    seq INT NOT NULL,
+    contratacao TEXT,
+    descricao TEXT,
+    categoria TEXT,
+    valor NUMERIC(15,2),
+    inicio DATE,
+    fim DATE,
+    status TEXT,
+    status_tipo TEXT,
+    dfd TEXT,
+    PRIMARY KEY (execucao_id, seq)
+);
@@ -0,0 +1,17 @@
+-- 007_consolidacao_incremental.sql
+-- Consolidação incremental: cada fonte guarda a última execução de
+-- coletas_execucoes já aplicada em PGC_2025/PNCP (high-water mark); só as
+-- execuções acima dela são processadas.
+
+CREATE TABLE IF NOT EXISTS consolidacao_marcas (
+    fonte VARCHAR(10) PRIMARY KEY CHECK (fonte IN ('PGC', 'PNCP')),
+    ultima_execucao_id BIGINT NOT NULL DEFAULT 0,
+    atualizado_em TIMESTAMP WITHOUT TIME ZONE DEFAULT (now() at time zone 'utc')
+);
+
+INSERT INTO consolidacao_marcas (fonte) VALUES ('PGC'), ('PNCP')
+ON CONFLICT (fonte) DO NOTHING;
+
+-- REFRESH MATERIALIZED VIEW CONCURRENTLY exige um índice único na view
+-- (pag é a chave de PGC_2025): leitores não ficam bloqueados durante o refresh.
+CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_pgc_pag ON PGC (pag);
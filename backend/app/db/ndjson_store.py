@@ -0,0 +1,227 @@
+"""
+ndjson_store.py
+Armazenamento bruto local append-only (NDJSON) com manifesto.
+
+- gravacao_bruta(): abre {fonte}_{timestamp}.ndjson enquanto o scraper roda;
+  cada item publicado (job_context.publicar_item -> anexar_item) vira uma linha.
+  fsync em lotes (NDJSON_FSYNC_ITENS itens ou NDJSON_FSYNC_S segundos): uma
+  queda no meio da coleta perde no máximo o último lote.
+- {fonte}_{timestamp}.manifest.json: total de itens, bytes, sha256, horários
+  e status (em_andamento, coletada, interrompida, concluida); regravado a
+  cada fsync.
+- ultimo_{fonte}.json: cópia do manifesto mais recente finalizado, lida por
+  verify_last_collection sem abrir o NDJSON.
+"""
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+STATUS_EM_ANDAMENTO = "em_andamento"
+STATUS_COLETADA = "coletada"
+STATUS_INTERROMPIDA = "interrompida"
+STATUS_CONCLUIDA = "concluida"
+
+_gravacao_atual: contextvars.ContextVar[Optional["GravacaoNdjson"]] = contextvars.ContextVar(
+    "gravacao_bruta", default=None
+)
+
+
+def diretorio_padrao() -> str:
+    return os.path.join(os.getcwd(), "dados_locais_temp")
+
+
+def _agora() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _gravar_json_atomico(caminho: str, dados: Dict[str, Any]) -> None:
+    tmp = f"{caminho}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(dados, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, caminho)
+
+
+def caminho_ultimo(diretorio: str, fonte: str) -> str:
+    return os.path.join(diretorio, f"ultimo_{fonte}.json")
+
+
+def ler_ultimo(diretorio: str, fonte: str) -> Optional[Dict[str, Any]]:
+    """Manifesto da coleta mais recente da fonte (None se não houver)."""
+    try:
+        with open(caminho_ultimo(diretorio, fonte), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+class GravacaoNdjson:
+    """Um arquivo NDJSON de coleta e seu manifesto."""
+
+    def __init__(self, diretorio: str, fonte: str, ano_ref: Optional[str] = None):
+        self.diretorio = diretorio
+        self.fonte = fonte
+        self.ano_ref = ano_ref
+        self.fsync_itens = max(1, int(os.getenv("NDJSON_FSYNC_ITENS", "100")))
+        self.fsync_s = float(os.getenv("NDJSON_FSYNC_S", "2"))
+        os.makedirs(diretorio, exist_ok=True)
+
+        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base = f"{fonte}_{self.timestamp}"
+        # Coletas paralelas podem gravar a mesma fonte no mesmo segundo
+        seq = 1
+        while os.path.exists(os.path.join(diretorio, f"{base}.ndjson")):
+            seq += 1
+            base = f"{fonte}_{self.timestamp}_{seq}"
+        self.arquivo = f"{base}.ndjson"
+        self.caminho = os.path.join(diretorio, self.arquivo)
+        self.caminho_manifesto = os.path.join(diretorio, f"{base}.manifest.json")
+
+        self.total = 0
+        self.bytes = 0
+        self.status = STATUS_EM_ANDAMENTO
+        self.iniciado_em = _agora()
+        self.finalizado_em: Optional[str] = None
+        # Resumo do diff_coletas em relação à coleta anterior (se calculado)
+        self.diff: Optional[Dict[str, Any]] = None
+        self._sha = hashlib.sha256()
+        self._pendentes = 0
+        self._ultimo_fsync = time.monotonic()
+        self._lock = threading.Lock()
+        self._f = open(self.caminho, "xb")
+        self._gravar_manifesto()
+
+    # -- escrita -------------------------------------------------------
+
+    def anexar(self, item: Dict[str, Any]) -> None:
+        linha = (json.dumps(item, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        with self._lock:
+            if self._f is None:
+                return
+            self._f.write(linha)
+            self._sha.update(linha)
+            self.total += 1
+            self.bytes += len(linha)
+            self._pendentes += 1
+            if self._pendentes >= self.fsync_itens or time.monotonic() - self._ultimo_fsync >= self.fsync_s:
+                self._sincronizar()
+
+    def reescrever(self, dados: Iterable[Dict[str, Any]]) -> None:
+        """Substitui o conteúdo pela lista final (quando o stream divergiu dela)."""
+        with self._lock:
+            if self._f is None:
+                self._f = open(self.caminho, "r+b")
+            self._f.seek(0)
+            self._f.truncate()
+            self._sha = hashlib.sha256()
+            self.total = self.bytes = 0
+            for item in dados:
+                linha = (json.dumps(item, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+                self._f.write(linha)
+                self._sha.update(linha)
+                self.total += 1
+                self.bytes += len(linha)
+            self._sincronizar()
+
+    def finalizar(self, status: str) -> Dict[str, Any]:
+        """Sincroniza, fecha o arquivo e publica o manifesto como o último da fonte."""
+        with self._lock:
+            if self._f is not None:
+                self._sincronizar(gravar_manifesto=False)
+                self._f.close()
+                self._f = None
+            self.status = status
+            self.finalizado_em = _agora()
+            manifesto = self._gravar_manifesto()
+        _gravar_json_atomico(caminho_ultimo(self.diretorio, self.fonte), manifesto)
+        return manifesto
+
+    def descartar(self) -> None:
+        """Remove arquivo e manifesto (coleta sem itens)."""
+        with self._lock:
+            if self._f is not None:
+                self._f.close()
+                self._f = None
+        for caminho in (self.caminho, self.caminho_manifesto):
+            if os.path.exists(caminho):
+                os.remove(caminho)
+
+    # -- interno -------------------------------------------------------
+
+    def _sincronizar(self, gravar_manifesto: bool = True) -> None:
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._pendentes = 0
+        self._ultimo_fsync = time.monotonic()
+        if gravar_manifesto:
+            self._gravar_manifesto()
+
+    def manifesto(self) -> Dict[str, Any]:
+        return {
+            "fonte": self.fonte,
+            "ano_ref": self.ano_ref,
+            "arquivo": self.arquivo,
+            "timestamp": self.timestamp,
+            "status": self.status,
+            "total_itens": self.total,
+            "bytes": self.bytes,
+            "sha256": self._sha.hexdigest(),
+            "iniciado_em": self.iniciado_em,
+            "atualizado_em": _agora(),
+            "finalizado_em": self.finalizado_em,
+            "diff": self.diff,
+        }
+
+    def _gravar_manifesto(self) -> Dict[str, Any]:
+        manifesto = self.manifesto()
+        _gravar_json_atomico(self.caminho_manifesto, manifesto)
+        return manifesto
+
+
+@contextmanager
+def gravacao_bruta(fonte: str, ano_ref: Optional[str] = None, diretorio: Optional[str] = None):
+    """
+    Grava em NDJSON os itens publicados durante o bloco (inclusive por threads
+    que herdam o contexto). Ao sair, o arquivo fica "coletada" (ou
+    "interrompida" se o bloco falhou) à espera de salvar_bruto(), que o
+    confere com a lista final e o marca "concluida". Sem itens, nada fica.
+    """
+    gravacao = GravacaoNdjson(diretorio or diretorio_padrao(), fonte, ano_ref)
+    token = _gravacao_atual.set(gravacao)
+    try:
+        yield gravacao
+    except BaseException:
+        _gravacao_atual.reset(token)
+        if gravacao.total:
+            gravacao.finalizar(STATUS_INTERROMPIDA)
+            logger.warning(
+                f"[LOCAL] Coleta {fonte} interrompida; {gravacao.total} itens preservados em {gravacao.caminho}"
+            )
+        else:
+            gravacao.descartar()
+        raise
+    _gravacao_atual.reset(token)
+    if gravacao.total:
+        gravacao.finalizar(STATUS_COLETADA)
+    else:
+        gravacao.descartar()
+
+
+def anexar_item(fonte: str, item: Dict[str, Any]) -> None:
+    """Anexa o item à gravação em curso da fonte (sem gravação, não faz nada)."""
+    gravacao = _gravacao_atual.get()
+    if gravacao is None or gravacao.fonte != fonte:
+        return
+    try:
+        gravacao.anexar(item)
+    except Exception as e:
+        # Falha no disco não derruba a coleta; salvar_bruto regrava a lista final
+        logger.error(f"[LOCAL] ❌ Erro ao anexar item em {gravacao.caminho}: {e}")
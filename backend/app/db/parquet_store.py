@@ -0,0 +1,170 @@
+"""
+parquet_store.py
+Exportação colunar (Parquet) dos resultados de coleta, opcional.
+
+Cada chamada de salvar() grava um arquivo novo em layout Hive:
+
+    {PARQUET_DIR}/fonte=PNCP/ano_ref=2025/data_coleta=2025-03-14/part-<hora>-<id>.parquet
+
+Colunas tipadas: PNCP a partir do PNCPItemSchema (str -> string, float ->
+double, date -> date32); PGC a partir do dict de linha do scraper (Valor
+convertido para double). O histórico pode ser lido sem abrir os JSONs:
+
+    duckdb.sql("SELECT * FROM read_parquet('dados_locais_temp/parquet/**/*.parquet', hive_partitioning=1)")
+    pandas.read_parquet("dados_locais_temp/parquet", filters=[("fonte", "=", "PNCP")])
+
+Depende de pyarrow (opcional); sem ele, salvar() só registra um aviso.
+"""
+import logging
+import os
+import typing
+import uuid
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..api.schemas import PNCPItemSchema
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    pa = None
+    pq = None
+    PARQUET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Chave no dict do scraper PGC -> (coluna, tipo)
+PGC_COLUNAS: List[Tuple[str, str, str]] = [
+    ("DFD", "dfd", "string"),
+    ("Requisitante", "requisitante", "string"),
+    ("Descrição", "descricao", "string"),
+    ("Valor", "valor", "double"),
+    ("Situação", "situacao", "string"),
+]
+
+
+def _tipo_arrow(annotation) -> str:
+    """Tipo Arrow (nome) de uma anotação do schema Pydantic."""
+    if typing.get_origin(annotation) is typing.Union:
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        annotation = args[0] if len(args) == 1 else str
+    if annotation is float:
+        return "double"
+    if annotation is int:
+        return "int64"
+    if annotation is bool:
+        return "bool"
+    if annotation is date:
+        return "date32"
+    return "string"
+
+
+def pncp_colunas() -> List[Tuple[str, str, str]]:
+    return [
+        (nome, nome, _tipo_arrow(campo.annotation))
+        for nome, campo in PNCPItemSchema.model_fields.items()
+    ]
+
+
+_TIPOS_ARROW = {
+    "string": lambda: pa.string(),
+    "double": lambda: pa.float64(),
+    "int64": lambda: pa.int64(),
+    "bool": lambda: pa.bool_(),
+    "date32": lambda: pa.date32(),
+}
+
+
+def valor_br(valor: Any) -> Optional[float]:
+    """'R$ 1.234,56' -> 1234.56 (None se não for número)."""
+    if valor is None or isinstance(valor, (int, float)):
+        return valor
+    texto = str(valor).replace("R$", "").replace(".", "").replace(",", ".").strip()
+    try:
+        return float(texto)
+    except ValueError:
+        return None
+
+
+def _converter(valor: Any, tipo: str) -> Any:
+    if valor is None or valor == "":
+        return None if tipo != "string" else valor
+    if tipo == "double":
+        return valor_br(valor)
+    if tipo == "date32":
+        if isinstance(valor, date):
+            return valor
+        try:
+            return date.fromisoformat(str(valor)[:10])
+        except ValueError:
+            return None
+    if tipo == "string":
+        return str(valor)
+    return valor
+
+
+class ParquetStore:
+    """Grava lotes de itens coletados em Parquet particionado."""
+
+    def __init__(self, base_dir: Optional[str] = None):
+        self.base_dir = base_dir or os.getenv(
+            "PARQUET_DIR", os.path.join(os.getcwd(), "dados_locais_temp", "parquet")
+        )
+
+    @staticmethod
+    def colunas(fonte: str) -> List[Tuple[str, str, str]]:
+        return pncp_colunas() if fonte.upper() == "PNCP" else PGC_COLUNAS
+
+    def salvar(
+        self,
+        fonte: str,
+        dados: List[Dict[str, Any]],
+        ano_ref: Optional[str] = None,
+        coletado_em: Optional[datetime] = None,
+    ) -> Optional[str]:
+        """Grava `dados` num arquivo novo da partição; devolve o caminho."""
+        if not dados:
+            return None
+        if not PARQUET_AVAILABLE:
+            logger.warning("[LOCAL] pyarrow não instalado; exportação Parquet ignorada")
+            return None
+
+        fonte = fonte.upper()
+        coletado_em = coletado_em or datetime.now()
+        colunas = self.colunas(fonte)
+
+        arrays = {}
+        campos = []
+        for origem, coluna, tipo in colunas:
+            valores = [
+                _converter(item.get(origem, item.get(coluna)), tipo)
+                for item in dados
+            ]
+            arrays[coluna] = pa.array(valores, type=_TIPOS_ARROW[tipo]())
+            campos.append(pa.field(coluna, arrays[coluna].type))
+        arrays["coletado_em"] = pa.array([coletado_em] * len(dados), type=pa.timestamp("s"))
+        campos.append(pa.field("coletado_em", pa.timestamp("s")))
+        tabela = pa.Table.from_pydict(arrays, schema=pa.schema(campos))
+
+        particao = os.path.join(
+            self.base_dir,
+            f"fonte={fonte}",
+            f"ano_ref={ano_ref or 'desconhecido'}",
+            f"data_coleta={coletado_em.date().isoformat()}",
+        )
+        os.makedirs(particao, exist_ok=True)
+        nome = f"part-{coletado_em.strftime('%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+        destino = os.path.join(particao, nome)
+        # Prefixo "." : leitores de dataset (pyarrow/DuckDB) ignoram o parcial
+        tmp = os.path.join(particao, f".{nome}.tmp")
+        try:
+            pq.write_table(tabela, tmp, compression="zstd")
+            os.replace(tmp, destino)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+        logger.info(f"[LOCAL] ✅ Parquet salvo em: {destino} ({len(dados)} itens)")
+        return destino
@@ -0,0 +1,315 @@
+"""
+pg_ingest.py
+Ingestão em lote das coletas no Postgres.
+
+1. ingerir(): registra a execução em coletas_execucoes e carrega os itens
+   com COPY FROM STDIN (formato texto, em páginas de PG_COPY_PAGE linhas)
+   em stg_pgc_itens / stg_pncp_itens.
+2. consolidar(): aplica em PGC_2025 (ON CONFLICT (dfd), índice uq_pgc_dfd
+   da 005_upsert_pgc.sql) / PNCP (ON CONFLICT (id_pncp)) apenas as execuções
+   acima da marca da fonte (consolidacao_marcas), num upsert set-based, e
+   faz REFRESH MATERIALIZED VIEW CONCURRENTLY da view PGC se algo mudou.
+   O custo acompanha o delta, não o histórico.
+
+Ingestão e consolidação de uma mesma fonte são serializadas por advisory
+lock: os IDs de execução ficam visíveis em ordem e a marca nunca pula uma
+execução ainda não confirmada. Linhas idênticas às já gravadas não são
+reescritas (nem disparam triggers).
+"""
+import io
+import logging
+import os
+import time
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .parquet_store import valor_br
+
+logger = logging.getLogger(__name__)
+
+# Limite de NUMERIC(15,2)
+_VALOR_MAX = 10 ** 13
+
+STG_PGC_COLUNAS = ["execucao_id", "seq", "dfd", "requisitante", "descricao", "valor", "situacao"]
+STG_PNCP_COLUNAS = [
+    "execucao_id", "seq", "contratacao", "descricao", "categoria", "valor",
+    "inicio", "fim", "status", "status_tipo", "dfd",
+]
+
+# Delta: execuções em (desde, ate]; a mais recente de cada chave vence
+SQL_UPSERT_PGC = """
+INSERT INTO PGC_2025 (dfd, requisitante, descricao, valor, situacao, ano)
+SELECT DISTINCT ON (s.dfd)
+    s.dfd, LEFT(s.requisitante, 100), s.descricao, s.valor, LEFT(s.situacao, 50), e.ano_ref
+FROM stg_pgc_itens s
+JOIN coletas_execucoes e ON e.id = s.execucao_id
+WHERE s.execucao_id > %(desde)s AND s.execucao_id <= %(ate)s
+  AND s.dfd IS NOT NULL AND s.dfd <> '' AND length(s.dfd) <= 9
+ORDER BY s.dfd, s.execucao_id DESC, s.seq DESC
+ON CONFLICT (dfd) DO UPDATE SET
+    requisitante = EXCLUDED.requisitante,
+    descricao = EXCLUDED.descricao,
+    valor = EXCLUDED.valor,
+    situacao = EXCLUDED.situacao,
+    ano = COALESCE(EXCLUDED.ano, PGC_2025.ano)
+WHERE (PGC_2025.requisitante, PGC_2025.descricao, PGC_2025.valor, PGC_2025.situacao, PGC_2025.ano)
+      IS DISTINCT FROM
+      (EXCLUDED.requisitante, EXCLUDED.descricao, EXCLUDED.valor, EXCLUDED.situacao,
+       COALESCE(EXCLUDED.ano, PGC_2025.ano))
+"""
+
+# PNCP exige id_pncp no formato 00000-00000-0000 e id_pca (= DFD) existente em
+# PCA, único na tabela: o restante fica só no staging.
+SQL_UPSERT_PNCP = """
+WITH por_pca AS (
+    SELECT DISTINCT ON (s.dfd) s.*
+    FROM stg_pncp_itens s
+    JOIN PCA pca ON pca.id_pca = s.dfd
+    WHERE s.execucao_id > %(desde)s AND s.execucao_id <= %(ate)s
+      AND s.contratacao ~ '^\\d{5}-\\d{5}-\\d{4}$'
+    ORDER BY s.dfd, s.execucao_id DESC, s.seq DESC
+), candidatos AS (
+    SELECT DISTINCT ON (c.contratacao) c.*
+    FROM por_pca c
+    WHERE NOT EXISTS (
+        SELECT 1 FROM PNCP p WHERE p.id_pca = c.dfd AND p.id_pncp <> c.contratacao
+    )
+    ORDER BY c.contratacao, c.execucao_id DESC, c.seq DESC
+)
+INSERT INTO PNCP (id_pncp, id_pca, dfd, id_contratacao, descricao, categoria,
+                  valor, inicio, fim, status, status_tipo)
+SELECT c.contratacao, c.dfd, c.dfd, LEFT(c.contratacao, 15), c.descricao, LEFT(c.categoria, 50),
+       c.valor, c.inicio, c.fim, LEFT(c.status, 50), LEFT(c.status_tipo, 50)
+FROM candidatos c
+ON CONFLICT (id_pncp) DO UPDATE SET
+    descricao = EXCLUDED.descricao,
+    categoria = EXCLUDED.categoria,
+    valor = EXCLUDED.valor,
+    inicio = EXCLUDED.inicio,
+    fim = EXCLUDED.fim,
+    status = EXCLUDED.status,
+    status_tipo = EXCLUDED.status_tipo
+WHERE PNCP.id_pca = EXCLUDED.id_pca
+  AND (PNCP.descricao, PNCP.categoria, PNCP.valor, PNCP.inicio, PNCP.fim, PNCP.status, PNCP.status_tipo)
+      IS DISTINCT FROM
+      (EXCLUDED.descricao, EXCLUDED.categoria, EXCLUDED.valor, EXCLUDED.inicio, EXCLUDED.fim,
+       EXCLUDED.status, EXCLUDED.status_tipo)
+"""
+
+SQL_UPSERT = {"PGC": SQL_UPSERT_PGC, "PNCP": SQL_UPSERT_PNCP}
+
+# Views materializadas alimentadas por cada fonte
+VIEWS_POR_FONTE = {"PGC": ["PGC"], "PNCP": []}
+
+FONTES = ("PGC", "PNCP")
+
+
+def _texto(valor: Any) -> Optional[str]:
+    if valor is None:
+        return None
+    return str(valor)
+
+
+def _numero(valor: Any) -> Optional[float]:
+    v = valor_br(valor)
+    if v is None or v != v or abs(v) >= _VALOR_MAX:
+        return None
+    return round(float(v), 2)
+
+
+def _data(valor: Any) -> Optional[str]:
+    if not valor:
+        return None
+    if isinstance(valor, date):
+        return valor.isoformat()
+    try:
+        return date.fromisoformat(str(valor)[:10]).isoformat()
+    except ValueError:
+        return None
+
+
+def _linha_pgc(execucao_id: int, seq: int, item: Dict[str, Any]) -> List[Any]:
+    def campo(nome: str, alternativo: str) -> Any:
+        return item.get(nome, item.get(alternativo))
+    dfd = campo("DFD", "dfd")
+    return [
+        execucao_id, seq,
+        str(dfd).strip() if dfd is not None else None,
+        _texto(campo("Requisitante", "requisitante")),
+        _texto(campo("Descrição", "descricao")),
+        _numero(campo("Valor", "valor")),
+        _texto(campo("Situação", "situacao")),
+    ]
+
+
+def _linha_pncp(execucao_id: int, seq: int, item: Dict[str, Any]) -> List[Any]:
+    return [
+        execucao_id, seq,
+        _texto(item.get("col_a_contratacao")),
+        _texto(item.get("col_b_descricao")),
+        _texto(item.get("col_c_categoria")),
+        _numero(item.get("col_d_valor")),
+        _data(item.get("col_e_inicio")),
+        _data(item.get("col_f_fim")),
+        _texto(item.get("col_g_status")),
+        _texto(item.get("col_h_status_tipo")),
+        _texto(item.get("col_i_dfd")),
+    ]
+
+
+_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_texto(linha: Sequence[Any]) -> str:
+    """Uma linha no formato texto do COPY (tab, \\N para NULL)."""
+    return "\t".join("\\N" if v is None else str(v).translate(_ESCAPES) for v in linha) + "\n"
+
+
+def copiar(cursor, tabela: str, colunas: Sequence[str], linhas: Iterable[Sequence[Any]], pagina: int) -> int:
+    """COPY FROM STDIN em páginas de `pagina` linhas; devolve o total copiado."""
+    sql = f"COPY {tabela} ({', '.join(colunas)}) FROM STDIN"
+    total = 0
+    buf = io.StringIO()
+    n = 0
+    for linha in linhas:
+        buf.write(_copy_texto(linha))
+        n += 1
+        if n >= pagina:
+            buf.seek(0)
+            cursor.copy_expert(sql, buf)
+            total += n
+            buf = io.StringIO()
+            n = 0
+    if n:
+        buf.seek(0)
+        cursor.copy_expert(sql, buf)
+        total += n
+    return total
+
+
+def _lock_fonte(cur, fonte: str) -> None:
+    """Serializa ingestão/consolidação da fonte até o fim da transação."""
+    cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"coletas_{fonte}",))
+
+
+def ingerir(engine, fonte: str, dados: List[Dict[str, Any]], ano_ref: Optional[str] = None) -> Dict[str, Any]:
+    """Registra a execução e carrega `dados` no staging via COPY (sem consolidar)."""
+    fonte = fonte.upper()
+    if fonte not in FONTES:
+        raise ValueError(f"Fonte inválida para ingestão: {fonte}")
+    pagina = max(1, int(os.getenv("PG_COPY_PAGE", "50000")))
+    ano = int(ano_ref) if ano_ref and str(ano_ref).isdigit() else None
+
+    inicio = time.perf_counter()
+    conn = engine.raw_connection()
+    try:
+        cur = conn.cursor()
+        _lock_fonte(cur, fonte)
+        cur.execute(
+            "INSERT INTO coletas_execucoes (fonte, ano_ref, total_itens) VALUES (%s, %s, %s) RETURNING id",
+            (fonte, ano, len(dados)),
+        )
+        execucao_id = cur.fetchone()[0]
+
+        if fonte == "PGC":
+            linhas = (_linha_pgc(execucao_id, i, item) for i, item in enumerate(dados, 1))
+            copiados = copiar(cur, "stg_pgc_itens", STG_PGC_COLUNAS, linhas, pagina)
+        else:
+            linhas = (_linha_pncp(execucao_id, i, item) for i, item in enumerate(dados, 1))
+            copiados = copiar(cur, "stg_pncp_itens", STG_PNCP_COLUNAS, linhas, pagina)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    resumo = {
+        "execucao_id": execucao_id,
+        "fonte": fonte,
+        "copiados": copiados,
+        "segundos": round(time.perf_counter() - inicio, 2),
+    }
+    logger.info(f"[DB] ✅ {fonte}: {copiados} itens no staging (execução {execucao_id}, {resumo['segundos']}s)")
+    return resumo
+
+
+def _consolidar_fonte(conn, fonte: str) -> Dict[str, Any]:
+    cur = conn.cursor()
+    _lock_fonte(cur, fonte)
+    cur.execute("SELECT ultima_execucao_id FROM consolidacao_marcas WHERE fonte = %s FOR UPDATE", (fonte,))
+    linha = cur.fetchone()
+    if linha is None:
+        cur.execute("INSERT INTO consolidacao_marcas (fonte) VALUES (%s)", (fonte,))
+        desde = 0
+    else:
+        desde = linha[0]
+    cur.execute(
+        "SELECT COUNT(*), MAX(id) FROM coletas_execucoes WHERE fonte = %s AND id > %s",
+        (fonte, desde),
+    )
+    execucoes, ate = cur.fetchone()
+    if not execucoes:
+        conn.commit()
+        return {"fonte": fonte, "execucoes": 0, "aplicados": 0, "marca": desde}
+
+    cur.execute(SQL_UPSERT[fonte], {"desde": desde, "ate": ate})
+    aplicados = cur.rowcount
+    cur.execute(
+        "UPDATE coletas_execucoes SET aplicados = %s WHERE id = %s",
+        (aplicados, ate),
+    )
+    cur.execute(
+        "UPDATE consolidacao_marcas SET ultima_execucao_id = %s, "
+        "atualizado_em = (now() at time zone 'utc') WHERE fonte = %s",
+        (ate, fonte),
+    )
+    conn.commit()
+    return {"fonte": fonte, "execucoes": execucoes, "aplicados": aplicados, "marca": ate}
+
+
+def _refresh_views(conn, views: Sequence[str]) -> None:
+    cur = conn.cursor()
+    for view in views:
+        try:
+            cur.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}")
+            conn.commit()
+        except Exception as e:
+            # View nunca populada não aceita CONCURRENTLY
+            conn.rollback()
+            logger.warning(f"[DB] Refresh concorrente de {view} falhou ({e}); refresh completo")
+            cur.execute(f"REFRESH MATERIALIZED VIEW {view}")
+            conn.commit()
+
+
+def consolidar(engine, fontes: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Aplica as execuções pendentes (acima da marca) de cada fonte e atualiza
+    as views materializadas afetadas. Devolve um resumo por fonte.
+    """
+    resumos = []
+    views: List[str] = []
+    conn = engine.raw_connection()
+    try:
+        for fonte in [f.upper() for f in (fontes or FONTES)]:
+            if fonte not in FONTES:
+                raise ValueError(f"Fonte inválida para consolidação: {fonte}")
+            inicio = time.perf_counter()
+            try:
+                r = _consolidar_fonte(conn, fonte)
+            except Exception:
+                conn.rollback()
+                raise
+            r["segundos"] = round(time.perf_counter() - inicio, 2)
+            resumos.append(r)
+            if r["execucoes"]:
+                logger.info(
+                    f"[DB] ✅ {fonte}: {r['execucoes']} execução(ões) consolidadas, "
+                    f"{r['aplicados']} linhas inseridas/atualizadas (marca {r['marca']}, {r['segundos']}s)"
+                )
+            if r["aplicados"]:
+                views.extend(v for v in VIEWS_POR_FONTE[fonte] if v not in views)
+        _refresh_views(conn, views)
+    finally:
+        conn.close()
+    return resumos
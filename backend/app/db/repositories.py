@@ -1,22 +1,33 @@
 """
 repositories.py
 Repositório adaptado para EXECUÇÃO LOCAL - Postgres DESABILITADO
-Dados salvos apenas em arquivo de fallback (JSON temporário)
+Dados salvos apenas em arquivo de fallback (NDJSON temporário, ver ndjson_store)
 """
 import json
 import logging
 import time
 import os
-from datetime import datetime
 from typing import Dict, Any, Optional, List
 
+from . import pg_ingest
+from ..core.metrics import GRAVACAO
+from .diff_coletas import DiffColeta
+from .ndjson_store import GravacaoNdjson, STATUS_CONCLUIDA, ler_ultimo
+from .parquet_store import ParquetStore
+
 logger = logging.getLogger(__name__)
 
+
+def is_postgres_ingest_enabled() -> bool:
+    return os.getenv("POSTGRES_INGEST", "false").lower() in ("1", "true", "yes", "on")
+
+
 class ColetasRepository:
     """
     Repositório ADAPTADO PARA EXECUÇÃO LOCAL.
-    - Postgres DESABILITADO
-    - Dados salvos em arquivos JSON temporários
+    - Postgres DESABILITADO (exceto com POSTGRES_INGEST=true: ingestão em
+      lote via COPY + consolidação incremental, ver pg_ingest)
+    - Dados salvos em arquivos NDJSON temporários (+ manifesto)
     - Excel será gerado pelo ExcelPersistence
     """
     
@@ -25,16 +36,19 @@ class ColetasRepository:
         # 🔴 INÍCIO MODIFICAÇÃO LOCAL - REMOVER QUANDO VOLTAR DOCKER
         # ============================================================
         
-        logger.warning("[LOCAL] Repositório em MODO LOCAL - Postgres DESABILITADO")
-        logger.warning("[LOCAL] Dados serão salvos apenas em JSON temporário")
-        
         # Cria pasta para dados temporários
         self.local_data_dir = os.path.join(os.getcwd(), "dados_locais_temp")
         os.makedirs(self.local_data_dir, exist_ok=True)
         
-        # NÃO INICIALIZAR ENGINE DO POSTGRES
-        # self._engine = get_engine()
-        # self._ensure_db_objects()
+        # Engine do Postgres só com a ingestão em lote habilitada
+        self._engine = None
+        if is_postgres_ingest_enabled():
+            from .engine import get_engine
+            self._engine = get_engine()
+            logger.info("[DB] Ingestão Postgres habilitada (COPY -> staging -> consolidação incremental)")
+        else:
+            logger.warning("[LOCAL] Repositório em MODO LOCAL - Postgres DESABILITADO")
+            logger.warning("[LOCAL] Dados serão salvos apenas em NDJSON temporário")
         
         # ============================================================
         # 🔴 FIM MODIFICAÇÃO LOCAL
@@ -44,37 +58,77 @@ class ColetasRepository:
     # 🔴 MÉTODOS MODIFICADOS PARA EXECUÇÃO LOCAL
     # ============================================================
 
-    def salvar_bruto(self, fonte: str, dados: List[Dict[str, Any]]):
+    def salvar_bruto(
+        self,
+        fonte: str,
+        dados: List[Dict[str, Any]],
+        ano_ref: Optional[str] = None,
+        gravacao: Optional[GravacaoNdjson] = None,
+        diff: Optional[DiffColeta] = None,
+    ) -> bool:
         """
-        MODO LOCAL: Salva dados apenas em arquivo JSON temporário.
+        MODO LOCAL: Salva dados apenas em arquivo NDJSON temporário (+ manifesto).
         Postgres DESABILITADO.
+        `gravacao` é a gravação incremental aberta com gravacao_bruta() durante
+        o scraping: se ela já contém a lista final, só é marcada como concluída.
+        Com PARQUET_EXPORT=true, também grava o lote em Parquet particionado
+        por fonte/ano_ref/data (ver parquet_store).
+        `diff` (diff_coletas, COLETA_DIFF=true): o resumo vai para o manifesto
+        e o Postgres recebe só os itens inseridos/atualizados.
+
+        Falhas são logadas sem interromper a coleta; o retorno diz se o NDJSON
+        e (com Postgres) a ingestão foram gravados — sem isso o snapshot do
+        diff não deve avançar. O Parquet é só exportação e não entra na conta.
         """
         if not dados:
             logger.warning("[LOCAL] Nenhum dado para salvar")
-            return
+            return True
+        ok = True
         
         # ============================================================
         # 🔴 INÍCIO MODIFICAÇÃO LOCAL
         # ============================================================
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{fonte}_{timestamp}.json"
-        filepath = os.path.join(self.local_data_dir, filename)
-        
         try:
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump({
-                    "fonte": fonte,
-                    "timestamp": timestamp,
-                    "total_itens": len(dados),
-                    "dados": dados
-                }, f, ensure_ascii=False, indent=2)
+            with GRAVACAO.labels(destino="ndjson").time():
+                if gravacao is None or gravacao.fonte != fonte:
+                    gravacao = GravacaoNdjson(self.local_data_dir, fonte, ano_ref)
+                    gravacao.reescrever(dados)
+                elif gravacao.total != len(dados):
+                    # Itens publicados não batem com a lista final (ex.: aba refeita)
+                    logger.info(
+                        f"[LOCAL] NDJSON com {gravacao.total} itens publicados; regravando os {len(dados)} finais"
+                    )
+                    gravacao.reescrever(dados)
+                if diff is not None:
+                    gravacao.diff = diff.resumo()
+                gravacao.finalizar(STATUS_CONCLUIDA)
             
-            logger.info(f"[LOCAL] ✅ Dados salvos em: {filepath}")
+            logger.info(f"[LOCAL] ✅ Dados salvos em: {gravacao.caminho}")
             logger.info(f"[LOCAL] Total de itens: {len(dados)}")
             
         except Exception as e:
-            logger.error(f"[LOCAL] ❌ Erro ao salvar arquivo JSON: {e}")
+            logger.error(f"[LOCAL] ❌ Erro ao salvar arquivo NDJSON: {e}")
+            ok = False
+
+        if os.getenv("PARQUET_EXPORT", "false").lower() in ("1", "true", "yes", "on"):
+            try:
+                with GRAVACAO.labels(destino="parquet").time():
+                    ParquetStore().salvar(fonte, dados, ano_ref=ano_ref)
+            except Exception as e:
+                logger.error(f"[LOCAL] ❌ Erro ao salvar Parquet: {e}")
+
+        if self._engine is not None:
+            if diff is not None and not diff.completo:
+                # Só o delta vai para o staging; sem alterações, nada a ingerir
+                dados = diff.alterados
+            try:
+                if dados:
+                    pg_ingest.ingerir(self._engine, fonte, dados, ano_ref=ano_ref)
+                pg_ingest.consolidar(self._engine, [fonte])
+            except Exception as e:
+                logger.error(f"[DB] ❌ Erro na ingestão Postgres ({fonte}): {e}")
+                ok = False
         
         # ============================================================
         # 🔴 FIM MODIFICAÇÃO LOCAL
@@ -85,11 +139,16 @@ class ColetasRepository:
         # with self._engine.connect() as conn:
         #     result = conn.execute(sql_bruta, ...)
         #     conn.commit()
+        return ok
 
     def consolidar_dados(self):
         """
-        MODO LOCAL: Consolidação desabilitada (sem Postgres).
+        Aplica em PGC_2025/PNCP as execuções ainda não consolidadas (acima da
+        marca de cada fonte). MODO LOCAL: desabilitada (sem Postgres).
         """
+        if self._engine is not None:
+            return pg_ingest.consolidar(self._engine)
+
         # ============================================================
         # 🔴 INÍCIO MODIFICAÇÃO LOCAL
         # ============================================================
@@ -108,15 +167,28 @@ class ColetasRepository:
 
     def verify_last_collection(self, fonte: str) -> Dict[str, Any]:
         """
-        MODO LOCAL: Verifica último arquivo JSON salvo.
+        MODO LOCAL: Verifica a última coleta salva (manifesto).
         """
         # ============================================================
         # 🔴 INÍCIO MODIFICAÇÃO LOCAL
         # ============================================================
         
         try:
+            # Manifesto da última coleta: O(1), sem abrir o NDJSON
+            manifesto = ler_ultimo(self.local_data_dir, fonte)
+            if manifesto is not None:
+                return {
+                    "found": True,
+                    "arquivo": manifesto["arquivo"],
+                    "items_count": manifesto.get("total_itens", 0),
+                    "timestamp": manifesto.get("timestamp"),
+                    "status": manifesto.get("status"),
+                    "sha256": manifesto.get("sha256"),
+                }
+
+            # Coletas antigas (JSON único)
             arquivos = [f for f in os.listdir(self.local_data_dir) 
-                       if f.startswith(fonte) and f.endswith(".json")]
+                       if f.startswith(fonte) and f.endswith(".json") and not f.endswith(".manifest.json")]
             
             if not arquivos:
                 return {"found": False, "msg": "Nenhuma coleta encontrada"}
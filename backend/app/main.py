@@ -17,7 +17,11 @@ from backend.app.api.routers import health, pages
 from backend.app.api.routers.pncp import router as pncp_router_refactored
 from backend.app.api.routers.pgc import router as pgc_router
 from backend.app.api.routers.coleta_unificada import router as coleta_unificada_router
+from backend.app.api.routers.jobs import router as jobs_router
+from backend.app.api.routers.metrics import router as metrics_router
+from backend.app.core import metrics
 from backend.app.core.logging_config import setup_logging
+from backend.app.services.jobs import falhar_orfaos_locais
 
 # ============================================================
 # 🔴 INÍCIO MODIFICAÇÃO LOCAL - REMOVER QUANDO VOLTAR DOCKER
@@ -83,6 +87,13 @@ async def log_requests(request: Request, call_next):
     response = await call_next(request)
     duration = (time.time() - start) * 1000
     logger.info(f"← {request.method} {request.url.path} [{response.status_code}] {duration:.2f}ms")
+    # Template da rota (ex.: /api/jobs/{job_id}) para não explodir a cardinalidade
+    route = request.scope.get("route")
+    metrics.HTTP.labels(
+        metodo=request.method,
+        rota=getattr(route, "path", "nao_mapeada"),
+        status=str(response.status_code),
+    ).observe(duration / 1000)
     return response
 
 # ============================================================
@@ -111,6 +122,8 @@ app.include_router(pages.router, tags=["pages"])
 app.include_router(pncp_router_refactored)
 app.include_router(pgc_router)
 app.include_router(coleta_unificada_router)
+app.include_router(jobs_router)
+app.include_router(metrics_router, tags=["metrics"])
 
 # ============================================================
 # EVENTS
@@ -141,6 +154,13 @@ async def startup_event():
     # ============================================================
     # 🔴 FIM MODIFICAÇÃO LOCAL
     # ============================================================
+
+    # Jobs de BackgroundTasks não sobrevivem ao processo: os que ficaram
+    # "running" de uma execução anterior não terminariam nunca
+    try:
+        falhar_orfaos_locais()
+    except Exception as e:
+        logger.error(f"[JOB] Falha ao verificar jobs órfãos: {e}")
         
     logger.info("=" * 70)
 
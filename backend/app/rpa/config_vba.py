@@ -75,6 +75,86 @@ def set_pncp_real_enabled(active: bool):
     logger.info(f"Feature Flag PNCP_REAL {'ATIVADA' if active else 'DESATIVADA'}.")
 
 
+def _env_flag(name: str, default: bool) -> bool:
+    """Lê uma flag booleana de variável de ambiente (true/1/yes)."""
+    env_flag = os.getenv(name)
+    if env_flag is None:
+        return default
+    return env_flag.lower() in ("true", "1", "yes")
+
+
+def is_pncp_batch_extract_enabled() -> bool:
+    """
+    Extração PNCP em lote: um execute_script por bloco de cards em vez de
+    um find_element por campo. Desative com PNCP_BATCH_EXTRACT=false.
+    """
+    return _env_flag("PNCP_BATCH_EXTRACT", True)
+
+
+def get_pncp_batch_chunk_size() -> int:
+    """Quantidade de cards lidos por execute_script (PNCP_BATCH_CHUNK)."""
+    try:
+        return max(1, int(os.getenv("PNCP_BATCH_CHUNK", "250")))
+    except ValueError:
+        return 250
+
+
+def is_pncp_streaming_scroll_enabled() -> bool:
+    """
+    Coleta PNCP em passada única: extrai os cards renderizados a cada passo
+    de rolagem (tabelas virtualizadas). Ative com PNCP_STREAMING_SCROLL=true.
+    """
+    return _env_flag("PNCP_STREAMING_SCROLL", False)
+
+
+def is_pncp_parallel_tabs_enabled() -> bool:
+    """
+    Coleta as abas do PNCP (reprovadas/aprovadas/pendentes) ao mesmo tempo,
+    cada uma numa janela da mesma sessão. Ative com PNCP_PARALLEL_TABS=true.
+    """
+    return _env_flag("PNCP_PARALLEL_TABS", False)
+
+
+def is_vba_spinner_loop_enabled() -> bool:
+    """
+    testa_spinner fiel ao VBA (find_elements a cada 0.1s) em vez do
+    MutationObserver. Ative com VBA_SPINNER_LOOP=true.
+    """
+    return _env_flag("VBA_SPINNER_LOOP", False)
+
+
+def is_network_idle_wait_enabled() -> bool:
+    """
+    Troca as esperas fixas (Application.Wait) por espera de rede ociosa
+    (XHR/fetch em voo). Desative com NETWORK_IDLE_WAIT=false.
+    """
+    return _env_flag("NETWORK_IDLE_WAIT", True)
+
+
+def get_network_quiet_ms() -> int:
+    """Janela (ms) sem requisições para considerar a rede ociosa (NETWORK_QUIET_MS)."""
+    try:
+        return max(0, int(os.getenv("NETWORK_QUIET_MS", "300")))
+    except ValueError:
+        return 300
+
+
+def is_webdriver_trace_enabled() -> bool:
+    """
+    Registra cada comando WebDriver (duração, etapa e método chamador) e loga
+    o resumo no fim da coleta (webdriver_trace). Ative com WEBDRIVER_TRACE=true.
+    """
+    return _env_flag("WEBDRIVER_TRACE", False)
+
+
+def get_spinner_settle_ms() -> int:
+    """Janela (ms) em que o spinner, depois de visto, deve ficar ausente (SPINNER_SETTLE_MS)."""
+    try:
+        return max(0, int(os.getenv("SPINNER_SETTLE_MS", "100")))
+    except ValueError:
+        return 100
+
+
 # Por padrão, o modo compatibilidade deve ser ativado para replicar o comportamento inicial
 set_vba_compat_mode(True)
 
@@ -21,6 +21,8 @@ import time
 import logging
 from typing import Optional, Dict
 
+from ..core.metrics import OCR_PAGINAS, OCR_SEGUNDOS
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
@@ -151,6 +153,7 @@ def extract_text(path: str, lang: str = "por", preprocess: bool = True, tesserac
     if not os.path.exists(path):
         raise FileNotFoundError(f"Arquivo não encontrado: {path}")
 
+    inicio = time.perf_counter()
     _, ext = os.path.splitext(path.lower())
     texts = []
     confs = []
@@ -193,6 +196,8 @@ def extract_text(path: str, lang: str = "por", preprocess: bool = True, tesserac
     full_text = "\n\n---PAGE_BREAK---\n\n".join(t.strip() for t in texts if t is not None)
     avg_conf = float(sum(confs) / len(confs)) if confs else None
 
+    OCR_PAGINAS.inc(pages)
+    OCR_SEGUNDOS.observe(time.perf_counter() - inicio)
     return {"text": full_text, "conf": avg_conf, "pages": pages}
 
 # ---------------------------------------------------------------------
@@ -0,0 +1,157 @@
+"""
+dom_batch.py
+
+Leituras em lote do DOM executadas dentro do navegador.
+Cada função faz UMA chamada execute_script e devolve estruturas simples
+(listas/dicts de texto), evitando uma ida ao chromedriver por elemento.
+
+Convenção "On Error Resume Next": um campo/nó que não existe (ou cujo XPath
+falha) volta como None, e quem chama decide o valor padrão.
+"""
+import logging
+from typing import Dict, List, Optional
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+# Avalia, para cada índice do intervalo, o XPath base do card e os sufixos
+# de campo relativos a ele. O texto segue o WebElement.text (innerText + trim).
+_JS_READ_CARDS = r"""
+const tmpl = arguments[0];
+const fields = arguments[1];
+const start = arguments[2];
+const end = arguments[3];
+
+function first(xpath, ctx) {
+    try {
+        return document.evaluate(
+            xpath, ctx || document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+        ).singleNodeValue;
+    } catch (e) {
+        return null;
+    }
+}
+
+function text(node) {
+    if (!node) return null;
+    const raw = (node.innerText !== undefined) ? node.innerText : node.textContent;
+    return (raw || '').trim();
+}
+
+const out = [];
+for (let i = start; i <= end; i++) {
+    const base = first(tmpl.split('{index}').join(String(i)));
+    const row = {};
+    for (const key in fields) {
+        row[key] = base ? text(first('.' + fields[key], base)) : null;
+    }
+    out.push(row);
+}
+return out;
+"""
+
+
+def read_cards(
+    driver: WebDriver,
+    base_template: str,
+    fields: Dict[str, str],
+    start: int,
+    end: int,
+) -> List[Dict[str, Optional[str]]]:
+    """
+    Lê os cards `start..end` (inclusive, base 1) de um template XPath com
+    `{index}` e devolve uma linha por card: {campo: texto ou None}.
+
+    `fields` mapeia nome -> sufixo XPath (ex.: pncp_xpaths.json["fields"]),
+    avaliado relativo ao nó base do card.
+    """
+    if end < start:
+        return []
+    rows = driver.execute_script(_JS_READ_CARDS, base_template, fields, start, end)
+    if not isinstance(rows, list):
+        raise ValueError(f"Retorno inesperado da leitura em lote: {type(rows).__name__}")
+    return [r if isinstance(r, dict) else {} for r in rows]
+
+
+# Lê matrizes de células. mode "rows": o XPath seleciona <tr>; mode "tables":
+# o alvo é um <table> (WebElement) ou um XPath que seleciona tabelas.
+# Células seguem o find_elements(By.TAG_NAME, "td") (descendentes do <tr>).
+_JS_READ_TABLES = r"""
+const target = arguments[0];
+const mode = arguments[1];
+const probe = arguments[2];
+
+function text(node) {
+    if (!node) return '';
+    const raw = (node.innerText !== undefined) ? node.innerText : node.textContent;
+    return (raw || '').trim();
+}
+
+function nodes(xpath) {
+    const r = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const out = [];
+    for (let i = 0; i < r.snapshotLength; i++) out.push(r.snapshotItem(i));
+    return out;
+}
+
+function cells(tr) {
+    return Array.from(tr.querySelectorAll('td')).map(text);
+}
+
+function probed(tr) {
+    if (!probe) return false;
+    try {
+        return !!document.evaluate(
+            probe, tr, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+        ).singleNodeValue;
+    } catch (e) {
+        return false;
+    }
+}
+
+if (mode === 'rows') {
+    return nodes(target).map(cells);
+}
+
+const tables = (typeof target === 'string') ? nodes(target) : [target];
+return tables.map(function (t) {
+    const trs = Array.from(t.querySelectorAll('tbody tr'));
+    return {
+        headers: Array.from(t.querySelectorAll('thead th')).map(text),
+        has_body: t.querySelector('tbody') !== null,
+        rows: trs.map(cells),
+        probes: trs.map(probed),
+    };
+});
+"""
+
+
+def read_rows(driver: WebDriver, rows_xpath: str) -> List[List[str]]:
+    """
+    Devolve o texto de todas as células (<td>) de cada <tr> selecionado por
+    `rows_xpath`, numa única chamada: [[célula, ...], ...].
+    """
+    rows = driver.execute_script(_JS_READ_TABLES, rows_xpath, "rows", None)
+    if not isinstance(rows, list):
+        raise ValueError(f"Retorno inesperado da leitura de linhas: {type(rows).__name__}")
+    return [r if isinstance(r, list) else [] for r in rows]
+
+
+def read_tables(driver: WebDriver, target, row_probe_xpath: Optional[str] = None) -> List[Dict]:
+    """
+    Lê uma ou mais tabelas numa única chamada.
+
+    `target` é um WebElement <table> ou um XPath que seleciona tabelas.
+    Cada tabela volta como {"headers", "has_body", "rows", "probes"}, onde
+    `probes[i]` indica se `row_probe_xpath` (relativo ao <tr>) existe na linha i.
+    """
+    tables = driver.execute_script(_JS_READ_TABLES, target, "tables", row_probe_xpath)
+    if not isinstance(tables, list):
+        raise ValueError(f"Retorno inesperado da leitura de tabelas: {type(tables).__name__}")
+    return [t for t in tables if isinstance(t, dict)]
+
+
+def cell(cols: List[str], index: int) -> str:
+    """Célula pelo índice 1-based do VBA (data(r, n)); vazio se não existir."""
+    return cols[index - 1].strip() if 0 < index <= len(cols) else ""
@@ -23,6 +23,10 @@ from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.remote.webdriver import WebDriver
 
+from ..core.metrics import instrumentar_driver
+from .config_vba import is_webdriver_trace_enabled
+from .webdriver_trace import instrumentar
+
 try:
     from webdriver_manager.chrome import ChromeDriverManager
 except Exception:  # pragma: no cover
@@ -42,6 +46,9 @@ def _apply_vba_driver_settings(driver: WebDriver) -> None:
         driver.switch_to.default_content()
     except Exception:
         pass
+    instrumentar_driver(driver)
+    if is_webdriver_trace_enabled():
+        instrumentar(driver)
 
 
 def _find_chromedriver_in_cache() -> Optional[str]:
@@ -15,14 +15,21 @@ Mudança chave:
 
 import json
 import logging
+import math
 import os
+import re
 from typing import Dict, List, Optional, Any
 
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import WebDriverException
 
 from .vba_compat import VBACompat, CheckpointFailureError
+from .dom_batch import read_rows, cell
+from .webdriver_trace import etapa, etapa_webdriver, resumo_webdriver
+from ..core.metrics import ITENS, PAGINAS
+from ..core.job_context import publicar_item, reportar_progresso
 from .driver_factory import create_attached_driver
 from .chrome_attach import (
     start_manual_login_session_local,
@@ -44,6 +51,7 @@ class PGCScraperVBA:
         self.compat = VBACompat(driver)
         self.data_collected = []
 
+    @etapa("login")
     def A_Loga_Acessa_PGC(self) -> bool:
         """
         Ponto de transição igual ao VBA:
@@ -90,42 +98,54 @@ class PGCScraperVBA:
         logger.info("PGC acessado com sucesso (Selenium anexado pós-login).")
         return True
 
+    @resumo_webdriver("PGC")
     def A1_Demandas_DFD_PCA(self) -> List[Dict[str, Any]]:
         logger.info("=== INICIANDO COLETA DE DFDs (Lógica VBA) ===")
 
-        try:
-            self.compat.validate_table_context(
-                "Planejamento e Gerenciamento de Contratações",
-                ["DFD", "Requisitante", "Valor"],
-            )
-        except CheckpointFailureError as e:
-            logger.error(f"Contexto da tabela inválido. Abortando coleta: {e}")
-            return []
+        with etapa_webdriver("contexto"):
+            try:
+                self.compat.validate_table_context(
+                    "Planejamento e Gerenciamento de Contratações",
+                    ["DFD", "Requisitante", "Valor"],
+                )
+            except CheckpointFailureError as e:
+                logger.error(f"Contexto da tabela inválido. Abortando coleta: {e}")
+                return []
 
-        self.compat.safe_click(XPATHS["pca_selection"]["dropdown_pca"])
-        li_pca_xpath = XPATHS["pca_selection"]["li_pca_ano_template"].replace("{ano}", self.ano_ref)
-        self.compat.safe_click(li_pca_xpath)
+            self.compat.safe_click(XPATHS["pca_selection"]["dropdown_pca"])
+            li_pca_xpath = XPATHS["pca_selection"]["li_pca_ano_template"].replace("{ano}", self.ano_ref)
+            self.compat.safe_click(li_pca_xpath)
 
-        self.compat.safe_click(f"//*[@id='{XPATHS['pca_selection']['radio_minha_uasg_id']}']")
+            self.compat.safe_click(f"//*[@id='{XPATHS['pca_selection']['radio_minha_uasg_id']}']")
 
-        try:
-            self.compat.wait_for_checkpoint(XPATHS["table"]["rows"], timeout=15)
-        except CheckpointFailureError:
-            logger.error("Falha no checkpoint da tabela de DFDs após seleção de PCA/UASG.")
-            return []
+            try:
+                self.compat.wait_for_checkpoint(XPATHS["table"]["rows"], timeout=15)
+            except CheckpointFailureError:
+                logger.error("Falha no checkpoint da tabela de DFDs após seleção de PCA/UASG.")
+                return []
 
-        self.compat.testa_spinner()
+            self.compat.testa_spinner()
+        self._maximize_rows_per_page()
 
         all_data = []
         pos = 1
         posM = self._count_total_pages()
-        logger.info(f"Total de páginas detectadas (VBA): {posM}")
-        self._go_to_first_page()
+        if posM:
+            logger.info(f"Total de páginas detectadas (paginador): {posM}")
+        else:
+            logger.info("Total de páginas não exposto pelo paginador; contando durante a coleta.")
+        if self._current_page_number() not in (None, 1):
+            self._go_to_first_page()
 
         while True:
-            logger.info(f"Coletando página {pos}/{posM}")
+            logger.info(f"Coletando página {pos}/{posM or '?'}")
             page_data = self._collect_current_page_rows()
             all_data.extend(page_data)
+            for row in page_data:
+                publicar_item("PGC", row)
+            PAGINAS.labels(fonte="PGC").inc()
+            ITENS.labels(fonte="PGC", aba="dfd").inc(len(page_data))
+            reportar_progresso("PGC", pagina=pos, paginas=posM, itens=len(all_data))
 
             if not self._has_next_page():
                 break
@@ -133,16 +153,97 @@ class PGCScraperVBA:
             self._go_next_page()
             pos += 1
 
-        logger.info(f"Coleta concluída. Total de registros: {len(all_data)}")
+        logger.info(f"Coleta concluída. Páginas: {pos}. Total de registros: {len(all_data)}")
         return all_data
 
-    def _count_total_pages(self) -> int:
-        count = 1
-        while self._has_next_page():
-            self._go_next_page()
-            count += 1
-        return count
+    @etapa("paginacao")
+    def _maximize_rows_per_page(self) -> None:
+        """
+        Seleciona a maior opção do dropdown "linhas por página" do p-paginator,
+        reduzindo o número de trocas de página. Se o dropdown não existir ou
+        falhar, segue com o tamanho padrão do portal.
+        """
+        dropdown_xpath = XPATHS["pagination"].get("dropdown_rows")
+        options_xpath = XPATHS["pagination"].get("dropdown_rows_options")
+        if not dropdown_xpath or not options_xpath:
+            return
+        if not self.driver.find_elements(By.XPATH, dropdown_xpath):
+            logger.info("Paginador sem seletor de linhas por página; usando tamanho padrão.")
+            return
+
+        try:
+            if not self.compat.safe_click(dropdown_xpath):
+                return
+            options = self.driver.find_elements(By.XPATH, options_xpath)
+            best, best_rows = None, 0
+            for opt in options:
+                digits = re.sub(r"\D", "", opt.text or "")
+                if digits and int(digits) > best_rows:
+                    best, best_rows = opt, int(digits)
+
+            if best is None:
+                logger.info("Dropdown de linhas por página sem opções numéricas; usando tamanho padrão.")
+                self._close_overlay()
+                return
+            if (best.get_attribute("aria-selected") or "").lower() == "true":
+                logger.info(f"Linhas por página já no máximo ({best_rows}).")
+                self._close_overlay()
+                return
+
+            best.click()
+            self.compat.testa_spinner()
+            self.compat.wait_network_idle(0)
+            logger.info(f"Linhas por página ajustadas para {best_rows}.")
+        except Exception as e:
+            logger.warning(f"Não foi possível ajustar linhas por página ({e}); usando tamanho padrão.")
+            self._close_overlay()
+
+    def _close_overlay(self) -> None:
+        try:
+            self.driver.find_element(By.TAG_NAME, "body").send_keys(Keys.ESCAPE)
+        except Exception:
+            pass
+
+    @etapa("paginacao")
+    def _count_total_pages(self) -> Optional[int]:
+        """
+        Lê o total de páginas do DOM do paginador, sem navegar.
 
+        Usa o label p-paginator-current ("Página X de N" ou "A - B de T
+        registros"); sem label, não há como saber o total sem clicar e o
+        chamador conta as páginas durante a coleta (retorna None).
+        """
+        label_xpath = XPATHS["pagination"].get("label_current")
+        if not label_xpath:
+            return None
+        try:
+            text = self.driver.find_element(By.XPATH, label_xpath).text
+        except Exception:
+            return None
+
+        nums = [int(n) for n in re.findall(r"\d+", text.replace(".", ""))]
+        if len(nums) == 2:
+            # "Página {currentPage} de {totalPages}"
+            return max(nums[1], 1)
+        if len(nums) >= 3:
+            # "{first} - {last} de {totalRecords}"
+            first, last, total = nums[0], nums[1], nums[2]
+            per_page = last - first + 1
+            if per_page > 0:
+                return max(math.ceil(total / per_page), 1)
+        return None
+
+    @etapa("paginacao")
+    def _current_page_number(self) -> Optional[int]:
+        current_xpath = XPATHS["pagination"].get("btn_current_page")
+        if not current_xpath:
+            return None
+        try:
+            return int(self.driver.find_element(By.XPATH, current_xpath).text.strip())
+        except Exception:
+            return None
+
+    @etapa("paginacao")
     def _go_to_first_page(self) -> None:
         first_xpath = XPATHS["pagination"].get("btn_first")
         if first_xpath:
@@ -161,6 +262,7 @@ class PGCScraperVBA:
                 self.compat.safe_click(prev_xpath)
                 self.compat.testa_spinner()
 
+    @etapa("paginacao")
     def _has_prev_page(self) -> bool:
         prev_xpath = XPATHS["pagination"].get("btn_prev")
         if not prev_xpath:
@@ -171,6 +273,7 @@ class PGCScraperVBA:
         except Exception:
             return False
 
+    @etapa("paginacao")
     def _has_next_page(self) -> bool:
         next_xpath = XPATHS["pagination"].get("btn_next")
         if not next_xpath:
@@ -181,30 +284,48 @@ class PGCScraperVBA:
         except Exception:
             return False
 
+    @etapa("paginacao")
     def _go_next_page(self) -> None:
         next_xpath = XPATHS["pagination"].get("btn_next")
         if not next_xpath:
             raise RuntimeError("XPath de próxima página não configurado em pgc_xpaths.json")
         self.compat.safe_click(next_xpath)
         self.compat.testa_spinner()
+        self.compat.wait_network_idle(0)
 
+    @etapa("extracao")
     def _collect_current_page_rows(self) -> List[Dict[str, Any]]:
+        """
+        Lê as linhas da página atual numa única chamada (dom_batch.read_rows)
+        e mapeia as colunas pelos índices do VBA em table_columns (data(r, n),
+        1-based). As chaves são os cabeçalhos da aba PGC do Excel
+        (excel_persistence._aplicar_pgc). Se a leitura em lote falhar, lê
+        célula a célula.
+        """
         rows_xpath = XPATHS["table"]["rows"]
-        rows = self.driver.find_elements(By.XPATH, rows_xpath)
-        data = []
-        for r in rows:
-            try:
-                cols = r.find_elements(By.TAG_NAME, "td")
-                if not cols:
+        try:
+            matrix = read_rows(self.driver, rows_xpath)
+        except Exception as e:
+            logger.warning(f"Leitura em lote da tabela falhou ({e}); lendo célula a célula.")
+            matrix = []
+            for r in self.driver.find_elements(By.XPATH, rows_xpath):
+                try:
+                    matrix.append([td.text.strip() for td in r.find_elements(By.TAG_NAME, "td")])
+                except Exception:
                     continue
-                row_dict = {
-                    "DFD": cols[0].text.strip() if len(cols) > 0 else "",
-                    "Requisitante": cols[1].text.strip() if len(cols) > 1 else "",
-                    "Valor": cols[2].text.strip() if len(cols) > 2 else "",
-                }
-                data.append(row_dict)
-            except Exception:
+
+        idx = XPATHS["table_columns"]
+        data = []
+        for cols in matrix:
+            if not cols:
                 continue
+            data.append({
+                "DFD": cell(cols, idx["index_dfd"]),
+                "Requisitante": cell(cols, idx["index_requisitante"]),
+                "Descrição": cell(cols, idx["index_descricao"]),
+                "Valor": cell(cols, idx["index_valor"]),
+                "Situação": cell(cols, idx["index_situacao"]),
+            })
         return data
 
 
@@ -9,6 +9,7 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from ..config import config
 from .dfd_ocr import perform_ocr_on_dfd
+from .dom_batch import read_tables
 import time
 from typing import Dict, Any
 
@@ -78,21 +79,15 @@ def extract_item_details(driver) -> Dict[str, Any]:
     except Exception:
         pass
 
-    # tables: discover tables within the item
+    # tables: discover tables within the item (one execute_script for all cells)
     try:
-        tables = driver.find_elements(By.XPATH, "//table")
-        for t in tables:
-            try:
-                hdrs = [th.text.strip() for th in t.find_elements(By.XPATH, ".//thead//th")]
-                body_rows = []
-                for tr in t.find_elements(By.XPATH, ".//tbody//tr"):
-                    cols = [td.text.strip() for td in tr.find_elements(By.XPATH, ".//td")]
-                    body_rows.append(cols)
-                details["tables"].append({"headers": hdrs, "rows": body_rows})
-            except Exception:
-                continue
+        details["tables"] = [
+            {"headers": t["headers"], "rows": t["rows"]}
+            for t in read_tables(driver, "//table")
+        ]
     except Exception:
-        pass
+        details["tables"] = []
+        _extract_tables_legacy(driver, details)
 
     # DFD: find image or link with DFD and call OCR stub
     try:
@@ -121,3 +116,21 @@ def extract_item_details(driver) -> Dict[str, Any]:
         pass
 
     return details
+
+
+def _extract_tables_legacy(driver, details: Dict[str, Any]):
+    """Leitura elemento a elemento (fallback da leitura em lote)."""
+    try:
+        tables = driver.find_elements(By.XPATH, "//table")
+        for t in tables:
+            try:
+                hdrs = [th.text.strip() for th in t.find_elements(By.XPATH, ".//thead//th")]
+                body_rows = []
+                for tr in t.find_elements(By.XPATH, ".//tbody//tr"):
+                    cols = [td.text.strip() for td in tr.find_elements(By.XPATH, ".//td")]
+                    body_rows.append(cols)
+                details["tables"].append({"headers": hdrs, "rows": body_rows})
+            except Exception:
+                continue
+    except Exception:
+        pass
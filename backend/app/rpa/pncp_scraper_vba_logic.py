@@ -3,18 +3,31 @@ pncp_scraper_vba_logic.py
 Implementação FINAL, 100% FIEL e COMPLETA à lógica do Módulo1.bas (VBA) para o PNCP.
 Mantém todos os logs de auditoria, tratamentos de erro granulares e lógica de persistência.
 """
+import contextvars
 import json
 import logging
 import os
 import re
+import threading
 import time
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.common.by import By
 from .vba_compat import VBACompat
+from .config_vba import (
+    is_pncp_batch_extract_enabled,
+    get_pncp_batch_chunk_size,
+    is_pncp_streaming_scroll_enabled,
+    is_pncp_parallel_tabs_enabled,
+)
+from .dom_batch import read_cards
+from .webdriver_trace import compartilhar_rastreador, etapa, resumo_webdriver
 from ..api.schemas import PNCPItemSchema
-from .driver_factory import create_driver
+from ..core.auditoria import auditar_itens
+from ..core.metrics import ITENS, ROLAGENS
+from ..core.job_context import publicar_item, reportar_progresso
+from .driver_factory import create_driver, create_attached_driver
 
 # Configuração de Logger para Auditoria (Fidelidade Passo 4.2)
 logger = logging.getLogger(__name__)
@@ -24,6 +37,9 @@ XPATHS_PATH = os.path.join(os.path.dirname(__file__), "pncp_xpaths.json")
 with open(XPATHS_PATH, "r", encoding="utf-8") as f:
     XPATHS = json.load(f)
 
+# Ordem de coleta do VBA: REPROVADAS -> APROVADAS -> PENDENTES
+ABAS_PNCP = [("reprovadas", "REPROVADA"), ("aprovadas", "APROVADA"), ("pendentes", "PENDENTE")]
+
 def so_numero(text: str) -> str:
     """Emula a função SoNumero do VBA para limpeza de strings."""
     if not text:
@@ -42,22 +58,22 @@ class PNCPScraperVBA:
         self.compat = VBACompat(driver)
         self.data_collected = []
 
+    @resumo_webdriver("PNCP")
     def Dados_PNCP(self) -> List[Dict[str, Any]]:
         """Replica Sub Dados_PNCP() do VBA. Entrypoint principal."""
         logger.info(f"=== [INÍCIO] COLETA PNCP REAL - ANO REF: {self.ano_ref} ===")
         
         try:
-            self._preparar_navegação_inicial()
-            self._selecionar_ano_pca()
+            if is_pncp_parallel_tabs_enabled():
+                self._coletar_abas_em_paralelo()
+            else:
+                self._preparar_navegação_inicial()
+                self._selecionar_ano_pca()
 
-            # --- COLETA POR ABAS (REPROVADAS -> APROVADAS -> PENDENTES) ---
-            # Passo 4.2: Logs de auditoria fiéis ao VBA
-            for aba_id, status in [("reprovadas", "REPROVADA"), ("aprovadas", "APROVADA"), ("pendentes", "PENDENTE")]:
-                try:
-                    logger.info(f"[LOG-VBA] Localizando demandas {aba_id}...")
-                    self._coletar_aba(aba_id, status)
-                except Exception as e:
-                    logger.error(f"[ERRO-ABA] Falha na aba {aba_id.upper()}: {e}. Prosseguindo...")
+                # --- COLETA POR ABAS (REPROVADAS -> APROVADAS -> PENDENTES) ---
+                # Passo 4.2: Logs de auditoria fiéis ao VBA
+                for aba_id, status in ABAS_PNCP:
+                    self._coletar_aba_protegida(aba_id, status)
 
         except Exception as e:
             logger.exception(f"[ERRO-FATAL] Exceção no fluxo Dados_PNCP: {e}")
@@ -65,6 +81,127 @@ class PNCPScraperVBA:
         logger.info(f"=== [FIM] COLETA PNCP CONCLUÍDA. TOTAL: {len(self.data_collected)} ITENS ===")
         return self.data_collected
 
+    def _coletar_aba_protegida(self, aba_id: str, status: str) -> bool:
+        """Coleta uma aba sem interromper as demais em caso de erro."""
+        try:
+            logger.info(f"[LOG-VBA] Localizando demandas {aba_id}...")
+            self._coletar_aba(aba_id, status)
+            return True
+        except Exception as e:
+            logger.error(f"[ERRO-ABA] Falha na aba {aba_id.upper()}: {e}. Prosseguindo...")
+            return False
+
+    def _coletar_abas_em_paralelo(self):
+        """
+        Modo opcional (PNCP_PARALLEL_TABS): a primeira aba roda nesta janela e
+        as demais em janelas abertas com window.open (mesma sessão/cookies e
+        cópia do sessionStorage). Cada janela ganha um WebDriver próprio,
+        anexado ao mesmo Chrome pelo debuggerAddress. O tempo total passa a
+        ser o da maior aba. Qualquer aba que falhe na janela extra é coletada
+        depois, em sequência, nesta janela.
+        """
+        debugger_address = (self.driver.capabilities.get("goog:chromeOptions") or {}).get("debuggerAddress")
+        if not debugger_address:
+            logger.warning("[AVISO-VBA] debuggerAddress indisponível; coleta PNCP sequencial.")
+            self._preparar_navegação_inicial()
+            self._selecionar_ano_pca()
+            for aba_id, status in ABAS_PNCP:
+                self._coletar_aba_protegida(aba_id, status)
+            return
+
+        janela_principal = self.driver.current_window_handle
+        url_inicial = self.driver.current_url
+        janelas = {}
+        for aba_id, _ in ABAS_PNCP[1:]:
+            antes = set(self.driver.window_handles)
+            self.driver.execute_script(
+                "window.open(arguments[0], '_blank', 'popup=1,width=1280,height=900');", url_inicial
+            )
+            novas = [h for h in self.driver.window_handles if h not in antes]
+            if novas:
+                janelas[aba_id] = novas[0]
+        self.driver.switch_to.window(janela_principal)
+        logger.info(f"[LOG-VBA] Coleta paralela: {len(janelas) + 1} janela(s) para as abas PNCP.")
+
+        resultados: Dict[str, Optional[List[Dict[str, Any]]]] = {}
+        threads = [
+            threading.Thread(
+                target=contextvars.copy_context().run,
+                args=(self._coletar_aba_em_janela, debugger_address, handle, aba_id, dict(ABAS_PNCP)[aba_id], resultados),
+                name=f"pncp-{aba_id}",
+                daemon=True,
+            )
+            for aba_id, handle in janelas.items()
+        ]
+        for t in threads:
+            t.start()
+
+        aba_principal, status_principal = ABAS_PNCP[0]
+        self._preparar_navegação_inicial()
+        self._selecionar_ano_pca()
+        self._coletar_aba_protegida(aba_principal, status_principal)
+        coletados = {aba_principal: self.data_collected}
+
+        for t in threads:
+            t.join()
+
+        for aba_id, handle in janelas.items():
+            try:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            except Exception:
+                pass
+        self.driver.switch_to.window(janela_principal)
+
+        # Abas sem janela ou que falharam na janela extra: sequencial aqui
+        for aba_id, status in ABAS_PNCP[1:]:
+            if resultados.get(aba_id) is not None:
+                coletados[aba_id] = resultados[aba_id]
+                continue
+            logger.warning(f"[AVISO-VBA] Aba {aba_id.upper()} será coletada na janela principal.")
+            self.data_collected = []
+            self._coletar_aba_protegida(aba_id, status)
+            coletados[aba_id] = self.data_collected
+
+        self.data_collected = [item for aba_id, _ in ABAS_PNCP for item in coletados.get(aba_id, [])]
+
+    def _coletar_aba_em_janela(
+        self,
+        debugger_address: str,
+        handle: str,
+        aba_id: str,
+        status: str,
+        resultados: Dict[str, Optional[List[Dict[str, Any]]]],
+    ):
+        """Worker: anexa um WebDriver à janela `handle` e coleta uma aba."""
+        driver = None
+        try:
+            driver = create_attached_driver(debugger_address=debugger_address)
+            compartilhar_rastreador(self.driver, driver)
+            driver.switch_to.window(handle)
+            try:
+                # Janela sem foco: evita que a página se comporte como em segundo plano
+                driver.execute_cdp_cmd("Emulation.setFocusEmulationEnabled", {"enabled": True})
+            except Exception:
+                pass
+            worker = PNCPScraperVBA(driver, self.ano_ref)
+            worker._preparar_navegação_inicial()
+            worker._selecionar_ano_pca()
+            logger.info(f"[LOG-VBA] Localizando demandas {aba_id}...")
+            worker._coletar_aba(aba_id, status)
+            resultados[aba_id] = worker.data_collected
+        except Exception as e:
+            logger.error(f"[ERRO-ABA] Falha na aba {aba_id.upper()} (janela paralela): {e}")
+            resultados[aba_id] = None
+        finally:
+            if driver is not None:
+                try:
+                    # Anexado via debuggerAddress: encerra só o chromedriver
+                    driver.quit()
+                except Exception:
+                    pass
+
+    @etapa("contexto")
     def _preparar_navegação_inicial(self):
         """Sincronização e visibilidade inicial (Passo 2.1)."""
         logger.info("[LOG-VBA] Sincronizando (testa_spinner)...")
@@ -88,6 +225,7 @@ class PNCPScraperVBA:
         btn.click()
         self.compat.testa_spinner()
 
+    @etapa("contexto")
     def _selecionar_ano_pca(self):
         """Seleção do ano no dropdown PCA (Passo 2.1)."""
         logger.info("[LOG-VBA] Aguardando Dropdown PCA...")
@@ -105,15 +243,16 @@ class PNCPScraperVBA:
         li_xpath = XPATHS["pca_selection"]["li_pca_ano_template"].replace("{ano}", self.ano_ref)
         self.driver.find_element(By.XPATH, li_xpath).click()
         self.compat.testa_spinner()
-        self.compat.wait(1)
+        self.compat.wait_network_idle(1)
 
+    @etapa("aba:{aba_id}")
     def _coletar_aba(self, aba_id: str, status_vba: str):
         """Lógica de coleta por aba (Passo 2.1)."""
         logger.info(f"[LOG-VBA] Acessando aba: {aba_id.upper()}")
         btn_aba = self.driver.find_element(By.XPATH, XPATHS["tabs"][aba_id])
         self.driver.execute_script("arguments[0].scrollIntoView();", btn_aba)
         btn_aba.click()
-        self.compat.wait(1)
+        self.compat.wait_network_idle(1)
         self.compat.testa_spinner()
         
         xpath_vazio = f"//div[@aria-labelledby='{aba_id}']/div[@class='search-results']/div/div/div/div/div[2]/span"
@@ -127,6 +266,12 @@ class PNCPScraperVBA:
             return
 
         logger.info(f"[LOG-VBA] Total de demandas {aba_id}: {demandas}")
+        reportar_progresso("PNCP", aba=aba_id, demandas=demandas)
+        if is_pncp_streaming_scroll_enabled():
+            logger.info(f"[LOG-VBA] Rolando e varrendo as demandas {aba_id} (streaming)...")
+            self._coletar_aba_streaming(aba_id, demandas)
+            return
+
         self._executar_rolagem_tabela(aba_id, demandas)
         logger.info(f"[LOG-VBA] Varrendo as demandas {aba_id}...")
         self._extrair_itens_tabela(aba_id, demandas)
@@ -283,6 +428,68 @@ class PNCPScraperVBA:
             except:
                 return 0
 
+    def _localizar_container_rolagem(self, xpath_tbody: str):
+        """
+        Localiza o tbody da aba e o container realmente scrollável acima dele.
+        Retorna None se o tbody não existir.
+        """
+        try:
+            tbody_el = self.driver.find_element(By.XPATH, xpath_tbody)
+        except Exception as e:
+            logger.warning(f"[LOG-VBA] Não foi possível localizar tbody para rolagem: {e}")
+            return None
+
+        try:
+            # tenta dar foco (como no VBA)
+            try:
+                tbody_el.click()
+            except:
+                pass
+
+            container = self._get_scrollable_container(tbody_el)
+
+            # fallback se não achou container: tenta usar o próprio tbody
+            if container is None:
+                container = tbody_el
+        except:
+            container = tbody_el
+        return container
+
+    def _rolar_container(self, container, step_px: int):
+        """Rola `step_px` pixels no container certo (ou no window, em último caso)."""
+        try:
+            # garante que o container esteja em viewport (só por segurança)
+            try:
+                self.driver.execute_script("arguments[0].scrollIntoView({block:'center'});", container)
+            except:
+                pass
+
+            # scroll “à la VBA”, mas no elemento certo
+            js_scroll = r"""
+            const el = arguments[0];
+            const step = arguments[1];
+
+            // se for o documentElement/body, usa window
+            if (el === document.body || el === document.documentElement) {
+                window.scrollBy(0, step);
+                return;
+            }
+
+            // caso container comum
+            el.scrollTop = el.scrollTop + step;
+
+            // força disparo de evento scroll (alguns frameworks escutam isso)
+            el.dispatchEvent(new Event('scroll', { bubbles: true }));
+            """
+            self.driver.execute_script(js_scroll, container, step_px)
+        except Exception:
+            # fallback extremo: tenta window
+            try:
+                self.driver.execute_script("window.scrollBy(0, arguments[0]);", step_px)
+            except:
+                pass
+
+    @etapa("rolagem")
     def _executar_rolagem_tabela(self, aba_id: str, demandas: int):
         """
         Executa a rolagem para carregar todos os itens (estilo VBA),
@@ -304,31 +511,11 @@ class PNCPScraperVBA:
         logger.info(f"[LOG-VBA] Rolando para carregar até {demandas} itens...")
 
         # 1) localizar o tbody e o container scrollável correto
-        tbody_el = None
-        container = None
-
-        try:
-            tbody_el = self.driver.find_element(By.XPATH, xpath_tbody)
-        except Exception as e:
-            logger.warning(f"[LOG-VBA] Não foi possível localizar tbody para rolagem: {e}")
+        container = self._localizar_container_rolagem(xpath_tbody)
+        if container is None:
             self.compat.testa_spinner()
             return
 
-        try:
-            # tenta dar foco (como no VBA)
-            try:
-                tbody_el.click()
-            except:
-                pass
-
-            container = self._get_scrollable_container(tbody_el)
-
-            # fallback se não achou container: tenta usar o próprio tbody
-            if container is None:
-                container = tbody_el
-        except:
-            container = tbody_el
-
         # 2) loop de rolagem com “estabilização” (robusto para virtualização)
         start = time.time()
         timeout_s = 180
@@ -358,9 +545,10 @@ class PNCPScraperVBA:
                 stagnant_rounds = 0
                 last_count = current_count
 
-            logger.info(
-                f"[LOG-VBA] Itens visíveis/carregados: {current_count}/{demandas} | "
-                f"estagnado: {stagnant_rounds}/{max_stagnant_rounds}"
+            # Uma linha por passo de rolagem: só em DEBUG, formatada sob demanda
+            logger.debug(
+                "[LOG-VBA] Itens visíveis/carregados: %s/%s | estagnado: %s/%s",
+                current_count, demandas, stagnant_rounds, max_stagnant_rounds,
             )
 
             # se não cresce mais, provavelmente chegou no fim do que a tela consegue carregar
@@ -372,102 +560,221 @@ class PNCPScraperVBA:
                 break
 
             # 3) rolar no container certo
-            try:
-                # garante que o container esteja em viewport (só por segurança)
-                try:
-                    self.driver.execute_script("arguments[0].scrollIntoView({block:'center'});", container)
-                except:
-                    pass
+            self._rolar_container(container, step_px)
+            ROLAGENS.labels(fonte="PNCP", aba=aba_id).inc()
+
+            # 4) espera “VBA-style” (rede ociosa no lugar do sleep fixo)
+            self.compat.testa_spinner()
+            self.compat.wait_network_idle(0.5)
+
+        # pós loop
+        self.compat.wait_network_idle(1)
+        self.compat.testa_spinner()
 
-                # scroll “à la VBA”, mas no elemento certo
-                js_scroll = r"""
-                const el = arguments[0];
-                const step = arguments[1];
+    @etapa("extracao")
+    def _extrair_itens_tabela(self, aba_id: str, demandas: int):
+        """
+        Loop de extração de campos com tratamento de erro por item (Passo 3.3).
 
-                // se for o documentElement/body, usa window
-                if (el === document.body || el === document.documentElement) {
-                    window.scrollBy(0, step);
-                    return;
-                }
+        Com PNCP_BATCH_EXTRACT ativo, os campos de cada bloco de cards são lidos
+        num único execute_script (dom_batch.read_cards); se o bloco falhar,
+        volta para a leitura campo a campo do VBA apenas naquele bloco.
+        """
+        base_tmpl = XPATHS["table"]["item_base_template"].replace("{aba_id}", aba_id)
+        campos = self._campos_da_aba(aba_id)
+        chunk = get_pncp_batch_chunk_size()
 
-                // caso container comum
-                el.scrollTop = el.scrollTop + step;
+        for ini in range(1, demandas + 1, chunk):
+            fim = min(ini + chunk - 1, demandas)
+            linhas = self._ler_cards(base_tmpl, campos, ini, fim)
+            antes = len(self.data_collected)
+            auditados = []
 
-                // força disparo de evento scroll (alguns frameworks escutam isso)
-                el.dispatchEvent(new Event('scroll', { bubbles: true }));
-                """
-                self.driver.execute_script(js_scroll, container, step_px)
-            except Exception:
-                # fallback extremo: tenta window
+            for i, raw in enumerate(linhas, ini):
                 try:
-                    self.driver.execute_script("window.scrollBy(0, arguments[0]);", step_px)
-                except:
-                    pass
+                    item = self._montar_item(aba_id, raw)
+                    auditados.append((i, item.col_a_contratacao, item.col_g_status))
+                    self.data_collected.append(item.dict())
+                    publicar_item("PNCP", self.data_collected[-1])
+                except Exception as e:
+                    logger.warning(f"[AVISO-VBA] Falha ao coletar item {i} na aba {aba_id.upper()}. Erro: {str(e)}. Pulando...")
+            auditar_itens("PNCP", aba_id, auditados, demandas)
+            ITENS.labels(fonte="PNCP", aba=aba_id).inc(len(self.data_collected) - antes)
+            reportar_progresso(aba=aba_id, itens_aba=fim, demandas=demandas, itens=len(self.data_collected))
 
-            # 4) espera “VBA-style”
+    @etapa("rolagem_extracao")
+    def _coletar_aba_streaming(self, aba_id: str, demandas: int):
+        """
+        Rola e extrai numa única passada (PNCP_STREAMING_SCROLL).
+
+        A cada passo de rolagem lê os cards que ainda não foram lidos,
+        deduplica por col_a_contratacao e para quando os itens vistos (com ou
+        sem contratação) cobrem `demandas`. Em tabelas virtualizadas (PrimeNG)
+        as primeiras linhas saem do DOM durante a rolagem, então ler depois de
+        rolar tudo perderia itens.
+
+        Um cursor guarda o último índice lido e a contratação daquele card: se
+        o card continua no lugar, o DOM só cresceu e basta ler os índices
+        seguintes; se mudou, a tabela é virtualizada e lê-se a janela
+        renderizada (limitada pela virtualização).
+        """
+        xpath_tbody = XPATHS["table"]["tbody_template"].replace("{aba_id}", aba_id)
+        base_tmpl = XPATHS["table"]["item_base_template"].replace("{aba_id}", aba_id)
+        campos = self._campos_da_aba(aba_id)
+
+        container = self._localizar_container_rolagem(xpath_tbody)
+        if container is None:
             self.compat.testa_spinner()
-            time.sleep(0.5)
+            return
 
-        # pós loop
-        self.compat.wait(1)
-        self.compat.testa_spinner()
+        def contratacao(raw: Dict[str, Optional[str]]) -> str:
+            return (raw.get("contratacao") or "").strip()
 
-    def _extrair_itens_tabela(self, aba_id: str, demandas: int):
-        """Loop de extração de campos com tratamento de erro por item (Passo 3.3)."""
-        f = XPATHS["fields"]
-        base_tmpl = XPATHS["table"]["item_base_template"].replace("{aba_id}", aba_id)
-        
-        for i in range(1, demandas + 1):
-            try:
-                base_xpath = base_tmpl.replace("{index}", str(i))
-                
-                # Função auxiliar para emular On Error Resume Next granular por campo
-                def get_safe_text(xpath_suffix, default=""):
-                    try:
-                        return self.driver.find_element(By.XPATH, f"{base_xpath}{xpath_suffix}").text
-                    except:
-                        return default
-
-                # Extração direta seguindo XPaths do VBA (Passo 3.2)
-                val_a = get_safe_text(f['contratacao'])
-                val_b = get_safe_text(f['descricao'])
-                val_c = get_safe_text(f['categoria'])
-                
-                # Valor com tratamento CDbl (Passo 3.1)
-                val_d_raw = get_safe_text(f['valor'])
-                val_d = 0.0 if (not val_d_raw.strip()) else self._parse_vba_cdbl(val_d_raw)
-                
-                # Datas com tratamento CDate (Passo 3.1)
-                val_e = self._parse_vba_cdate(get_safe_text(f['inicio']))
-                val_f = self._parse_vba_cdate(get_safe_text(f['fim']))
-                
-                # Status e DFD (Passo 3.2)
+        vistos = set()
+        # Cards sem contratação, pelo conteúdo (a janela virtualizada os relê)
+        sem_chave = set()
+        cursor = 0
+        chave_cursor = None
+        start = time.time()
+        timeout_s = 180
+        stagnant_rounds = 0
+        max_stagnant_rounds = 10
+        step_px = 1200
+
+        while (time.time() - start) < timeout_s:
+            self.compat.testa_spinner()
+
+            novos = 0
+            antes = len(self.data_collected)
+            auditados = []
+            renderizados = self._count_items_loaded(xpath_tbody)
+            ini = max(cursor, 1)
+            lidos = self._ler_cards(base_tmpl, campos, ini, renderizados) if renderizados >= ini else []
+            if cursor and (not lidos or contratacao(lidos[0]) != chave_cursor):
+                # O card do cursor saiu do lugar: tabela virtualizada
+                lidos = self._ler_cards(base_tmpl, campos, 1, renderizados)
+            elif cursor:
+                lidos = lidos[1:]
+            if lidos:
+                cursor = renderizados
+                chave_cursor = contratacao(lidos[-1])
+
+            for raw in lidos:
+                chave = contratacao(raw)
+                if not chave:
+                    conteudo = tuple(sorted((k, v or "") for k, v in raw.items()))
+                    if conteudo not in sem_chave:
+                        sem_chave.add(conteudo)
+                        novos += 1
+                    continue
+                if chave in vistos:
+                    continue
+                vistos.add(chave)
+                novos += 1
                 try:
-                    if aba_id == "reprovadas": 
-                        val_g = "REPROVADA"
-                    else:
-                        xpath_status = f"{base_xpath}{f['status_aprovada' if aba_id == 'aprovadas' else 'status_pendente']}"
-                        val_g = self.driver.find_element(By.XPATH, xpath_status).text
-                except:
-                    val_g = "ERRO_STATUS"
-                
-                # Lógica DFD: Format(Left(SoNumero(descricao), 7), "@@@\/@@@@")
-                val_i = self._format_dfd(val_b)
-                if val_i == "157/2024": val_i = "157/2025"
-                
-                # Validação via Schema
-                item = PNCPItemSchema(
-                    col_a_contratacao=val_a, col_b_descricao=val_b, col_c_categoria=val_c,
-                    col_d_valor=val_d, col_e_inicio=val_e, col_f_fim=val_f,
-                    col_g_status=val_g, col_h_status_tipo="APROVADA" if aba_id == "aprovadas" else val_g,
-                    col_i_dfd=val_i
+                    item = self._montar_item(aba_id, raw)
+                    auditados.append((len(vistos), item.col_a_contratacao, item.col_g_status))
+                    self.data_collected.append(item.dict())
+                    publicar_item("PNCP", self.data_collected[-1])
+                except Exception as e:
+                    logger.warning(f"[AVISO-VBA] Falha ao coletar item {chave} na aba {aba_id.upper()}. Erro: {str(e)}. Pulando...")
+
+            auditar_itens("PNCP", aba_id, auditados, demandas)
+            ITENS.labels(fonte="PNCP", aba=aba_id).inc(len(self.data_collected) - antes)
+            reportar_progresso(aba=aba_id, itens_aba=len(vistos), demandas=demandas, itens=len(self.data_collected))
+            if len(vistos) + len(sem_chave) >= demandas:
+                logger.info(f"[LOG-VBA] Itens coletados: {len(vistos)}/{demandas} (OK).")
+                break
+
+            stagnant_rounds = 0 if novos else stagnant_rounds + 1
+            logger.debug(
+                "[LOG-VBA] Itens coletados: %s/%s | renderizados: %s | estagnado: %s/%s",
+                len(vistos), demandas, renderizados, stagnant_rounds, max_stagnant_rounds,
+            )
+            if stagnant_rounds >= max_stagnant_rounds:
+                logger.warning(
+                    f"[LOG-VBA] Nenhum item novo após {max_stagnant_rounds} rolagens; "
+                    f"encerrando aba {aba_id.upper()} com {len(vistos)}/{demandas} itens."
                 )
-                
-                logger.info(f"[AUDITORIA-ITEM] {i}/{demandas} | ID: {item.col_a_contratacao} | Status: {item.col_g_status}")
-                self.data_collected.append(item.dict())
-                
+                break
+
+            self._rolar_container(container, step_px)
+            ROLAGENS.labels(fonte="PNCP", aba=aba_id).inc()
+            self.compat.testa_spinner()
+            self.compat.wait_network_idle(0.5)
+
+        if sem_chave:
+            logger.warning(
+                f"[AVISO-VBA] {len(sem_chave)} card(s) sem contratação ignorado(s) na aba {aba_id.upper()}."
+            )
+
+    def _ler_cards(self, base_tmpl: str, campos: Dict[str, str], ini: int, fim: int) -> List[Dict[str, Optional[str]]]:
+        """Lê os cards ini..fim em lote; se o lote falhar (ou estiver desativado), campo a campo."""
+        if is_pncp_batch_extract_enabled():
+            try:
+                return read_cards(self.driver, base_tmpl, campos, ini, fim)
             except Exception as e:
-                logger.warning(f"[AVISO-VBA] Falha ao coletar item {i} na aba {aba_id.upper()}. Erro: {str(e)}. Pulando...")
+                logger.warning(
+                    f"[AVISO-VBA] Leitura em lote dos itens {ini}-{fim} falhou ({e}). "
+                    "Usando leitura campo a campo."
+                )
+        return [self._ler_card_campo_a_campo(base_tmpl, i, campos) for i in range(ini, fim + 1)]
+
+    def _campos_da_aba(self, aba_id: str) -> Dict[str, str]:
+        """Sufixos XPath lidos em cada card da aba (status depende da aba)."""
+        f = XPATHS["fields"]
+        campos = {k: f[k] for k in ("contratacao", "descricao", "categoria", "valor", "inicio", "fim")}
+        if aba_id != "reprovadas":
+            campos["status"] = f["status_aprovada" if aba_id == "aprovadas" else "status_pendente"]
+        return campos
+
+    def _ler_card_campo_a_campo(self, base_tmpl: str, index: int, campos: Dict[str, str]) -> Dict[str, Optional[str]]:
+        """Leitura VBA: um find_element por campo; campo ausente vira None (On Error Resume Next)."""
+        base_xpath = base_tmpl.replace("{index}", str(index))
+        raw = {}
+        for nome, sufixo in campos.items():
+            try:
+                raw[nome] = self.driver.find_element(By.XPATH, f"{base_xpath}{sufixo}").text
+            except:
+                raw[nome] = None
+        return raw
+
+    def _montar_item(self, aba_id: str, raw: Dict[str, Optional[str]]) -> PNCPItemSchema:
+        """Converte os textos brutos de um card no item validado (Passos 3.1/3.2)."""
+        def txt(nome: str) -> str:
+            return raw.get(nome) or ""
+
+        val_a = txt("contratacao")
+        val_b = txt("descricao")
+        val_c = txt("categoria")
+
+        # Valor com tratamento CDbl (Passo 3.1)
+        val_d_raw = txt("valor")
+        val_d = 0.0 if (not val_d_raw.strip()) else self._parse_vba_cdbl(val_d_raw)
+
+        # Datas com tratamento CDate (Passo 3.1)
+        val_e = self._parse_vba_cdate(txt("inicio"))
+        val_f = self._parse_vba_cdate(txt("fim"))
+
+        # Status (Passo 3.2)
+        if aba_id == "reprovadas":
+            val_g = "REPROVADA"
+        else:
+            val_g = raw.get("status")
+            if val_g is None:
+                val_g = "ERRO_STATUS"
+
+        # Lógica DFD: Format(Left(SoNumero(descricao), 7), "@@@\/@@@@")
+        val_i = self._format_dfd(val_b)
+        if val_i == "157/2024": val_i = "157/2025"
+
+        # Validação via Schema
+        return PNCPItemSchema(
+            col_a_contratacao=val_a, col_b_descricao=val_b, col_c_categoria=val_c,
+            col_d_valor=val_d, col_e_inicio=val_e, col_f_fim=val_f,
+            col_g_status=val_g, col_h_status_tipo="APROVADA" if aba_id == "aprovadas" else val_g,
+            col_i_dfd=val_i
+        )
 
     def _parse_vba_cdbl(self, text: str) -> float:
         """Emula CDbl do VBA (Passo 3.1)."""
@@ -8,10 +8,13 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from ..config import config
+from .dom_batch import read_tables
 from typing import List, Dict
 import time
 import re
 
+_DETAILS_LINK_XPATH = ".//a[contains(.,'Detalhes') or contains(.,'Visualizar') or contains(@title,'Visualizar')]"
+
 def _safe_text(el):
     """
     Função _safe_text:
@@ -61,31 +64,22 @@ def extract_results_table(driver) -> List[Dict]:
         return rows_data
 
     try:
-        # parse header to get column indices
-        headers = []
-        try:
-            hdrs = table_el.find_elements(By.XPATH, ".//thead//th")
-            headers = [h.text.strip() for h in hdrs if h.text.strip()]
-        except Exception:
-            pass
+        # headers, células e presença do link de detalhes numa única chamada
+        matrix = read_tables(driver, table_el, row_probe_xpath=_DETAILS_LINK_XPATH)[0]
+        if not matrix.get("has_body"):
+            raise ValueError("tabela sem tbody")
+        headers = [h for h in matrix.get("headers", []) if h]
 
-        tbody = table_el.find_element(By.TAG_NAME, "tbody")
-        trs = tbody.find_elements(By.TAG_NAME, "tr")
-        for ridx, tr in enumerate(trs):
-            cols = tr.find_elements(By.TAG_NAME, "td")
+        for ridx, cols in enumerate(matrix.get("rows", [])):
             row = {"row_id": str(ridx)}
             # map columns by header length if possible
             for cidx, col in enumerate(cols):
                 key = headers[cidx] if cidx < len(headers) else f"col_{cidx}"
-                row[key] = _safe_text(col)
-            # try to detect a details link inside row
-            try:
-                a = tr.find_element(By.XPATH, ".//a[contains(.,'Detalhes') or contains(.,'Visualizar') or contains(@title,'Visualizar')]")
-                # store an XPath to this anchor relative to the whole document (for later clicking)
-                # build a robust XPath using row index:
-                xpath = f"(//table[contains(@class,'table') or contains(@id,'results')]//tbody//tr)[{ridx+1}]//a[contains(.,'Detalhes') or contains(.,'Visualizar') or contains(@title,'Visualizar')]"
-                row["_item_selector"] = xpath
-            except Exception:
+                row[key] = col
+            # store an XPath to the details anchor relative to the whole document (for later clicking)
+            if matrix["probes"][ridx]:
+                row["_item_selector"] = f"(//table[contains(@class,'table') or contains(@id,'results')]//tbody//tr)[{ridx+1}]{_DETAILS_LINK_XPATH[1:]}"
+            else:
                 row["_item_selector"] = None
             rows_data.append(row)
     except Exception:
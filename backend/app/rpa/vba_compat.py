@@ -9,8 +9,16 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchWindowException
+from ..core.metrics import SPINNER
 from .driver_global import get_driver
-from .config_vba import VBAConfig
+from .config_vba import (
+    VBAConfig,
+    is_vba_spinner_loop_enabled,
+    get_spinner_settle_ms,
+    is_network_idle_wait_enabled,
+    get_network_quiet_ms,
+)
+from .waiter_vba import wait_spinner_observer, wait_network_idle, install_network_monitor
 
 class CheckpointFailureError(Exception):
     """Exceção levantada quando um Checkpoint Semântico falha."""
@@ -22,6 +30,7 @@ class VBACompat:
     def __init__(self, driver=None):
         self._driver = driver
         self.last_handle = None
+        self._network_monitor_installed = False
 
     @property
     def driver(self):
@@ -36,6 +45,26 @@ class VBACompat:
         logger.debug(f"[LOG-VBA] Aguardando {seconds}s (Application.Wait)")
         time.sleep(seconds)
 
+    def wait_network_idle(self, fallback_s: float, timeout: float = 15):
+        """
+        Substitui um Application.Wait fixo de `fallback_s` segundos: espera a
+        rede ficar ociosa (sem XHR/fetch em voo há NETWORK_QUIET_MS).
+        Com NETWORK_IDLE_WAIT=false, ou se a instrumentação falhar, volta a
+        dormir `fallback_s` como o VBA.
+        """
+        if not is_network_idle_wait_enabled():
+            self.wait(fallback_s)
+            return
+        try:
+            if not self._network_monitor_installed:
+                install_network_monitor(self.driver)
+                self._network_monitor_installed = True
+            if not wait_network_idle(self.driver, quiet_ms=get_network_quiet_ms(), timeout=timeout):
+                logger.debug(f"[LOG-VBA] Rede ainda ocupada após {timeout}s; prosseguindo.")
+        except Exception as e:
+            logger.debug(f"[LOG-VBA] Espera de rede indisponível ({e}); usando espera fixa de {fallback_s}s.")
+            self.wait(fallback_s)
+
     def wait_for_new_window(self, original_handles: set, timeout: int = 10):
         logger.warning(
             "wait_for_new_window: nenhuma nova janela esperada. "
@@ -45,7 +74,7 @@ class VBACompat:
             WebDriverWait(self.driver, timeout).until(
                 lambda d: d.execute_script("return document.readyState") == "complete"
             )
-            time.sleep(2)
+            self.wait_network_idle(2)
             logger.info("Navegação confirmada na mesma aba (sem nova janela).")
             return True
         except TimeoutException:
@@ -63,13 +92,27 @@ class VBACompat:
         except Exception as e:
             logger.warning(f"Erro ao resetar contexto: {e}")
 
+    @SPINNER.time()
     def testa_spinner(self, timeout=60):
         """
         Emula o 'testa_spinner' do VBA (Passo 2.2).
-        Fidelidade total ao loop: Do ... Loop While IsPresent.
+
+        Por padrão espera via MutationObserver (uma chamada execute_async_script,
+        sem polling). Com VBA_SPINNER_LOOP=true, ou se o observador falhar,
+        usa o loop fiel ao VBA: Do ... Loop While IsPresent.
         """
         spinner_xpath = "//body/app-root/ng-http-loader/div[@id='spinner']"
         start_time = time.time()
+
+        if not is_vba_spinner_loop_enabled():
+            try:
+                if not wait_spinner_observer(
+                    self.driver, spinner_xpath, timeout=timeout, settle_ms=get_spinner_settle_ms()
+                ):
+                    logger.debug(f"[LOG-VBA] Spinner ainda presente após {timeout}s (observer).")
+                return
+            except Exception as e:
+                logger.debug(f"[LOG-VBA] Observer do spinner indisponível ({e}); usando loop VBA.")
         
         while time.time() - start_time < timeout:
             try:
@@ -17,6 +17,79 @@ from selenium.common.exceptions import TimeoutException, StaleElementReferenceEx
 
 DEFAULT_TIMEOUT = 30
 POLL = 0.1  # 0.1 segundo = TimeValue("00:00:01") / 10 do VBA
+SPINNER_SETTLE_MS = 100  # depois de visto, o spinner precisa ficar ausente por esta janela
+NETWORK_QUIET_MS = 300  # rede sem requisições em voo por esta janela
+NETWORK_STALE_MS = 15000  # requisição aberta há mais que isso (long-poll) é ignorada
+
+# Observador instalado uma vez por página (window.__vbaSpinnerWatch). Cada chamada
+# registra um "waiter": se o spinner está ausente e o monitor de rede
+# (window.__vbaNet) mostra que não há XHR/fetch em voo, resolve na hora; senão,
+# quando o spinner fica ausente por settleMs contínuos, ou com false no timeout.
+# Sem o monitor não há como saber da rede e vale a janela de settle (o VBA
+# esperava 0,1s antes de olhar o spinner). Navegação recria o observador.
+_JS_SPINNER_OBSERVER = r"""
+const xpath = arguments[0];
+const settleMs = arguments[1];
+const timeoutMs = arguments[2];
+const staleMs = arguments[3];
+const done = arguments[arguments.length - 1];
+
+function present(xp) {
+    try {
+        return !!document.evaluate(
+            xp, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+        ).singleNodeValue;
+    } catch (e) {
+        return false;
+    }
+}
+
+let watch = window.__vbaSpinnerWatch;
+if (!watch || watch.xpath !== xpath) {
+    if (watch && watch.observer) watch.observer.disconnect();
+    watch = { xpath: xpath, waiters: [], observer: null };
+    watch.check = function () {
+        const isPresent = present(watch.xpath);
+        watch.waiters.slice().forEach(function (w) { w.update(isPresent); });
+    };
+    watch.observer = new MutationObserver(watch.check);
+    watch.observer.observe(document.documentElement, { childList: true, subtree: true, attributes: false });
+    window.__vbaSpinnerWatch = watch;
+}
+
+const waiter = { settle: null, deadline: null, finished: false };
+waiter.finish = function (ok) {
+    if (waiter.finished) return;
+    waiter.finished = true;
+    clearTimeout(waiter.settle);
+    clearTimeout(waiter.deadline);
+    const idx = watch.waiters.indexOf(waiter);
+    if (idx >= 0) watch.waiters.splice(idx, 1);
+    done(ok);
+};
+waiter.update = function (isPresent) {
+    if (isPresent) {
+        clearTimeout(waiter.settle);
+        waiter.settle = null;
+    } else if (waiter.settle === null) {
+        waiter.settle = setTimeout(function () {
+            waiter.settle = null;
+            if (!present(watch.xpath)) waiter.finish(true);
+        }, settleMs);
+    }
+};
+waiter.deadline = setTimeout(function () { waiter.finish(!present(watch.xpath)); }, timeoutMs);
+watch.waiters.push(waiter);
+// Spinner ausente e rede parada: nada vai mostrá-lo, não há o que esperar.
+// Com requisição em voo, ou sem o monitor de rede, ele ainda pode aparecer
+// (ex.: logo depois de um clique); aí vale a janela de settle.
+const net = window.__vbaNet;
+if (!present(xpath) && net && net.inflight(staleMs) === 0) {
+    waiter.finish(true);
+} else {
+    waiter.update(present(xpath));
+}
+"""
 
 
 def wait_spinner(driver, spinner_xpath, timeout=DEFAULT_TIMEOUT):
@@ -69,6 +142,135 @@ def wait_spinner(driver, spinner_xpath, timeout=DEFAULT_TIMEOUT):
     return True
 
 
+def wait_spinner_observer(driver, spinner_xpath, timeout=DEFAULT_TIMEOUT, settle_ms=SPINNER_SETTLE_MS,
+                          stale_ms=NETWORK_STALE_MS):
+    """
+    Espera o spinner sumir com UMA chamada execute_async_script.
+
+    Um MutationObserver instalado na página acompanha a entrada/saída do
+    spinner. Se ele já está ausente e não há XHR/fetch em voo (contador de
+    install_network_monitor, se já instalado na página), retorna na hora.
+    Senão, só retorna quando ele
+    está ausente há `settle_ms` (evita sair no intervalo entre duas
+    requisições) ou no timeout.
+
+    Retorna True se o spinner sumiu, False se o timeout foi atingido.
+    Erros de script (página navegando, script timeout) são propagados para
+    que o chamador possa cair no loop de polling do VBA.
+    """
+    result = driver.execute_async_script(
+        _JS_SPINNER_OBSERVER, spinner_xpath, int(settle_ms), int(timeout * 1000), int(stale_ms)
+    )
+    return bool(result)
+
+
+# Instrumentação idempotente: conta XHR/fetch em voo em window.__vbaNet.
+# Pode ser injetada antes do documento (CDP) ou sob demanda pelo waiter.
+JS_NETWORK_MONITOR = r"""
+(function () {
+    if (window.__vbaNet) return;
+    const net = { pending: {}, seq: 0, last: Date.now() };
+    window.__vbaNet = net;
+
+    function begin() {
+        const id = ++net.seq;
+        net.pending[id] = Date.now();
+        net.last = Date.now();
+        return id;
+    }
+    function end(id) {
+        if (id in net.pending) {
+            delete net.pending[id];
+            net.last = Date.now();
+        }
+    }
+    net.inflight = function (staleMs) {
+        const now = Date.now();
+        let n = 0;
+        for (const id in net.pending) {
+            if (now - net.pending[id] < staleMs) n++;
+        }
+        return n;
+    };
+
+    const origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        const id = begin();
+        this.addEventListener('loadend', function () { end(id); });
+        try {
+            return origSend.apply(this, arguments);
+        } catch (e) {
+            end(id);
+            throw e;
+        }
+    };
+
+    if (window.fetch) {
+        const origFetch = window.fetch;
+        window.fetch = function () {
+            const id = begin();
+            try {
+                return origFetch.apply(this, arguments).finally(function () { end(id); });
+            } catch (e) {
+                end(id);
+                throw e;
+            }
+        };
+    }
+})();
+"""
+
+_JS_WAIT_NETWORK_IDLE = JS_NETWORK_MONITOR + r"""
+const quietMs = arguments[0];
+const timeoutMs = arguments[1];
+const staleMs = arguments[2];
+const done = arguments[arguments.length - 1];
+const net = window.__vbaNet;
+const t0 = Date.now();
+const timer = setInterval(function () {
+    const now = Date.now();
+    if (net.inflight(staleMs) === 0 && now - net.last >= quietMs) {
+        clearInterval(timer);
+        done(true);
+    } else if (now - t0 >= timeoutMs) {
+        clearInterval(timer);
+        done(false);
+    }
+}, 50);
+"""
+
+
+def install_network_monitor(driver):
+    """
+    Injeta o contador de XHR/fetch na página atual e, quando o driver é
+    Chrome (CDP disponível), também em todo documento novo, para contar
+    requisições desde o início da navegação.
+    """
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": JS_NETWORK_MONITOR})
+    except Exception:
+        pass
+    driver.execute_script(JS_NETWORK_MONITOR)
+
+
+def wait_network_idle(driver, quiet_ms=NETWORK_QUIET_MS, timeout=DEFAULT_TIMEOUT, stale_ms=NETWORK_STALE_MS):
+    """
+    Espera o Angular terminar de carregar: nenhuma XHR/fetch em voo e
+    nenhuma atividade de rede nos últimos `quiet_ms`.
+
+    Uma única chamada execute_async_script (o polling acontece no navegador).
+    Se a instrumentação ainda não existir na página, ela é instalada e a
+    espera dura pelo menos `quiet_ms`.
+
+    Retorna True se a rede ficou ociosa, False no timeout. Erros de script
+    são propagados para o chamador usar a espera fixa.
+    """
+    result = driver.execute_async_script(
+        _JS_WAIT_NETWORK_IDLE, int(quiet_ms), int(timeout * 1000), int(stale_ms)
+    )
+    return bool(result)
+
+
 def wait_element_present(driver, xpath, timeout=DEFAULT_TIMEOUT):
     """
     Função wait_element_present:
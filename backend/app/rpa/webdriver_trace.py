@@ -0,0 +1,208 @@
+"""
+webdriver_trace.py
+Instrumentação opcional dos comandos WebDriver (WEBDRIVER_TRACE=true).
+
+instrumentar(driver) envolve driver.execute, por onde passam todos os
+comandos (inclusive os de WebElement: find, click, text), e registra para
+cada um o nome, a duração, a etapa corrente e o método do RPA que o
+originou (ex.: VBACompat.testa_spinner, PNCPScraperVBA._ler_card_campo_a_campo).
+
+As etapas são marcadas nos scrapers com o decorador `etapa` (ou o context
+manager `etapa_webdriver`) e ficam num ContextVar: aninham ("aba:aprovadas/
+rolagem") e valem nos threads iniciados com contextvars.copy_context().run.
+
+`resumo_webdriver` no fim de Dados_PNCP / A1_Demandas_DFD_PCA loga o
+agregado ([WEBDRIVER]) e zera o rastreador, já que drivers do pool são
+reutilizados entre coletas. Sem a flag nada é envolvido e as etapas custam
+só um ContextVar.set por chamada de método.
+"""
+import functools
+import inspect
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_ATRIBUTO = "_webdriver_trace"
+_ETAPA: ContextVar[Tuple[str, ...]] = ContextVar("webdriver_etapa", default=())
+_PACOTE = __name__.rsplit(".", 1)[0] + "."
+_IGNORADOS = {__name__, _PACOTE + "driver_factory"}
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    pos = (len(ordenados) - 1) * p / 100
+    base = int(pos)
+    if base + 1 >= len(ordenados):
+        return ordenados[-1]
+    return ordenados[base] + (ordenados[base + 1] - ordenados[base]) * (pos - base)
+
+
+def _metodo_chamador() -> str:
+    """Primeiro frame do pacote rpa fora desta camada (Classe.metodo)."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        modulo = frame.f_globals.get("__name__", "")
+        if modulo.startswith(_PACOTE) and modulo not in _IGNORADOS:
+            codigo = frame.f_code
+            # Compreensões/closures contam para o método que as contém
+            return getattr(codigo, "co_qualname", codigo.co_name).split(".<locals>")[0]
+        frame = frame.f_back
+    return "externo"
+
+
+class RastreadorWebDriver:
+    """Agregado dos comandos de um ou mais drivers (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ultimo_resumo: Optional[Dict[str, Any]] = None
+        self.reiniciar()
+
+    def reiniciar(self) -> None:
+        with self._lock:
+            self._duracoes: Dict[str, List[float]] = {}
+            self._etapas: Dict[str, List[float]] = {}
+            self._comandos_etapa: Dict[str, Counter] = {}
+            self._metodos: Dict[str, List[float]] = {}
+
+    def registrar(self, comando: str, segundos: float, metodo: str) -> None:
+        etapa = "/".join(_ETAPA.get()) or "sem_etapa"
+        with self._lock:
+            self._duracoes.setdefault(comando, []).append(segundos)
+            acumulado = self._etapas.setdefault(etapa, [0, 0.0])
+            acumulado[0] += 1
+            acumulado[1] += segundos
+            self._comandos_etapa.setdefault(etapa, Counter())[comando] += 1
+            por_metodo = self._metodos.setdefault(metodo, [0, 0.0])
+            por_metodo[0] += 1
+            por_metodo[1] += segundos
+
+    def resumo(self) -> Dict[str, Any]:
+        with self._lock:
+            comandos = {
+                nome: {
+                    "n": len(v),
+                    "total_s": round(sum(v), 3),
+                    "p50_ms": round(_percentil(v, 50) * 1000, 2),
+                    "p95_ms": round(_percentil(v, 95) * 1000, 2),
+                }
+                for nome, v in self._duracoes.items()
+            }
+            etapas = {
+                nome: {"n": n, "total_s": round(s, 3), "comandos": dict(self._comandos_etapa[nome].most_common())}
+                for nome, (n, s) in self._etapas.items()
+            }
+            metodos = {nome: {"n": n, "total_s": round(s, 3)} for nome, (n, s) in self._metodos.items()}
+        return {
+            "total_comandos": sum(c["n"] for c in comandos.values()),
+            "total_s": round(sum(c["total_s"] for c in comandos.values()), 3),
+            "comandos": dict(sorted(comandos.items(), key=lambda kv: -kv[1]["total_s"])),
+            "etapas": etapas,
+            "metodos": dict(sorted(metodos.items(), key=lambda kv: -kv[1]["total_s"])),
+        }
+
+
+def instrumentar(driver, rastreador: Optional[RastreadorWebDriver] = None):
+    """Passa a registrar os comandos do driver (idempotente). Retorna o driver."""
+    if getattr(driver, _ATRIBUTO, None) is not None:
+        if rastreador is not None:
+            setattr(driver, _ATRIBUTO, rastreador)
+        return driver
+    setattr(driver, _ATRIBUTO, rastreador or RastreadorWebDriver())
+    original = driver.execute
+
+    def execute(driver_command, params=None):
+        inicio = time.perf_counter()
+        try:
+            return original(driver_command, params)
+        finally:
+            getattr(driver, _ATRIBUTO).registrar(
+                driver_command, time.perf_counter() - inicio, _metodo_chamador()
+            )
+
+    driver.execute = execute
+    return driver
+
+
+def rastreador_do_driver(driver) -> Optional[RastreadorWebDriver]:
+    return getattr(driver, _ATRIBUTO, None)
+
+
+def compartilhar_rastreador(origem, destino) -> None:
+    """Faz `destino` (ex.: janela paralela) somar no rastreador de `origem`."""
+    rastreador = rastreador_do_driver(origem)
+    if rastreador is not None:
+        instrumentar(destino, rastreador)
+
+
+@contextmanager
+def etapa_webdriver(nome: str):
+    token = _ETAPA.set(_ETAPA.get() + (nome,))
+    try:
+        yield
+    finally:
+        _ETAPA.reset(token)
+
+
+def etapa(nome: str):
+    """
+    Decorador de método: os comandos feitos durante a chamada entram na
+    etapa `nome`, que pode usar argumentos da chamada ("aba:{aba_id}").
+    """
+    def decorador(func):
+        assinatura = inspect.signature(func) if "{" in nome else None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            rotulo = nome
+            if assinatura is not None:
+                rotulo = nome.format(**assinatura.bind_partial(*args, **kwargs).arguments)
+            with etapa_webdriver(rotulo):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorador
+
+
+def logar_resumo(rastreador: RastreadorWebDriver, titulo: str, top: int = 8) -> Dict[str, Any]:
+    r = rastreador.resumo()
+    logger.info(f"[WEBDRIVER] {titulo}: {r['total_comandos']} comandos em {r['total_s']:.2f}s")
+    for nome, e in sorted(r["etapas"].items(), key=lambda kv: -kv[1]["total_s"]):
+        principais = ", ".join(f"{c} {n}" for c, n in list(e["comandos"].items())[:4])
+        logger.info(f"[WEBDRIVER]   etapa {nome}: {e['n']} comandos, {e['total_s']:.2f}s ({principais})")
+    for nome, c in list(r["comandos"].items())[:top]:
+        logger.info(
+            f"[WEBDRIVER]   comando {nome}: n={c['n']} total={c['total_s']:.2f}s "
+            f"p50={c['p50_ms']:.1f}ms p95={c['p95_ms']:.1f}ms"
+        )
+    for nome, m in list(r["metodos"].items())[:top]:
+        logger.info(f"[WEBDRIVER]   método {nome}: {m['n']} comandos, {m['total_s']:.2f}s")
+    return r
+
+
+def resumo_webdriver(titulo: str):
+    """Decorador de método: ao terminar, loga e zera o rastreador de self.driver."""
+    def decorador(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                rastreador = rastreador_do_driver(self.driver)
+                if rastreador is not None:
+                    try:
+                        rastreador.ultimo_resumo = logar_resumo(rastreador, titulo)
+                    finally:
+                        rastreador.reiniciar()
+
+        return wrapper
+
+    return decorador
@@ -0,0 +1,254 @@
+"""
+coleta_pool.py
+==============
+Coleta em lote (vários anos de PCA / fontes) distribuída por um pool de
+sessões Chrome anexadas pós-login.
+
+- Cada sessão é um Chrome SEM WebDriver (local_attach: porta própria via
+  _find_free_port e perfil próprio; docker_attach: um serviço chrome-login
+  por item de CHROME_DEBUG_HOSTS).
+- Usuário faz o login manual em cada janela/noVNC (a UASG é a do login).
+- Cada sessão anexa o Selenium e consome unidades (ano_ref, fonte) de uma
+  fila compartilhada, reaproveitando o driver entre unidades.
+- Os resultados convergem no mesmo Excel por ano (PGC_{ano}.xlsx); a
+  escrita é serializada por arquivo em ExcelPersistence.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .pgc_service import coleta_pgc
+from .pncp_service import coleta_pncp
+from ..rpa.chrome_attach import (
+    _find_free_port,
+    open_url_via_devtools,
+    resolve_selenium_profile_dir,
+    start_manual_login_session_local,
+    wait_until_logged_in,
+)
+from ..rpa.driver_factory import create_attached_driver
+
+logger = logging.getLogger(__name__)
+
+FONTES_VALIDAS = ("PGC", "PNCP")
+
+
+@dataclass(frozen=True)
+class UnidadeColeta:
+    """Unidade de trabalho do pool: uma fonte para um ano de referência."""
+    ano_ref: int
+    fonte: str
+
+
+@dataclass
+class ResultadoUnidade:
+    ano_ref: int
+    fonte: str
+    sessao: str
+    status: str = "pendente"
+    total_itens: int = 0
+    duracao_s: float = 0.0
+    erro: Optional[str] = None
+
+
+@dataclass
+class ResultadoLote:
+    unidades: List[ResultadoUnidade] = field(default_factory=list)
+    duracao_s: float = 0.0
+
+    def resumo(self) -> Dict[str, Any]:
+        return {
+            "total_unidades": len(self.unidades),
+            "ok": sum(1 for u in self.unidades if u.status == "ok"),
+            "erros": sum(1 for u in self.unidades if u.status == "erro"),
+            "total_itens": sum(u.total_itens for u in self.unidades),
+            "duracao_s": round(self.duracao_s, 1),
+            "unidades": [u.__dict__ for u in self.unidades],
+        }
+
+
+def montar_unidades(anos: Sequence[int], fontes: Sequence[str] = FONTES_VALIDAS) -> List[UnidadeColeta]:
+    """
+    Expande anos x fontes em unidades, na ordem PGC -> PNCP de cada ano
+    (mesma ordem da coleta sequencial).
+    """
+    fontes_norm = [f.strip().upper() for f in fontes]
+    invalidas = [f for f in fontes_norm if f not in FONTES_VALIDAS]
+    if invalidas:
+        raise ValueError(f"Fonte(s) inválida(s): {invalidas}. Use {list(FONTES_VALIDAS)}.")
+    ordem = [f for f in FONTES_VALIDAS if f in fontes_norm]
+    return [UnidadeColeta(int(ano), f) for ano in dict.fromkeys(anos) for f in ordem]
+
+
+def abrir_sessoes(n: int, start_url: str) -> List[Tuple[str, int]]:
+    """
+    Prepara até `n` Chromes para login manual e devolve [(host, porta)].
+
+    - docker_attach: CHROME_DEBUG_HOSTS="chrome-login:9222,chrome-login-2:9222"
+      (fallback: CHROME_DEBUG_HOST/CHROME_DEBUG_PORT, uma sessão só).
+    - local_attach: abre um Chrome por sessão, em sequência, para que
+      _find_free_port enxergue a porta da sessão anterior já ocupada.
+      Cada sessão usa um perfil próprio (o Chrome trava o user-data-dir).
+    """
+    login_mode = os.getenv("LOGIN_MODE", "local_attach").lower().strip()
+
+    if login_mode == "docker_attach":
+        raw = os.getenv("CHROME_DEBUG_HOSTS", "")
+        if raw.strip():
+            enderecos = [e.strip() for e in raw.split(",") if e.strip()]
+        else:
+            enderecos = [
+                f"{os.getenv('CHROME_DEBUG_HOST', 'chrome-login')}:{os.getenv('CHROME_DEBUG_PORT', '9222')}"
+            ]
+        sessoes = []
+        for endereco in enderecos[:n]:
+            host, _, porta = endereco.rpartition(":")
+            sessoes.append((host, int(porta)))
+            open_url_via_devtools(host, int(porta), start_url)
+        if len(sessoes) < n:
+            logger.warning(
+                f"[POOL] {n} sessões pedidas, mas só {len(sessoes)} Chrome(s) em CHROME_DEBUG_HOSTS."
+            )
+        return sessoes
+
+    if login_mode == "local_attach":
+        perfil_base = resolve_selenium_profile_dir()
+        sessoes = []
+        for i in range(n):
+            perfil = perfil_base if i == 0 else f"{perfil_base}_{i + 1}"
+            os.makedirs(perfil, exist_ok=True)
+            # porta fixa (CHROME_DEBUG_PORT) só faz sentido para uma sessão
+            session = start_manual_login_session_local(
+                start_url=start_url,
+                port=None if i == 0 else _find_free_port(),
+                user_data_dir=perfil,
+            )
+            sessoes.append(("127.0.0.1", int(session.port)))
+        return sessoes
+
+    raise RuntimeError(
+        f"LOGIN_MODE inválido: {login_mode}. "
+        "Use 'docker_attach' (Opção 1) ou 'local_attach' (modo local)."
+    )
+
+
+def _executar_unidade(unidade: UnidadeColeta, driver) -> int:
+    """Roda uma unidade no driver da sessão e devolve a quantidade de itens."""
+    ano_str = str(unidade.ano_ref)
+    if unidade.fonte == "PGC":
+        dados = coleta_pgc(ano_str, driver=driver, close_driver=False)
+        return len(dados or [])
+    resultado = coleta_pncp(
+        username="",
+        password="",
+        ano_ref=ano_str,
+        driver=driver,
+        close_driver=False,
+        reuse_driver=True,
+    )
+    return int(resultado.get("total_itens", 0))
+
+
+def _worker(
+    host: str,
+    port: int,
+    fila: "queue.Queue[UnidadeColeta]",
+    resultados: List[ResultadoUnidade],
+    lock: threading.Lock,
+) -> None:
+    sessao = f"{host}:{port}"
+    driver = None
+    try:
+        wait_until_logged_in(
+            host=host,
+            port=port,
+            timeout_s=int(os.getenv("LOGIN_TIMEOUT_S", "600")),
+        )
+        driver = create_attached_driver(debugger_address=sessao)
+    except Exception as e:
+        # Sessão sem login: as unidades ficam para as demais sessões
+        logger.error(f"[POOL] Sessão {sessao} indisponível: {e}")
+        return
+
+    try:
+        while True:
+            try:
+                unidade = fila.get_nowait()
+            except queue.Empty:
+                break
+
+            res = ResultadoUnidade(unidade.ano_ref, unidade.fonte, sessao)
+            inicio = time.time()
+            logger.info(f"[POOL] {sessao}: iniciando {unidade.fonte} {unidade.ano_ref}")
+            try:
+                res.total_itens = _executar_unidade(unidade, driver)
+                res.status = "ok"
+            except Exception as e:
+                logger.error(f"[POOL] {sessao}: erro em {unidade.fonte} {unidade.ano_ref}: {e}", exc_info=True)
+                res.status = "erro"
+                res.erro = str(e)
+            finally:
+                res.duracao_s = round(time.time() - inicio, 1)
+                with lock:
+                    resultados.append(res)
+                fila.task_done()
+            logger.info(
+                f"[POOL] {sessao}: {unidade.fonte} {unidade.ano_ref} -> {res.status} "
+                f"({res.total_itens} itens, {res.duracao_s}s)"
+            )
+    finally:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+def executar_coleta_em_lote(
+    unidades: Sequence[UnidadeColeta],
+    sessoes: Sequence[Tuple[str, int]],
+) -> ResultadoLote:
+    """
+    Distribui as unidades pelas sessões (uma thread por Chrome) e espera todas.
+    Unidades que sobrarem sem sessão válida voltam com status "nao_executada".
+    """
+    inicio = time.time()
+    fila: "queue.Queue[UnidadeColeta]" = queue.Queue()
+    for u in unidades:
+        fila.put(u)
+
+    resultados: List[ResultadoUnidade] = []
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(
+            # cada thread herda o job corrente (progresso/resultados)
+            target=contextvars.copy_context().run,
+            args=(_worker, host, port, fila, resultados, lock),
+            name=f"coleta-pool-{port}",
+            daemon=True,
+        )
+        for host, port in sessoes
+    ]
+    logger.info(f"[POOL] {len(unidades)} unidade(s) em {len(threads)} sessão(ões) Chrome.")
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    while not fila.empty():
+        u = fila.get_nowait()
+        resultados.append(ResultadoUnidade(u.ano_ref, u.fonte, "-", status="nao_executada"))
+
+    ordem = {u: i for i, u in enumerate(unidades)}
+    resultados.sort(key=lambda r: ordem.get(UnidadeColeta(r.ano_ref, r.fonte), len(ordem)))
+
+    lote = ResultadoLote(unidades=resultados, duracao_s=time.time() - inicio)
+    logger.info(f"[POOL] Coleta em lote concluída: {lote.resumo()['ok']}/{len(unidades)} ok.")
+    return lote
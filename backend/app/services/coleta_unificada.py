@@ -0,0 +1,122 @@
+"""
+coleta_unificada.py
+===================
+Sequência PGC -> PNCP no fluxo "attach pós-login" (docker_attach ou
+local_attach), executada pelo job "coleta_unificada" (job_runner), na API
+ou no worker. O endpoint POST /api/coleta/iniciar só agenda o job.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+
+from .excel_persistence import ExcelPersistence
+from .pgc_service import coleta_pgc
+from .pncp_service import coleta_pncp
+from ..rpa.chrome_attach import (
+    ManualLoginSession,
+    open_url_via_devtools,
+    start_manual_login_session_local,
+    wait_until_logged_in,
+)
+from ..rpa.driver_factory import create_attached_driver
+
+logger = logging.getLogger(__name__)
+
+
+def executar_coletas_sequenciais(
+    ano_ref: int,
+    preopened_session: ManualLoginSession | None = None,
+) -> None:
+    """
+    Fluxo "attach pós-login" (docker_attach ou local_attach):
+    - Um Chrome é iniciado SEM WebDriver.
+    - Usuário faz login manualmente.
+    - Backend detecta pós-login via DevTools (/json).
+    - Só então anexa Selenium e executa PGC -> PNCP reaproveitando o driver.
+    """
+    ano_str = str(ano_ref)
+
+    driver = None
+    try:
+        login_mode = os.getenv("LOGIN_MODE", "local_attach").lower().strip()
+        start_url = os.getenv("PGC_URL", "https://www.comprasnet.gov.br/seguro/loginPortalUASG.asp")
+
+        host: str
+        port: int
+
+        if login_mode == "docker_attach":
+            # Chrome no container (via docker-compose) com DevTools exposto
+            host = os.getenv("CHROME_DEBUG_HOST", "chrome-login")
+            port = int(os.getenv("CHROME_DEBUG_PORT", "9222"))
+
+            # (Opcional) manda abrir a URL de login na instância do Chrome do container
+            open_url_via_devtools(host, port, start_url)
+
+            logger.info(
+                "LOGIN_MODE=docker_attach ativo. Aguardando login manual via noVNC "
+                "antes de anexar o Selenium..."
+            )
+
+        elif login_mode == "local_attach":
+            # Chrome LOCAL (Windows) sem Selenium até terminar login
+            session = preopened_session or start_manual_login_session_local(start_url=start_url)
+            host = "127.0.0.1"
+            port = int(session.port)
+
+            logger.info(
+                "LOGIN_MODE=local_attach ativo. Um Chrome LOCAL foi aberto. "
+                "Faça o login manualmente nessa janela e mantenha-a aberta "
+                "para o Selenium anexar depois."
+            )
+
+        else:
+            raise RuntimeError(
+                f"LOGIN_MODE inválido: {login_mode}. "
+                "Use 'docker_attach' (Opção 1) ou 'local_attach' (modo local)."
+            )
+
+        # Aguarda login manual detectando mudança de URL em /json (VBA-like)
+        wait_until_logged_in(
+            host=host,
+            port=port,
+            timeout_s=int(os.getenv("LOGIN_TIMEOUT_S", "600")),
+        )
+
+        # Após login: Selenium "assume"
+        debugger_address = f"{host}:{port}"
+        driver = create_attached_driver(debugger_address=debugger_address)
+
+        # PGC, Geral e PNCP gravados no PGC_{ano}.xlsx com uma abertura e um save
+        with ExcelPersistence.sessao():
+            # Coleta PGC
+            logger.info(f"Iniciando sequência de coleta para o ano {ano_ref}")
+            logger.info("Passo 1/2: Iniciando coleta PGC...")
+            coleta_pgc(ano_str, driver=driver, close_driver=False)
+            logger.info("Passo 1/2: Coleta PGC finalizada com sucesso.")
+
+            # Coleta PNCP reaproveitando driver
+            logger.info("Passo 2/2: Iniciando coleta PNCP...")
+            coleta_pncp(
+                username="",
+                password="",
+                ano_ref=ano_str,
+                driver=driver,
+                close_driver=False,
+                reuse_driver=True,
+            )
+            logger.info("Passo 2/2: Coleta PNCP finalizada com sucesso.")
+        logger.info(f"Sequência de coleta para o ano {ano_ref} concluída.")
+
+    except Exception as e:
+        logger.error(f"Erro durante a sequência de coleta: {e}", exc_info=True)
+        # Propaga para o job registrar o estado "failed"
+        raise
+
+    finally:
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
@@ -3,14 +3,62 @@ excel_persistence.py
 Gerencia a persistência de dados no arquivo Excel.
 MODIFICADO PARA EXECUÇÃO LOCAL - Salva na pasta raiz do projeto.
 """
+import contextvars
 import os
 import logging
-from typing import List, Dict, Any
+import tempfile
+import threading
+from contextlib import contextmanager
+from functools import partial, wraps
+from typing import List, Dict, Any, Callable, Iterable, Optional, Tuple
 from openpyxl import load_workbook, Workbook
 from openpyxl.styles import Font, Alignment, PatternFill
 
+from . import xlsx_stream
+from ..core.metrics import GRAVACAO
+
 logger = logging.getLogger(__name__)
 
+PNCP_HEADERS = ["Contratação", "Descrição", "Categoria", "Valor", "Início",
+                "Fim", "Status", "PGC", "DFD", "Status", "Tipo"]
+
+# Aba PNCP é sempre reescrita por inteiro: com o streaming ligado ela é gerada
+# direto no zip do .xlsx, sem load_workbook/save das demais abas.
+EXCEL_STREAMING_WRITE = os.getenv("EXCEL_STREAMING_WRITE", "true").lower() in ("1", "true", "yes", "on")
+
+# Um lock por arquivo: coletas paralelas (pool de sessões) gravam no mesmo
+# PGC_{ano}.xlsx e cada gravação faz load -> altera -> save.
+_FILE_LOCKS: Dict[str, threading.Lock] = {}
+_FILE_LOCKS_GUARD = threading.Lock()
+
+
+def _file_lock(path: str) -> threading.Lock:
+    key = os.path.abspath(path)
+    with _FILE_LOCKS_GUARD:
+        return _FILE_LOCKS.setdefault(key, threading.Lock())
+
+
+def _serializado(metodo):
+    """Executa o método com o lock do arquivo Excel da instância."""
+    @wraps(metodo)
+    def wrapper(self, *args, **kwargs):
+        with _file_lock(self.file_path):
+            return metodo(self, *args, **kwargs)
+    return wrapper
+
+def _indexar_coluna(ws, coluna: int, chave=lambda v: v) -> Dict[Any, int]:
+    """
+    Índice valor -> primeira linha (a partir da 2) em que aparece na coluna.
+    Substitui a busca linha a linha do VBA: cada upsert passa a ser O(1).
+    """
+    indice: Dict[Any, int] = {}
+    for row_idx, (valor,) in enumerate(
+        ws.iter_rows(min_row=2, max_row=ws.max_row, min_col=coluna, max_col=coluna, values_only=True), 2
+    ):
+        indice.setdefault(chave(valor), row_idx)
+    return indice
+
+
 class ExcelPersistence:
     """
     Gerencia a persistência de dados no arquivo Excel.
@@ -30,6 +78,7 @@ class ExcelPersistence:
             logger.info(f"[LOCAL] Excel será salvo em: {outputs_dir}")
         
         self.file_path = file_path
+        self._criado = False
         self._ensure_file_exists()
         
         # ============================================================
@@ -40,6 +89,7 @@ class ExcelPersistence:
         # self.file_path = file_path
         # self._ensure_file_exists()
 
+    @_serializado
     def _ensure_file_exists(self):
         """Garante que o arquivo Excel exista, criando-o se necessário."""
         if not os.path.exists(self.file_path):
@@ -62,153 +112,460 @@ class ExcelPersistence:
             
             # Cabeçalhos PNCP
             ws_pncp = wb["PNCP"]
-            headers_pncp = ["Contratação", "Descrição", "Categoria", "Valor", "Início", 
-                           "Fim", "Status", "PGC", "DFD", "Status", "Tipo"]
-            for col, header in enumerate(headers_pncp, 1):
+            for col, header in enumerate(PNCP_HEADERS, 1):
                 ws_pncp.cell(row=1, column=col, value=header)
 
             wb.save(self.file_path)
+            # Arquivo novo não tem a coleta anterior: diffs são ignorados
+            self._criado = True
             logger.info(f"[LOCAL] ✅ Arquivo Excel criado: {self.file_path}")
 
-    def update_pgc_sheet(self, data: List[Dict[str, Any]]):
+    # ------------------------------------------------------------------
+    # Gravações: diretas ou acumuladas na sessão (ExcelPersistence.sessao)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    @contextmanager
+    def sessao():
         """
-        Atualiza a aba PGC seguindo a lógica do VBA.
+        Acumula as gravações feitas no bloco (qualquer ExcelPersistence, inclusive
+        dentro dos services) e as aplica no fim: por arquivo, um load_workbook,
+        todas as abas atualizadas em ordem e um único save atômico.
+
+            with ExcelPersistence.sessao():
+                coleta_pgc(...)    # update_pgc_sheet + sync_to_geral
+                coleta_pncp(...)   # update_pncp_sheet
+
+        As gravações pendentes são aplicadas mesmo se o bloco falhar (o que já
+        foi coletado não se perde), como acontecia com as gravações imediatas.
+        Sessões aninhadas reaproveitam a externa.
         """
+        atual = _sessao_atual.get()
+        if atual is not None:
+            yield atual
+            return
+        sessao = _SessaoExcel()
+        token = _sessao_atual.set(sessao)
         try:
-            wb = load_workbook(self.file_path)
-            ws = wb["PGC"]
-            
-            for item in data:
-                dfd = str(item.get("dfd", "")).strip()
-                if not dfd: 
-                    continue
-                    
-                # Procura se DFD já existe
-                found_row = None
-                for row in range(2, ws.max_row + 1):
-                    if str(ws.cell(row=row, column=2).value).strip() == dfd:
-                        found_row = row
-                        break
-                
-                # Se não existe, adiciona nova linha
-                target_row = found_row if found_row else ws.max_row + 1
-                
-                # Preenche dados
-                ws.cell(row=target_row, column=1, value=item.get("pag", 1))
-                ws.cell(row=target_row, column=2, value=dfd)
-                ws.cell(row=target_row, column=3, value=item.get("requisitante"))
-                ws.cell(row=target_row, column=4, value=item.get("descricao"))
-                ws.cell(row=target_row, column=5, value=item.get("valor"))
-                ws.cell(row=target_row, column=6, value=item.get("situacao"))
-                ws.cell(row=target_row, column=7, value=item.get("conclusao"))
-                ws.cell(row=target_row, column=8, value=item.get("editor"))
-                ws.cell(row=target_row, column=9, value=item.get("responsaveis"))
-                ws.cell(row=target_row, column=10, value=item.get("pta"))
-                ws.cell(row=target_row, column=11, value=item.get("justificativa"))
-            
-            wb.save(self.file_path)
-            logger.info(f"[LOCAL] ✅ Aba PGC atualizada ({len(data)} itens)")
-            
-        except Exception as e:
-            logger.error(f"[LOCAL] ❌ Erro ao atualizar aba PGC: {e}")
+            yield sessao
+        finally:
+            _sessao_atual.reset(token)
+            sessao.aplicar()
+
+    # As gravações abaixo retornam True/False (gravado ou não) ou None se
+    # adiadas pela sessão. `ao_gravar` só é chamado depois que o arquivo foi
+    # salvo com sucesso (na sessão, quando ela aplicar as gravações) — ex.:
+    # DiffColeta.confirmar, para o snapshot não avançar sem o delta gravado.
+
+    def update_pgc_sheet(self, data: List[Dict[str, Any]], diff=None,
+                         ao_gravar: Optional[Callable[[], None]] = None) -> Optional[bool]:
+        """
+        Atualiza a aba PGC seguindo a lógica do VBA.
+        Com `diff` (diff_coletas.DiffColeta), só os itens inseridos/atualizados.
+        """
+        if self._usar_diff(diff):
+            if diff.vazio:
+                logger.info("[LOCAL] Aba PGC sem alterações desde a última coleta")
+                return self._gravar([], ao_gravar)
+            data = diff.alterados
+        return self._gravar([(OP_PGC, data)], ao_gravar)
 
-    def update_pncp_sheet(self, data: List[Dict[str, Any]]):
+    def update_pncp_sheet(self, data: List[Dict[str, Any]], diff=None,
+                          ao_gravar: Optional[Callable[[], None]] = None) -> Optional[bool]:
         """
         Atualiza a aba PNCP seguindo fielmente o mapeamento de colunas do VBA (A a K).
+        Com `diff`, nada é gravado se a coleta não mudou; sem o streaming, só as
+        linhas inseridas/atualizadas/removidas são tocadas.
         """
+        if self._usar_diff(diff):
+            if diff.vazio:
+                logger.info("[LOCAL] Aba PNCP sem alterações desde a última coleta")
+                return self._gravar([], ao_gravar)
+            # Reescrever em streaming sai mais barato que abrir o workbook;
+            # itens sem contratação não têm linha correspondente para atualizar
+            if not EXCEL_STREAMING_WRITE and not diff.sem_chave:
+                logger.info(f"[LOG-VBA] Aplicando delta na aba PNCP do Excel...")
+                return self._gravar([(OP_PNCP_DIFF, diff)], ao_gravar)
         logger.info(f"[LOG-VBA] Iniciando atualização da aba PNCP no Excel...")
-        try:
-            wb = load_workbook(self.file_path)
-            
-            if "PNCP" not in wb.sheetnames:
-                wb.create_sheet("PNCP")
-            
-            ws = wb["PNCP"]
-            
-            # Limpar dados antigos
-            if ws.max_row > 1:
-                ws.delete_rows(2, ws.max_row)
-
-            # Estilização do cabeçalho
-            header_fill = PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")
-            header_font = Font(bold=True)
-            for col in range(1, 12):
-                cell = ws.cell(row=1, column=col)
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal="center")
-
-            for row_idx, entry in enumerate(data, 2):
-                ws.cell(row=row_idx, column=1, value=entry.get("col_a_contratacao"))
-                ws.cell(row=row_idx, column=2, value=entry.get("col_b_descricao"))
-                ws.cell(row=row_idx, column=3, value=entry.get("col_c_categoria"))
-                
-                cell_valor = ws.cell(row=row_idx, column=4, value=entry.get("col_d_valor"))
-                cell_valor.number_format = '"R$" #,##0.00'
-                
-                ws.cell(row=row_idx, column=5, value=entry.get("col_e_inicio"))
-                ws.cell(row=row_idx, column=6, value=entry.get("col_f_fim"))
-                ws.cell(row=row_idx, column=7, value=entry.get("col_g_status"))
-                ws.cell(row=row_idx, column=8, value=entry.get("col_h_status_tipo"))
-                
-                cell_dfd = ws.cell(row=row_idx, column=9, value=entry.get("col_i_dfd"))
-                cell_dfd.number_format = '@'
-                
-                ws.cell(row=row_idx, column=10, value=entry.get("col_g_status"))
-                ws.cell(row=row_idx, column=11, value=entry.get("col_h_status_tipo"))
-
-            # Ajuste automático de largura
-            for col in ws.columns:
-                max_length = 0
-                column = col[0].column_letter
-                for cell in col:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except: 
-                        pass
-                ws.column_dimensions[column].width = min(max_length + 2, 50)
+        return self._gravar([(OP_PNCP, data)], ao_gravar)
 
-            wb.save(self.file_path)
-            logger.info(f"[LOCAL] ✅ Aba PNCP atualizada ({len(data)} itens)")
-            
-        except Exception as e:
-            logger.error(f"[LOCAL] ❌ Erro ao atualizar aba PNCP: {e}")
-
-    def sync_to_geral(self):
+    def sync_to_geral(self, dfds: Optional[Iterable[str]] = None,
+                      ao_gravar: Optional[Callable[[], None]] = None) -> Optional[bool]:
         """
         Sincroniza dados entre PGC e Geral seguindo a lógica do VBA.
+        `dfds` restringe a sincronização a esses DFDs (ex.: diff.chaves_alteradas()).
+        """
+        if dfds is not None and not self._criado:
+            dfds = list(dfds)
+            if not dfds:
+                return self._gravar([], ao_gravar)
+        else:
+            dfds = None
+        return self._gravar([(OP_GERAL, dfds)], ao_gravar)
+
+    def _usar_diff(self, diff) -> bool:
+        return diff is not None and not diff.completo and not self._criado
+
+    def _gravar(self, operacoes: List[Tuple[str, Any]],
+                ao_gravar: Optional[Callable[[], None]] = None) -> Optional[bool]:
+        sessao = _sessao_atual.get()
+        if sessao is not None:
+            sessao.registrar(self, operacoes, ao_gravar)
+            return None
+        ok = self._aplicar(operacoes) if operacoes else True
+        _concluir(self.file_path, ok, [ao_gravar] if ao_gravar else [])
+        return ok
+
+    @_serializado
+    @GRAVACAO.labels(destino="excel").time()
+    def _aplicar(self, operacoes: List[Tuple[str, Any]]) -> bool:
+        """
+        Aplica as operações com uma abertura do arquivo e um save atômico
+        (arquivo temporário + os.replace). A aba PNCP, com o streaming ligado,
+        é gravada direto no zip, sem passar pelo openpyxl.
+        Erros são logados (a coleta segue) e o retorno indica se o arquivo foi
+        salvo com todas as abas: se uma aba falhar, as demais são salvas mas o
+        retorno é False (o ao_gravar não roda e o delta é regravado depois).
         """
+        pncp_stream = None
+        if EXCEL_STREAMING_WRITE:
+            pncp = [dados for op, dados in operacoes if op == OP_PNCP]
+            if pncp:
+                # A aba é reescrita por inteiro: só a última gravação importa
+                pncp_stream = pncp[-1]
+                operacoes = [o for o in operacoes if o[0] != OP_PNCP]
+
+        tmp = None
         try:
-            wb = load_workbook(self.file_path)
-            if "PGC" not in wb.sheetnames or "Geral" not in wb.sheetnames:
-                return
-                
-            ws_pgc = wb["PGC"]
-            ws_geral = wb["Geral"]
-            
-            for r_pgc in range(2, ws_pgc.max_row + 1):
-                dfd = ws_pgc.cell(row=r_pgc, column=2).value
-                if not dfd: 
-                    continue
-                    
-                found_row_geral = None
-                for r_geral in range(2, ws_geral.max_row + 1):
-                    if ws_geral.cell(row=r_geral, column=7).value == dfd:
-                        found_row_geral = r_geral
-                        break
-                        
-                target_row = found_row_geral if found_row_geral else ws_geral.max_row + 1
-                ws_geral.cell(row=target_row, column=1, value=ws_pgc.cell(row=r_pgc, column=1).value)
-                ws_geral.cell(row=target_row, column=6, value=str(dfd)[-4:] if dfd else "")
-                ws_geral.cell(row=target_row, column=7, value=dfd)
-                ws_geral.cell(row=target_row, column=8, value=ws_pgc.cell(row=r_pgc, column=3).value)
-                ws_geral.cell(row=target_row, column=9, value=ws_pgc.cell(row=r_pgc, column=4).value)
-                ws_geral.cell(row=target_row, column=10, value=ws_pgc.cell(row=r_pgc, column=5).value)
-                ws_geral.cell(row=target_row, column=11, value=ws_pgc.cell(row=r_pgc, column=6).value)
-                
-            wb.save(self.file_path)
-            logger.info("[LOCAL] ✅ Sincronização com aba Geral concluída")
-            
+            destino = self.file_path
+            ok = True
+            if operacoes:
+                wb = load_workbook(self.file_path)
+                indices: Dict[str, Dict[Any, int]] = {}
+                for op, dados in operacoes:
+                    ok = _APLICADORES[op](wb, dados, indices) and ok
+                tmp = _arquivo_temporario(self.file_path)
+                wb.save(tmp)
+                destino = tmp
+
+            if pncp_stream is not None and not _gravar_pncp_streaming(destino, pncp_stream):
+                wb = load_workbook(destino)
+                ok = _aplicar_pncp(wb, pncp_stream, {}) and ok
+                if tmp is None:
+                    tmp = _arquivo_temporario(self.file_path)
+                wb.save(tmp)
+
+            if tmp is not None:
+                os.replace(tmp, self.file_path)
+                tmp = None
+            return ok
         except Exception as e:
-            logger.error(f"[LOCAL] ❌ Erro na sincronização Geral: {e}")
\ No newline at end of file
+            logger.error(f"[LOCAL] ❌ Erro ao gravar Excel {self.file_path}: {e}")
+            return False
+        finally:
+            if tmp is not None and os.path.exists(tmp):
+                os.remove(tmp)
+
+
+# ----------------------------------------------------------------------
+# Sessão
+# ----------------------------------------------------------------------
+
+OP_PGC = "pgc"
+OP_PNCP = "pncp"
+OP_PNCP_DIFF = "pncp_diff"
+OP_GERAL = "geral"
+
+_sessao_atual: contextvars.ContextVar[Optional["_SessaoExcel"]] = contextvars.ContextVar(
+    "sessao_excel", default=None
+)
+
+
+class _SessaoExcel:
+    def __init__(self):
+        # arquivo -> (persistência, operações, callbacks de sucesso)
+        self.pendentes: Dict[str, Tuple[ExcelPersistence, List[Tuple[str, Any]], List[Callable[[], None]]]] = {}
+        self.lock = threading.Lock()
+
+    def registrar(self, persist: ExcelPersistence, operacoes: List[Tuple[str, Any]],
+                  ao_gravar: Optional[Callable[[], None]] = None) -> None:
+        chave = os.path.abspath(persist.file_path)
+        with self.lock:
+            _, ops, callbacks = self.pendentes.setdefault(chave, (persist, [], []))
+            ops.extend(operacoes)
+            if ao_gravar is not None:
+                callbacks.append(ao_gravar)
+        logger.debug(f"[LOCAL] Gravação {[op for op, _ in operacoes]} em {chave} adiada para o fim da sessão")
+
+    def aplicar(self) -> None:
+        with self.lock:
+            pendentes, self.pendentes = self.pendentes, {}
+        for persist, operacoes, callbacks in pendentes.values():
+            ok = True
+            if operacoes:
+                logger.info(f"[LOCAL] Gravando {len(operacoes)} atualização(ões) em {persist.file_path} (sessão)")
+                ok = persist._aplicar(operacoes)
+            _concluir(persist.file_path, ok, callbacks)
+
+
+def _concluir(file_path: str, ok: bool, callbacks: List[Callable[[], None]]) -> None:
+    """Chama os callbacks de sucesso da gravação (um erro em um não impede os demais)."""
+    if not callbacks:
+        return
+    if not ok:
+        logger.warning(f"[LOCAL] {file_path} não foi gravado; {len(callbacks)} confirmação(ões) descartada(s)")
+        return
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"[LOCAL] ❌ Erro após gravar {file_path}: {e}")
+
+
+def _arquivo_temporario(file_path: str) -> str:
+    fd, tmp = tempfile.mkstemp(suffix=".xlsx", dir=os.path.dirname(os.path.abspath(file_path)))
+    os.close(fd)
+    return tmp
+
+
+# ----------------------------------------------------------------------
+# Atualização das abas (workbook já aberto). Retornam False se a aba
+# falhou: o erro é logado e as demais abas seguem.
+# ----------------------------------------------------------------------
+
+def _campo_pgc(item: Dict[str, Any], nome: str, alternativo: str, padrao: Any = None) -> Any:
+    """O scraper usa os cabeçalhos da aba ("DFD", "Requisitante", ...); chaves minúsculas continuam aceitas."""
+    return item.get(nome, item.get(alternativo, padrao))
+
+
+def _aplicar_pgc(wb, data: List[Dict[str, Any]], indices: Dict[str, Dict[Any, int]]):
+    try:
+        ws = wb["PGC"]
+        # DFD (coluna B) -> linha, montado uma vez por abertura do arquivo
+        if "PGC" not in indices:
+            indices["PGC"] = _indexar_coluna(ws, 2, lambda v: str(v).strip())
+        linhas_dfd = indices["PGC"]
+        # ws.max_row percorre todas as células; a próxima linha livre é contada aqui
+        proxima_linha = ws.max_row + 1
+
+        for item in data:
+            campo = partial(_campo_pgc, item)
+            dfd = campo("DFD", "dfd")
+            dfd = str(dfd).strip() if dfd is not None else ""
+            if not dfd:
+                continue
+
+            # Procura se DFD já existe; se não, adiciona nova linha
+            target_row = linhas_dfd.get(dfd)
+            if target_row is None:
+                target_row = proxima_linha
+                proxima_linha += 1
+                linhas_dfd[dfd] = target_row
+
+            # Preenche dados
+            ws.cell(row=target_row, column=1, value=campo("Pag", "pag", 1))
+            ws.cell(row=target_row, column=2, value=dfd)
+            ws.cell(row=target_row, column=3, value=campo("Requisitante", "requisitante"))
+            ws.cell(row=target_row, column=4, value=campo("Descrição", "descricao"))
+            ws.cell(row=target_row, column=5, value=campo("Valor", "valor"))
+            ws.cell(row=target_row, column=6, value=campo("Situação", "situacao"))
+            ws.cell(row=target_row, column=7, value=campo("Conclusão", "conclusao"))
+            ws.cell(row=target_row, column=8, value=campo("Editor", "editor"))
+            ws.cell(row=target_row, column=9, value=campo("Responsáveis", "responsaveis"))
+            ws.cell(row=target_row, column=10, value=campo("PTA", "pta"))
+            ws.cell(row=target_row, column=11, value=campo("Justificativa", "justificativa"))
+
+        logger.info(f"[LOCAL] ✅ Aba PGC atualizada ({len(data)} itens)")
+        return True
+
+    except Exception as e:
+        logger.error(f"[LOCAL] ❌ Erro ao atualizar aba PGC: {e}")
+        return False
+
+
+def _aplicar_geral(wb, dfds: Optional[List[str]], indices: Dict[str, Dict[Any, int]]):
+    try:
+        if "PGC" not in wb.sheetnames or "Geral" not in wb.sheetnames:
+            return True
+
+        ws_pgc = wb["PGC"]
+        ws_geral = wb["Geral"]
+        # DFD (coluna G da Geral) -> linha
+        if "Geral" not in indices:
+            indices["Geral"] = _indexar_coluna(ws_geral, 7)
+        linhas_geral = indices["Geral"]
+        proxima_linha = ws_geral.max_row + 1
+
+        if dfds is None:
+            linhas_pgc: Iterable[int] = range(2, ws_pgc.max_row + 1)
+        else:
+            if "PGC" not in indices:
+                indices["PGC"] = _indexar_coluna(ws_pgc, 2, lambda v: str(v).strip())
+            linhas_pgc = sorted(indices["PGC"][d] for d in set(dfds) if d in indices["PGC"])
+
+        for r_pgc in linhas_pgc:
+            dfd = ws_pgc.cell(row=r_pgc, column=2).value
+            if not dfd:
+                continue
+
+            target_row = linhas_geral.get(dfd)
+            if target_row is None:
+                target_row = proxima_linha
+                proxima_linha += 1
+                linhas_geral[dfd] = target_row
+            ws_geral.cell(row=target_row, column=1, value=ws_pgc.cell(row=r_pgc, column=1).value)
+            ws_geral.cell(row=target_row, column=6, value=str(dfd)[-4:] if dfd else "")
+            ws_geral.cell(row=target_row, column=7, value=dfd)
+            ws_geral.cell(row=target_row, column=8, value=ws_pgc.cell(row=r_pgc, column=3).value)
+            ws_geral.cell(row=target_row, column=9, value=ws_pgc.cell(row=r_pgc, column=4).value)
+            ws_geral.cell(row=target_row, column=10, value=ws_pgc.cell(row=r_pgc, column=5).value)
+            ws_geral.cell(row=target_row, column=11, value=ws_pgc.cell(row=r_pgc, column=6).value)
+
+        logger.info("[LOCAL] ✅ Sincronização com aba Geral concluída")
+        return True
+
+    except Exception as e:
+        logger.error(f"[LOCAL] ❌ Erro na sincronização Geral: {e}")
+        return False
+
+
+def _linhas_pncp(data: List[Dict[str, Any]]):
+    for entry in data:
+        yield (
+            entry.get("col_a_contratacao"),
+            entry.get("col_b_descricao"),
+            entry.get("col_c_categoria"),
+            entry.get("col_d_valor"),
+            entry.get("col_e_inicio"),
+            entry.get("col_f_fim"),
+            entry.get("col_g_status"),
+            entry.get("col_h_status_tipo"),
+            entry.get("col_i_dfd"),
+            entry.get("col_g_status"),
+            entry.get("col_h_status_tipo"),
+        )
+
+
+def _gravar_pncp_streaming(file_path: str, data: List[Dict[str, Any]]) -> bool:
+    """Reescreve a aba PNCP direto no zip; False se for preciso usar o openpyxl."""
+    try:
+        xlsx_stream.replace_sheet(
+            file_path,
+            "PNCP",
+            PNCP_HEADERS,
+            _linhas_pncp(data),
+            header_style=xlsx_stream.CellStyle(bold=True, fill_rgb="D3D3D3", align_center=True),
+            column_styles={
+                4: xlsx_stream.CellStyle(number_format='"R$" #,##0.00'),
+                9: xlsx_stream.CellStyle(number_format="@"),
+            },
+        )
+        logger.info(f"[LOCAL] ✅ Aba PNCP atualizada ({len(data)} itens)")
+        return True
+    except Exception as e:
+        logger.warning(f"[AVISO] Escrita em streaming da aba PNCP falhou ({e}); usando openpyxl.")
+        return False
+
+
+def _formatar_linha_pncp(ws, row_idx: int, valores) -> None:
+    for col, valor in enumerate(valores, 1):
+        cell = ws.cell(row=row_idx, column=col, value=valor)
+        if col == 4:
+            cell.number_format = '"R$" #,##0.00'
+        elif col == 9:
+            cell.number_format = '@'
+
+
+def _aplicar_pncp(wb, data: List[Dict[str, Any]], _indices):
+    try:
+        if "PNCP" not in wb.sheetnames:
+            wb.create_sheet("PNCP")
+
+        ws = wb["PNCP"]
+
+        # Limpar dados antigos
+        if ws.max_row > 1:
+            ws.delete_rows(2, ws.max_row)
+
+        # Estilização do cabeçalho
+        header_fill = PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")
+        header_font = Font(bold=True)
+        for col in range(1, 12):
+            cell = ws.cell(row=1, column=col)
+            cell.fill = header_fill
+            cell.font = header_font
+            cell.alignment = Alignment(horizontal="center")
+
+        for row_idx, valores in enumerate(_linhas_pncp(data), 2):
+            _formatar_linha_pncp(ws, row_idx, valores)
+
+        # Ajuste automático de largura
+        for col in ws.columns:
+            max_length = 0
+            column = col[0].column_letter
+            for cell in col:
+                try:
+                    if len(str(cell.value)) > max_length:
+                        max_length = len(str(cell.value))
+                except:
+                    pass
+            ws.column_dimensions[column].width = min(max_length + 2, 50)
+
+        logger.info(f"[LOCAL] ✅ Aba PNCP atualizada ({len(data)} itens)")
+        return True
+
+    except Exception as e:
+        logger.error(f"[LOCAL] ❌ Erro ao atualizar aba PNCP: {e}")
+        return False
+
+
+def _aplicar_pncp_diff(wb, diff, indices: Dict[str, Dict[Any, int]]):
+    """Delta na aba PNCP: atualiza/insere pela contratação (coluna A) e remove as linhas que sumiram."""
+    try:
+        if "PNCP" not in wb.sheetnames:
+            wb.create_sheet("PNCP")
+        ws = wb["PNCP"]
+        if "PNCP" not in indices:
+            indices["PNCP"] = _indexar_coluna(ws, 1, lambda v: str(v).strip() if v is not None else None)
+        linhas = indices["PNCP"]
+        proxima_linha = ws.max_row + 1
+
+        alterados = diff.alterados
+        for item, valores in zip(alterados, _linhas_pncp(alterados)):
+            chave = str(item.get("col_a_contratacao")).strip()
+            row_idx = linhas.get(chave)
+            if row_idx is None:
+                row_idx = proxima_linha
+                proxima_linha += 1
+                linhas[chave] = row_idx
+            _formatar_linha_pncp(ws, row_idx, valores)
+
+        # De baixo para cima, em blocos contíguos: as linhas acima não se deslocam
+        remover = sorted((linhas[c] for c in diff.removidos if c in linhas), reverse=True)
+        i = 0
+        while i < len(remover):
+            fim = inicio = remover[i]
+            while i + 1 < len(remover) and remover[i + 1] == inicio - 1:
+                i += 1
+                inicio = remover[i]
+            ws.delete_rows(inicio, fim - inicio + 1)
+            i += 1
+        if remover:
+            indices.pop("PNCP", None)
+
+        logger.info(
+            f"[LOCAL] ✅ Aba PNCP atualizada (delta: {len(alterados)} gravados, {len(remover)} removidos)"
+        )
+        return True
+
+    except Exception as e:
+        logger.error(f"[LOCAL] ❌ Erro ao aplicar delta na aba PNCP: {e}")
+        return False
+
+
+_APLICADORES = {
+    OP_PGC: _aplicar_pgc,
+    OP_PNCP: _aplicar_pncp,
+    OP_PNCP_DIFF: _aplicar_pncp_diff,
+    OP_GERAL: _aplicar_geral,
+}
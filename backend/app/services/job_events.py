@@ -0,0 +1,182 @@
+"""
+job_events.py
+Pub/sub em processo dos eventos de um job (itens validados e progresso),
+consumido pelo stream SSE/NDJSON de GET /api/jobs/{id}/stream.
+
+- Produtores são as threads de coleta (scrapers/services) e nunca bloqueiam:
+  cada assinante tem uma asyncio.Queue limitada e, se ela encher, o evento
+  mais antigo é descartado (o assinante recebe um aviso com a contagem).
+- Jobs que rodam em outro processo (worker, outro processo do uvicorn) ou
+  que já terminaram são servidos a partir do registro: progresso e
+  resultados lidos a cada STREAM_POLL_S, com cursor em job_resultados.seq.
+  Os itens chegam ao registro em lotes durante a coleta (core.job_context),
+  então esse stream acompanha a coleta com atraso de até ~2s.
+- Os eventos ao vivo não carregam o seq do registro. Se um assinante ao vivo
+  passa a ler o registro no meio do stream, ele recebe {"evento": "reinicio"}
+  e depois todos os itens desde o início (o cliente descarta o que já tinha).
+"""
+import asyncio
+import json
+import logging
+import threading
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from ..core.job_context import nome_processo
+from ..db.jobs_repository import (
+    JobsRepository,
+    STATUS_FAILED,
+    STATUS_SUCCEEDED,
+)
+
+logger = logging.getLogger(__name__)
+
+STREAM_QUEUE_SIZE = 1000
+STREAM_KEEPALIVE_S = 15.0
+STREAM_POLL_S = 1.0
+
+STATUS_FINAIS = (STATUS_SUCCEEDED, STATUS_FAILED)
+
+
+class _Assinatura:
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.loop = loop
+        self.fila: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=maxsize)
+        self.descartados = 0
+
+    def entregar(self, evento: Dict[str, Any]) -> None:
+        # Roda no event loop do assinante
+        if self.fila.full():
+            self.fila.get_nowait()
+            self.descartados += 1
+        self.fila.put_nowait(evento)
+
+
+_assinaturas: Dict[str, Set[_Assinatura]] = {}
+_lock = threading.Lock()
+
+
+def assinar(job_id: str, maxsize: int = STREAM_QUEUE_SIZE) -> _Assinatura:
+    sub = _Assinatura(asyncio.get_running_loop(), maxsize)
+    with _lock:
+        _assinaturas.setdefault(job_id, set()).add(sub)
+    return sub
+
+
+def cancelar(job_id: str, sub: _Assinatura) -> None:
+    with _lock:
+        subs = _assinaturas.get(job_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                _assinaturas.pop(job_id, None)
+
+
+def publicar(job_id: str, evento: Dict[str, Any]) -> None:
+    """Entrega `evento` a todos os assinantes do job (thread-safe, não bloqueia)."""
+    with _lock:
+        subs = list(_assinaturas.get(job_id, ()))
+    for sub in subs:
+        try:
+            sub.loop.call_soon_threadsafe(sub.entregar, evento)
+        except RuntimeError:
+            # Loop do assinante já encerrado
+            cancelar(job_id, sub)
+
+
+def formatar(evento: Dict[str, Any], formato: str) -> str:
+    dados = json.dumps(evento, ensure_ascii=False, default=str)
+    if formato == "ndjson":
+        return dados + "\n"
+    return f"event: {evento.get('evento', 'message')}\ndata: {dados}\n\n"
+
+
+def _keepalive(formato: str) -> str:
+    return ": keepalive\n\n" if formato == "sse" else "\n"
+
+
+async def _stream_registro(
+    repo: JobsRepository, job_id: str, formato: str
+) -> AsyncIterator[str]:
+    """Progresso e resultados lidos do registro, até o job terminar."""
+    seq = 0
+    ultimo_progresso = None
+    while True:
+        job = await asyncio.to_thread(repo.obter, job_id)
+        if job is None:
+            return
+        if job["progresso"] and job["progresso"] != ultimo_progresso:
+            ultimo_progresso = job["progresso"]
+            yield formatar({"evento": "progresso", **job["progresso"]}, formato)
+
+        while True:
+            lote = await asyncio.to_thread(repo.listar_resultados, job_id, seq, 500)
+            if not lote:
+                break
+            for r in lote:
+                yield formatar({"evento": "item", "fonte": r["fonte"], "item": r["item"]}, formato)
+            seq += len(lote)
+
+        if job["status"] in STATUS_FINAIS:
+            yield formatar({"evento": "fim", "status": job["status"], "erro": job.get("erro")}, formato)
+            return
+        await asyncio.sleep(STREAM_POLL_S)
+
+
+def _em_outro_processo(job: Dict[str, Any]) -> bool:
+    return job.get("worker") not in (None, nome_processo())
+
+
+async def stream_job(repo: JobsRepository, job_id: str, formato: str, ao_vivo: bool) -> AsyncIterator[str]:
+    """
+    Gera o stream do job. `ao_vivo` indica que o job roda (ou vai rodar) em
+    processo da API; se ele já começou em outro processo, ou já terminou,
+    usa o registro.
+    """
+    job = await asyncio.to_thread(repo.obter, job_id)
+    if job is None:
+        return
+    if not ao_vivo or job["status"] in STATUS_FINAIS or _em_outro_processo(job):
+        async for linha in _stream_registro(repo, job_id, formato):
+            yield linha
+        return
+
+    sub = assinar(job_id)
+    itens_entregues = False
+    avisados = 0
+    try:
+        # Terminou entre a consulta e a assinatura: o "fim" já foi publicado
+        job = await asyncio.to_thread(repo.obter, job_id)
+        if job is None or job["status"] in STATUS_FINAIS or _em_outro_processo(job):
+            async for linha in _stream_registro(repo, job_id, formato):
+                yield linha
+            return
+
+        while True:
+            try:
+                evento = await asyncio.wait_for(sub.fila.get(), timeout=STREAM_KEEPALIVE_S)
+            except asyncio.TimeoutError:
+                # Sem eventos: o job pode ter começado (ou terminado) em outro
+                # processo do uvicorn; o registro tem o que foi coletado
+                job = await asyncio.to_thread(repo.obter, job_id)
+                if job is None:
+                    return
+                if job["status"] in STATUS_FINAIS or _em_outro_processo(job):
+                    # Sem seq nos eventos ao vivo: o registro é relido do início
+                    if itens_entregues:
+                        yield formatar({"evento": "reinicio"}, formato)
+                    async for linha in _stream_registro(repo, job_id, formato):
+                        yield linha
+                    return
+                yield _keepalive(formato)
+                continue
+
+            if sub.descartados > avisados:
+                yield formatar({"evento": "aviso", "descartados": sub.descartados - avisados}, formato)
+                avisados = sub.descartados
+            if evento.get("evento") == "item":
+                itens_entregues = True
+            yield formatar(evento, formato)
+            if evento.get("evento") == "fim":
+                return
+    finally:
+        cancelar(job_id, sub)
@@ -0,0 +1,85 @@
+"""
+job_runner.py
+Despacho dos jobs de coleta por tipo, usado pela API e pelo worker.
+
+- agendar(): cria o job. Com JOBS_USE_WORKER=true ele só fica na fila
+  ("queued") para um `python -m backend.app.worker`; senão roda no próprio
+  processo da API via BackgroundTasks (comportamento anterior).
+- executar_por_tipo(): roda o job a partir de (tipo, params) serializáveis.
+  `extras` são objetos que só existem no processo da API (ex.: a sessão
+  Chrome já aberta pelo endpoint) e não vão para a fila.
+"""
+import logging
+import os
+import time
+from typing import Any, Callable, Dict
+
+from fastapi import BackgroundTasks
+
+from ..core.metrics import JOBS
+from .jobs import criar_job, executar_job
+
+logger = logging.getLogger(__name__)
+
+
+def is_worker_mode() -> bool:
+    """API só enfileira; a coleta roda em processo(s) worker."""
+    return os.getenv("JOBS_USE_WORKER", "false").lower() in ("true", "1", "yes")
+
+
+def _run_pgc(params: Dict[str, Any]):
+    from .pgc_service import coleta_pgc
+    return coleta_pgc(str(params["ano_ref"]))
+
+
+def _run_pncp(params: Dict[str, Any]):
+    from .pncp_service import coleta_pncp
+    return coleta_pncp("", "", str(params["ano_ref"]))
+
+
+def _run_coleta_unificada(params: Dict[str, Any], preopened_session=None):
+    from .coleta_unificada import executar_coletas_sequenciais
+    return executar_coletas_sequenciais(int(params["ano_ref"]), preopened_session)
+
+
+def _run_coleta_lote(params: Dict[str, Any], sessoes=None):
+    from .coleta_pool import abrir_sessoes, executar_coleta_em_lote, montar_unidades
+
+    unidades = montar_unidades(params["anos"], params["fontes"])
+    if sessoes is None:
+        start_url = os.getenv("PGC_URL", "https://www.comprasnet.gov.br/seguro/loginPortalUASG.asp")
+        sessoes = abrir_sessoes(int(params["sessoes"]), start_url)
+        if not sessoes:
+            raise RuntimeError("Nenhuma sessão Chrome disponível para o lote.")
+    lote = executar_coleta_em_lote(unidades, sessoes)
+    logger.info(f"Resumo da coleta em lote: {lote.resumo()}")
+    return lote
+
+
+EXECUTORES: Dict[str, Callable[..., Any]] = {
+    "pgc": _run_pgc,
+    "pncp": _run_pncp,
+    "coleta_unificada": _run_coleta_unificada,
+    "coleta_lote": _run_coleta_lote,
+}
+
+
+def executar_por_tipo(job_id: str, tipo: str, params: Dict[str, Any], **extras) -> None:
+    executor = EXECUTORES.get(tipo)
+    if executor is None:
+        raise ValueError(f"Tipo de job desconhecido: {tipo}")
+    inicio = time.perf_counter()
+    status = executar_job(job_id, executor, params, **extras)
+    JOBS.labels(tipo=tipo, status=status).observe(time.perf_counter() - inicio)
+
+
+def agendar(background_tasks: BackgroundTasks, tipo: str, params: Dict[str, Any], **extras) -> str:
+    """Cria o job e o coloca na fila do worker ou em BackgroundTasks."""
+    if tipo not in EXECUTORES:
+        raise ValueError(f"Tipo de job desconhecido: {tipo}")
+    job_id = criar_job(tipo, params)
+    if is_worker_mode():
+        logger.info(f"[JOB] {job_id} enfileirado para o worker ({tipo}).")
+    else:
+        background_tasks.add_task(executar_por_tipo, job_id, tipo, params, **extras)
+    return job_id
@@ -0,0 +1,193 @@
+"""
+jobs.py
+Execução de coletas como jobs rastreáveis (ID, estado, progresso, resultados).
+
+- criar_job(): registra o job (queued) e devolve o ID para a resposta da API.
+- executar_job(): roda a função de coleta em background com o job "corrente"
+  (core.job_context); marca running -> succeeded/failed.
+- reportar_progresso()/publicar_item(): ganchos dos scrapers, definidos em
+  core.job_context (reexportados aqui); registrar_resultados(): chamado pelos
+  services. Sem job corrente (CLI, scripts) não registram nada.
+  Progresso e itens também vão para o stream ao vivo (job_events); os itens
+  também são anexados à gravação bruta NDJSON em curso (ndjson_store) e
+  gravados em lotes nos resultados do job, uma vez por chave de negócio;
+  registrar_resultados() só acrescenta o que não passou por publicar_item().
+- falhar_orfaos_locais(): na partida da API e do worker, marca como failed os
+  jobs "running" cujo processo (nesta máquina) não existe mais.
+"""
+import logging
+import os
+import socket
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from ..core.job_context import (  # noqa: F401 (API pública deste módulo)
+    JobContexto,
+    ativar,
+    descarregar_resultados,
+    desativar,
+    gravar_progresso,
+    job_atual,
+    job_atual_id,
+    nome_processo,
+    publicar_item,
+    reportar_progresso,
+)
+from ..db.diff_coletas import chave_item
+from ..db.jobs_repository import (
+    JobsRepository,
+    STATUS_FAILED,
+    STATUS_SUCCEEDED,
+)
+from . import job_events
+
+logger = logging.getLogger(__name__)
+
+_repo: Optional[JobsRepository] = None
+_repo_lock = threading.Lock()
+
+
+def get_jobs_repository() -> JobsRepository:
+    """Repositório compartilhado (criado sob demanda)."""
+    global _repo
+    with _repo_lock:
+        if _repo is None:
+            _repo = JobsRepository()
+        return _repo
+
+
+def criar_job(tipo: str, params: Dict[str, Any]) -> str:
+    job_id = get_jobs_repository().criar(tipo, params)
+    logger.info(f"[JOB] {job_id} criado ({tipo}, {params})")
+    return job_id
+
+
+def executar_job(job_id: str, fn: Callable[..., Any], *args, **kwargs) -> str:
+    """Wrapper para BackgroundTasks: executa `fn` registrando estado e resumo. Retorna o status final."""
+    repo = get_jobs_repository()
+    ctx = JobContexto(job_id, repo, job_events.publicar)
+    token = ativar(ctx)
+    repo.marcar_inicio(job_id, nome_processo())
+    logger.info(f"[JOB] {job_id} iniciado")
+    try:
+        resultado = fn(*args, **kwargs)
+        _descarregar(ctx)
+        gravar_progresso(ctx, forcar=True)
+        repo.finalizar(job_id, STATUS_SUCCEEDED, resumo=_resumo(resultado))
+        job_events.publicar(job_id, {"evento": "fim", "status": STATUS_SUCCEEDED, "erro": None})
+        logger.info(f"[JOB] {job_id} concluído")
+        return STATUS_SUCCEEDED
+    except Exception as e:
+        logger.error(f"[JOB] {job_id} falhou: {e}", exc_info=True)
+        # Itens já coletados continuam consultáveis
+        _descarregar(ctx)
+        gravar_progresso(ctx, forcar=True)
+        repo.finalizar(job_id, STATUS_FAILED, erro=str(e))
+        job_events.publicar(job_id, {"evento": "fim", "status": STATUS_FAILED, "erro": str(e)})
+        return STATUS_FAILED
+    finally:
+        desativar(token)
+
+
+def _pid_ativo(pid: int) -> bool:
+    if os.name == "nt":
+        # os.kill(pid, 0) no Windows encerraria o processo
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return kernel32.GetLastError() == 5  # acesso negado: o processo existe
+        try:
+            codigo = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(codigo))
+            return codigo.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def falhar_orfaos_locais() -> int:
+    """
+    Marca como failed os jobs "running" deixados por processos desta máquina
+    que morreram (API com BackgroundTasks ou worker sem JOBS_WORKER_NAME) e os
+    sem worker registrado. O PID do próprio processo também conta como morto:
+    é de uma execução anterior. Jobs de outras máquinas e de workers com nome
+    fixo ficam para quem os reconhece.
+    """
+    repo = get_jobs_repository()
+    prefixo = f"{socket.gethostname()}-"
+    total = 0
+    for worker in repo.workers_em_execucao():
+        if worker is not None:
+            pid = worker[len(prefixo):] if worker.startswith(prefixo) else ""
+            if not pid.isdigit() or (int(pid) != os.getpid() and _pid_ativo(int(pid))):
+                continue
+        n = repo.falhar_orfaos(worker, erro="Processo encerrado durante a execução.")
+        if n:
+            logger.warning(f"[JOB] {n} job(s) órfão(s) de {worker or 'processo desconhecido'} marcados como failed.")
+        total += n
+    return total
+
+
+def _descarregar(ctx: JobContexto) -> None:
+    try:
+        with ctx.lock:
+            descarregar_resultados(ctx)
+    except Exception as e:
+        logger.error(f"[JOB] Falha ao gravar itens do job {ctx.job_id}: {e}")
+
+
+def registrar_resultados(fonte: str, dados: List[Dict[str, Any]]) -> None:
+    """
+    Anexa os itens coletados ao job corrente (consulta paginada na API).
+
+    Os itens que os scrapers já publicaram (publicar_item), de qualquer
+    thread, estão no registro: aqui só entram as chaves que ainda não estão
+    lá e os itens sem chave além dos já publicados.
+    """
+    ctx = job_atual()
+    if ctx is None or not dados:
+        return
+    try:
+        with ctx.lock:
+            descarregar_resultados(ctx)
+            chaves = ctx.publicados.setdefault(fonte, set())
+            sem_chave = ctx.sem_chave.get(fonte, 0)
+            restantes = []
+            for item in dados:
+                chave = chave_item(fonte, item)
+                if chave is None:
+                    if sem_chave:
+                        sem_chave -= 1
+                        continue
+                elif chave in chaves:
+                    continue
+                else:
+                    chaves.add(chave)
+                restantes.append(item)
+            ctx.sem_chave[fonte] = sem_chave
+        if restantes:
+            total = ctx.repo.adicionar_resultados(ctx.job_id, fonte, restantes)
+        else:
+            total = ctx.repo.total_resultados(ctx.job_id)
+        logger.info(f"[JOB] {ctx.job_id}: +{len(dados)} itens {fonte} (total {total})")
+    except Exception as e:
+        logger.error(f"[JOB] Falha ao registrar resultados {fonte}: {e}")
+
+
+def _resumo(resultado: Any) -> Any:
+    if resultado is None:
+        return None
+    if hasattr(resultado, "resumo"):
+        return resultado.resumo()
+    if isinstance(resultado, list):
+        return {"total_itens": len(resultado)}
+    if isinstance(resultado, dict):
+        return resultado
+    return str(resultado)
@@ -22,7 +22,10 @@ except Exception:
 # 🔴 FIM MODIFICAÇÃO LOCAL
 # ============================================================
 
+from ..db.diff_coletas import calcular_diff, is_diff_enabled
+from ..db.ndjson_store import gravacao_bruta
 from .excel_persistence import ExcelPersistence
+from .jobs import registrar_resultados
 
 logger = logging.getLogger(__name__)
 
@@ -36,28 +39,38 @@ def coleta_pgc(ano_ref: str, driver=None, close_driver: bool = True) -> List[Dic
 
     logger.info(f"[LOCAL] Iniciando coleta PGC para o ano {ano_ref}")
     
-    # 1. Coletar dados via Scraper (Lógica VBA)
-    dados_brutos = run_pgc_scraper_vba(ano_ref=ano_ref, driver=driver, close_driver=close_driver)
+    # 1. Coletar dados via Scraper (Lógica VBA); itens vão para o NDJSON à medida que chegam
+    with gravacao_bruta("PGC", ano_ref) as gravacao:
+        dados_brutos = run_pgc_scraper_vba(ano_ref=ano_ref, driver=driver, close_driver=close_driver)
     
     if not dados_brutos:
         logger.warning("[LOCAL] Coleta PGC não retornou dados.")
         return []
 
+    # Resultados do job corrente (GET /api/jobs/{id}/resultados)
+    registrar_resultados("PGC", dados_brutos)
+
+    # Delta em relação à coleta anterior (COLETA_DIFF=true): sinks gravam só o que mudou
+    diff = calcular_diff("PGC", ano_ref, dados_brutos) if is_diff_enabled() else None
+
     # ============================================================
     # 🔴 INÍCIO MODIFICAÇÃO LOCAL - REMOVER QUANDO VOLTAR DOCKER
     # ============================================================
     
-    # 2. Armazenar em JSON temporário (Postgres desabilitado)
+    # O snapshot do diff só avança depois que todos os sinks gravaram o delta
+    persistido = False
+
+    # 2. Armazenar em NDJSON temporário (Postgres desabilitado)
     try:
         repo = ColetasRepository()
-        repo.salvar_bruto(fonte="PGC", dados=dados_brutos)
-        logger.info("[LOCAL] ✅ Dados salvos em JSON temporário")
+        persistido = repo.salvar_bruto(fonte="PGC", dados=dados_brutos, ano_ref=ano_ref, gravacao=gravacao, diff=diff)
+        logger.info("[LOCAL] ✅ Dados salvos em NDJSON temporário")
         
         # Consolidação desabilitada em modo local
         # repo.consolidar_dados()
         
     except Exception as e:
-        logger.error(f"[LOCAL] ❌ Erro na persistência JSON: {e}")
+        logger.error(f"[LOCAL] ❌ Erro na persistência NDJSON: {e}")
 
     # 3. Armazenar no Excel (MODIFICADO - caminho local)
     try:
@@ -70,8 +83,14 @@ def coleta_pgc(ano_ref: str, driver=None, close_driver: bool = True) -> List[Dic
         excel_path = os.path.join(outputs_dir, filename)
 
         excel = ExcelPersistence(excel_path)
-        excel.update_pgc_sheet(dados_brutos)
-        excel.sync_to_geral()
+        gravou_pgc = excel.update_pgc_sheet(dados_brutos, diff=diff)
+        # Na sessão as duas abas saem num único save e a confirmação roda depois
+        # dele; fora dela, a aba PGC precisa já ter sido gravada
+        confirmar = diff.confirmar if diff is not None and persistido and gravou_pgc is not False else None
+        if diff is not None and not diff.completo:
+            excel.sync_to_geral(dfds=diff.chaves_alteradas(), ao_gravar=confirmar)
+        else:
+            excel.sync_to_geral(ao_gravar=confirmar)
         
         logger.info(f"[LOCAL] ✅ Excel salvo com sucesso!")
         logger.info(f"[LOCAL] 📁 Arquivo: {excel_path}")
@@ -79,6 +98,9 @@ def coleta_pgc(ano_ref: str, driver=None, close_driver: bool = True) -> List[Dic
         
     except Exception as e:
         logger.error(f"[LOCAL] ❌ Erro na persistência Excel: {e}")
+
+    if diff is not None and not persistido:
+        logger.warning("[LOCAL] Snapshot do diff PGC mantido: a próxima coleta regrava o delta")
     
     # ============================================================
     # 🔴 FIM MODIFICAÇÃO LOCAL
@@ -19,7 +19,10 @@ except Exception:
 # 🔴 FIM MODIFICAÇÃO LOCAL
 # ============================================================
 
+from ..db.diff_coletas import calcular_diff, is_diff_enabled
+from ..db.ndjson_store import gravacao_bruta
 from .excel_persistence import ExcelPersistence
+from .jobs import registrar_resultados
 from typing import Dict, Any, List
 import logging
 import os
@@ -46,13 +49,14 @@ def coleta_pncp(
     
     logger.info(f"[LOCAL] INICIANDO COLETA PNCP - ANO {ano_ref}")
     
-    # Execução real
-    dados_brutos = run_pncp_scraper_vba(
-        ano_ref=ano_ref,
-        driver=driver,
-        close_driver=close_driver,
-        reuse_driver=reuse_driver
-    )
+    # Execução real; itens vão para o NDJSON à medida que chegam
+    with gravacao_bruta("PNCP", ano_ref) as gravacao:
+        dados_brutos = run_pncp_scraper_vba(
+            ano_ref=ano_ref,
+            driver=driver,
+            close_driver=close_driver,
+            reuse_driver=reuse_driver
+        )
     
     resultado = {
         "status": "ok" if dados_brutos else "no_data",
@@ -61,20 +65,29 @@ def coleta_pncp(
         "modo": "REAL_LOCAL"
     }
 
+    # Resultados do job corrente (GET /api/jobs/{id}/resultados)
+    registrar_resultados("PNCP", dados_brutos)
+
+    # Delta em relação à coleta anterior (COLETA_DIFF=true): sinks gravam só o que mudou
+    diff = calcular_diff("PNCP", ano_ref, dados_brutos) if dados_brutos and is_diff_enabled() else None
+
     # ============================================================
     # 🔴 INÍCIO MODIFICAÇÃO LOCAL - REMOVER QUANDO VOLTAR DOCKER
     # ============================================================
     
-    # Persistência em JSON temporário
+    # O snapshot do diff só avança depois que todos os sinks gravaram o delta
+    persistido = False
+
+    # Persistência em NDJSON temporário
     if dados_brutos:
-        logger.info(f"[LOCAL] Persistindo {len(dados_brutos)} itens em JSON...")
+        logger.info(f"[LOCAL] Persistindo {len(dados_brutos)} itens em NDJSON...")
         try:
             repo = ColetasRepository()
-            repo.salvar_bruto(fonte="PNCP", dados=dados_brutos)
+            persistido = repo.salvar_bruto(fonte="PNCP", dados=dados_brutos, ano_ref=ano_ref, gravacao=gravacao, diff=diff)
             # repo.consolidar_dados()  # Desabilitado em modo local
             resultado["_status_db"] = "json_local"
         except Exception as e:
-            logger.error(f"[LOCAL] ❌ Erro na persistência JSON: {e}")
+            logger.error(f"[LOCAL] ❌ Erro na persistência NDJSON: {e}")
             resultado["_status_db"] = "erro"
 
     # Persistência em Excel LOCAL
@@ -87,12 +100,16 @@ def coleta_pncp(
             excel_path = os.path.join(outputs_dir, f"PGC_{ano_ref}.xlsx")
             
             excel = ExcelPersistence(excel_path)
-            excel.update_pncp_sheet(dados_brutos)
+            confirmar = diff.confirmar if diff is not None and persistido else None
+            excel.update_pncp_sheet(dados_brutos, diff=diff, ao_gravar=confirmar)
             
             logger.info(f"[LOCAL] ✅ Excel atualizado: {excel_path}")
             
         except Exception as e:
             logger.error(f"[LOCAL] ❌ Erro no Excel: {e}")
+
+    if diff is not None and not persistido:
+        logger.warning("[LOCAL] Snapshot do diff PNCP mantido: a próxima coleta regrava o delta")
     
     # ============================================================
     # 🔴 FIM MODIFICAÇÃO LOCAL
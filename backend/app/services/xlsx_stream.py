@@ -0,0 +1,386 @@
+"""
+xlsx_stream.py
+Substituição de UMA aba de um .xlsx existente por escrita em streaming.
+
+O .xlsx é um zip de partes XML independentes. Em vez de load_workbook (que
+parseia todas as abas) + save, este módulo:
+
+1. localiza a parte XML da aba pelo workbook.xml/rels;
+2. gera o <sheetData> linha a linha (strings inline, sem sharedStrings;
+   datas como número serial com formato de data, como o openpyxl),
+   calculando a largura das colunas na mesma passada;
+3. mantém o resto da aba existente como está (sheetViews/painéis
+   congelados, autoFilter, formatação condicional, validação de dados,
+   mesclagens, configuração de página...), trocando só <dimension>, as
+   larguras das colunas reescritas e o <sheetData>;
+4. acrescenta ao styles.xml só os estilos necessários (reaproveitando os
+   que já existirem);
+5. monta um zip novo copiando as demais partes byte a byte (sem parse) e o
+   troca pelo original de forma atômica (arquivo temporário + os.replace).
+
+Qualquer estrutura inesperada gera XlsxStreamError; quem chama decide o
+fallback (openpyxl).
+"""
+import datetime
+import math
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape, quoteattr, unescape
+
+from openpyxl.utils.datetime import to_excel
+
+# Caracteres de controle proibidos em XML 1.0 (openpyxl recusaria a célula)
+_ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_COPY_CHUNK = 1024 * 1024
+
+# Formatos que o openpyxl aplica ao gravar date/datetime numa célula sem formato
+DATE_FORMAT = "yyyy-mm-dd"
+DATETIME_FORMAT = "yyyy-mm-dd h:mm:ss"
+
+
+class XlsxStreamError(Exception):
+    """Estrutura do .xlsx não suportada pela escrita em streaming."""
+
+
+@dataclass(frozen=True)
+class CellStyle:
+    """Subconjunto de estilo usado pelas abas do projeto."""
+    bold: bool = False
+    fill_rgb: Optional[str] = None
+    number_format: Optional[str] = None
+    align_center: bool = False
+
+
+def column_letter(idx: int) -> str:
+    """1 -> A, 27 -> AA."""
+    letters = ""
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+# ---------------------------------------------------------------------------
+# styles.xml (edição textual: preserva namespaces/extensões do Excel)
+# ---------------------------------------------------------------------------
+
+_BUILTIN_NUMFMTS = {"General": 0, "0": 1, "0.00": 2, "#,##0": 3, "#,##0.00": 4, "@": 49}
+
+
+def _section(xml: str, tag: str):
+    """Retorna (início, fim, atributos sem count, conteúdo interno) de <tag ...>...</tag>."""
+    m = re.search(rf"<{tag}\b([^>]*?)(/>|>(.*?)</{tag}>)", xml, re.S)
+    if not m:
+        return None
+    attrs = re.sub(r'\s*\bcount="\d*"', "", m.group(1)).rstrip()
+    return m.start(), m.end(), attrs, (m.group(3) or "")
+
+
+def _children(inner: str, child: str) -> List[str]:
+    return re.findall(rf"<{child}\b[^>]*?/>|<{child}\b[^>]*?>.*?</{child}>", inner, re.S)
+
+
+def _ensure_child(xml: str, section: str, child: str, snippet: str, after: Optional[str] = None):
+    """Garante `snippet` como filho de <section>; devolve (xml, índice)."""
+    sec = _section(xml, section)
+    if sec is None:
+        if after is None:
+            raise XlsxStreamError(f"styles.xml sem <{section}>")
+        anchor = re.search(rf"<{after}\b[^>]*>", xml)
+        if not anchor:
+            raise XlsxStreamError(f"styles.xml sem <{after}>")
+        new = f'<{section} count="1">{snippet}</{section}>'
+        return xml[: anchor.end()] + new + xml[anchor.end():], 0
+
+    start, end, attrs, inner = sec
+    items = _children(inner, child)
+    norm = lambda s: re.sub(r"\s+", " ", s.replace(" />", "/>")).strip()
+    for i, item in enumerate(items):
+        if norm(item) == norm(snippet):
+            return xml, i
+    items.append(snippet)
+    new = f'<{section}{attrs} count="{len(items)}">{"".join(items)}</{section}>'
+    return xml[:start] + new + xml[end:], len(items) - 1
+
+
+def _ensure_numfmt(xml: str, code: str):
+    if code in _BUILTIN_NUMFMTS:
+        return xml, _BUILTIN_NUMFMTS[code]
+    sec = _section(xml, "numFmts")
+    existing = _children(sec[3], "numFmt") if sec else []
+    ids = []
+    for item in existing:
+        m_id = re.search(r'numFmtId="(\d+)"', item)
+        # quoteattr usa aspas simples quando o código tem aspas duplas
+        m_code = re.search(r"""formatCode=(["'])(.*?)\1""", item)
+        if m_id:
+            ids.append(int(m_id.group(1)))
+            if m_code and unescape(m_code.group(2), {"&quot;": '"', "&apos;": "'"}) == code:
+                return xml, int(m_id.group(1))
+    fmt_id = max(ids + [163]) + 1
+    snippet = f"<numFmt numFmtId=\"{fmt_id}\" formatCode={quoteattr(code)}/>"
+    xml, _ = _ensure_child(xml, "numFmts", "numFmt", snippet, after="styleSheet")
+    return xml, fmt_id
+
+
+def _add_styles(styles_xml: str, styles: Sequence[CellStyle]) -> Tuple[str, Dict[CellStyle, int]]:
+    """Acrescenta (ou reaproveita) xfs para cada estilo; devolve índices de cellXfs."""
+    xml = styles_xml
+    out: Dict[CellStyle, int] = {}
+    for st in styles:
+        if st in out:
+            continue
+        font_id = fill_id = num_id = 0
+        if st.bold:
+            xml, font_id = _ensure_child(
+                xml, "fonts", "font",
+                '<font><b val="1"/><sz val="11"/><name val="Calibri"/><family val="2"/></font>',
+            )
+        if st.fill_rgb:
+            xml, fill_id = _ensure_child(
+                xml, "fills", "fill",
+                f'<fill><patternFill patternType="solid"><fgColor rgb="00{st.fill_rgb}"/>'
+                f'<bgColor rgb="00{st.fill_rgb}"/></patternFill></fill>',
+            )
+        if st.number_format:
+            xml, num_id = _ensure_numfmt(xml, st.number_format)
+        attrs = f'numFmtId="{num_id}" fontId="{font_id}" fillId="{fill_id}" borderId="0" xfId="0"'
+        if num_id:
+            attrs += ' applyNumberFormat="1"'
+        if font_id:
+            attrs += ' applyFont="1"'
+        if fill_id:
+            attrs += ' applyFill="1"'
+        if st.align_center:
+            snippet = f'<xf {attrs} applyAlignment="1"><alignment horizontal="center"/></xf>'
+        else:
+            snippet = f"<xf {attrs}/>"
+        xml, out[st] = _ensure_child(xml, "cellXfs", "xf", snippet)
+    return xml, out
+
+
+# ---------------------------------------------------------------------------
+# Localização da aba
+# ---------------------------------------------------------------------------
+
+def _sheet_part(zf: zipfile.ZipFile, sheet_name: str) -> str:
+    workbook = zf.read("xl/workbook.xml").decode("utf-8")
+    rid = None
+    for m in re.finditer(r"<(?:\w+:)?sheet\b[^>]*/?>", workbook):
+        tag = m.group(0)
+        name = re.search(r'\bname="([^"]*)"', tag)
+        if name and name.group(1) == escape(sheet_name, {'"': "&quot;"}):
+            r = re.search(r'\br:id="([^"]*)"', tag) or re.search(r'\b\w+:id="([^"]*)"', tag)
+            rid = r.group(1) if r else None
+            break
+    if rid is None:
+        raise XlsxStreamError(f"Aba '{sheet_name}' não encontrada no workbook.xml")
+
+    rels = zf.read("xl/_rels/workbook.xml.rels").decode("utf-8")
+    for m in re.finditer(r"<Relationship\b[^>]*/?>", rels):
+        tag = m.group(0)
+        if re.search(rf'\bId="{re.escape(rid)}"', tag):
+            target = re.search(r'\bTarget="([^"]*)"', tag).group(1)
+            part = target.lstrip("/") if target.startswith("/") else "xl/" + target
+            if part not in zf.namelist():
+                raise XlsxStreamError(f"Parte {part} ausente no pacote")
+            return part
+    raise XlsxStreamError(f"Relacionamento {rid} da aba '{sheet_name}' não encontrado")
+
+
+# ---------------------------------------------------------------------------
+# Escrita da aba
+# ---------------------------------------------------------------------------
+
+def _clone_info(info: zipfile.ZipInfo, compress_type: Optional[int] = None) -> zipfile.ZipInfo:
+    """ZipInfo novo para o destino (o original guarda offsets do zip de origem)."""
+    novo = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    novo.compress_type = compress_type if compress_type is not None else info.compress_type
+    novo.external_attr = info.external_attr
+    return novo
+
+
+def _cell_xml(ref: str, value: Any, style_id: int) -> str:
+    """
+    XML de uma célula. date/datetime viram número serial (como no openpyxl);
+    `style_id` deve então apontar para um xf com formato de data.
+    """
+    s = f' s="{style_id}"' if style_id else ""
+    if value is None:
+        return f'<c r="{ref}"{s}/>' if style_id else ""
+    if isinstance(value, bool):
+        return f'<c r="{ref}"{s} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)) and math.isfinite(value):
+        return f'<c r="{ref}"{s}><v>{value!r}</v></c>'
+    if isinstance(value, datetime.date):
+        return f'<c r="{ref}"{s}><v>{to_excel(value)!r}</v></c>'
+    text = escape(_ILLEGAL_XML.sub("", str(value)))
+    return f'<c r="{ref}"{s} t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _date_style(style: Optional[CellStyle], value: datetime.date) -> CellStyle:
+    """Estilo de uma data: o da coluna, com formato de data se a coluna não definir outro."""
+    base = style or CellStyle()
+    if base.number_format:
+        return base
+    fmt = DATETIME_FORMAT if isinstance(value, datetime.datetime) else DATE_FORMAT
+    return CellStyle(base.bold, base.fill_rgb, fmt, base.align_center)
+
+
+# ---------------------------------------------------------------------------
+# Aba existente: tudo fora do <sheetData> é mantido
+# ---------------------------------------------------------------------------
+
+_SHEETDATA_OPEN = re.compile(rb"<sheetData\b[^>]*?(/?)>")
+_SHEETDATA_CLOSE = b"</sheetData>"
+
+
+def _split_sheet(zf: zipfile.ZipFile, part: str) -> Tuple[str, str]:
+    """
+    Lê a aba em blocos e devolve (início até <sheetData>, fim após </sheetData>),
+    sem carregar as linhas antigas na memória.
+    """
+    with zf.open(part) as r:
+        head = b""
+        while True:
+            m = _SHEETDATA_OPEN.search(head)
+            if m:
+                break
+            chunk = r.read(_COPY_CHUNK)
+            if not chunk:
+                raise XlsxStreamError(f"{part} sem <sheetData> (namespace com prefixo?)")
+            head += chunk
+        rest = head[m.end():]
+        head = head[: m.start()]
+        if not m.group(1):
+            keep = len(_SHEETDATA_CLOSE) - 1
+            while True:
+                pos = rest.find(_SHEETDATA_CLOSE)
+                if pos >= 0:
+                    rest = rest[pos + len(_SHEETDATA_CLOSE):]
+                    break
+                chunk = r.read(_COPY_CHUNK)
+                if not chunk:
+                    raise XlsxStreamError(f"{part} sem </sheetData>")
+                rest = rest[-keep:] + chunk
+        tail = rest + r.read()
+    return head.decode("utf-8"), tail.decode("utf-8")
+
+
+def _update_head(head: str, dimension: str, cols: List[str], ncols: int) -> str:
+    """Troca <dimension> e as larguras das colunas 1..ncols; demais <col> ficam."""
+    head = re.sub(r"<dimension\b[^>]*/>", f'<dimension ref="{dimension}"/>', head, count=1)
+    m = re.search(r"<cols\b[^>]*>(.*?)</cols>|<cols\b[^>]*/>", head, re.S)
+    extras = []
+    if m:
+        for col in _children(m.group(1) or "", "col"):
+            m_min = re.search(r'\bmin="(\d+)"', col)
+            if m_min and int(m_min.group(1)) > ncols:
+                extras.append(col)
+    new = f"<cols>{''.join(cols + extras)}</cols>"
+    if m:
+        return head[: m.start()] + new + head[m.end():]
+    return head + new
+
+
+def replace_sheet(
+    file_path: str,
+    sheet_name: str,
+    headers: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    header_style: Optional[CellStyle] = None,
+    column_styles: Optional[Dict[int, CellStyle]] = None,
+    max_width: int = 50,
+) -> int:
+    """
+    Reescreve os dados da aba `sheet_name` de `file_path` com `headers` + `rows`.
+
+    `column_styles` mapeia coluna (1-based) -> estilo das células de dados.
+    Larguras: min(maior len(str(valor)) + 2, max_width), como o ajuste
+    automático do VBA. Devolve a quantidade de linhas de dados escritas.
+    """
+    column_styles = column_styles or {}
+    ncols = len(headers)
+    letters = [column_letter(i) for i in range(1, ncols + 1)]
+    widths = [len(str(h)) for h in headers]
+    directory = os.path.dirname(os.path.abspath(file_path))
+
+    with zipfile.ZipFile(file_path) as src:
+        part = _sheet_part(src, sheet_name)
+        head, tail = _split_sheet(src, part)
+        styles_xml = src.read("xl/styles.xml").decode("utf-8")
+        wanted = [s for s in [header_style, *column_styles.values()] if s is not None]
+        styles_xml, style_ids = _add_styles(styles_xml, wanted)
+        header_sid = style_ids.get(header_style, 0) if header_style else 0
+        col_sid = [style_ids.get(column_styles.get(i + 1), 0) if column_styles.get(i + 1) else 0
+                   for i in range(ncols)]
+
+        def date_sid(i: int, value: datetime.date) -> int:
+            nonlocal styles_xml
+            st = _date_style(column_styles.get(i + 1), value)
+            if st not in style_ids:
+                styles_xml, novos = _add_styles(styles_xml, [st])
+                style_ids.update(novos)
+            return style_ids[st]
+
+        # 1) sheetData num temporário (larguras só se conhecem no fim)
+        data_fd, data_path = tempfile.mkstemp(suffix=".sheetdata", dir=directory)
+        n = 0
+        try:
+            with os.fdopen(data_fd, "w", encoding="utf-8") as out:
+                cells = "".join(_cell_xml(f"{letters[i]}1", h, header_sid) for i, h in enumerate(headers))
+                out.write(f'<row r="1">{cells}</row>')
+                buf: List[str] = []
+                for n, row in enumerate(rows, 1):
+                    r = n + 1
+                    parts = []
+                    for i in range(ncols):
+                        v = row[i] if i < len(row) else None
+                        ln = len(str(v))
+                        if ln > widths[i]:
+                            widths[i] = ln
+                        sid = date_sid(i, v) if isinstance(v, datetime.date) else col_sid[i]
+                        parts.append(_cell_xml(f"{letters[i]}{r}", v, sid))
+                    buf.append(f'<row r="{r}">{"".join(parts)}</row>')
+                    if len(buf) >= 1000:
+                        out.write("".join(buf))
+                        buf.clear()
+                out.write("".join(buf))
+
+            # 2) zip novo: aba e styles regenerados, demais partes copiadas
+            zip_fd, zip_path = tempfile.mkstemp(suffix=".xlsx", dir=directory)
+            os.close(zip_fd)
+            try:
+                cols = [
+                    f'<col min="{i + 1}" max="{i + 1}" width="{min(w + 2, max_width)}" customWidth="1"/>'
+                    for i, w in enumerate(widths)
+                ]
+                head = _update_head(head, f"A1:{letters[-1]}{n + 1}", cols, ncols) + "<sheetData>"
+                tail = "</sheetData>" + tail
+                with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as dst:
+                    for info in src.infolist():
+                        if info.filename == part:
+                            with dst.open(_clone_info(info, zipfile.ZIP_DEFLATED), "w") as w, \
+                                    open(data_path, "rb") as r:
+                                w.write(head.encode("utf-8"))
+                                shutil.copyfileobj(r, w, _COPY_CHUNK)
+                                w.write(tail.encode("utf-8"))
+                        elif info.filename == "xl/styles.xml":
+                            dst.writestr(_clone_info(info, zipfile.ZIP_DEFLATED), styles_xml.encode("utf-8"))
+                        else:
+                            with src.open(info) as r, dst.open(_clone_info(info), "w") as w:
+                                shutil.copyfileobj(r, w, _COPY_CHUNK)
+            except Exception:
+                os.remove(zip_path)
+                raise
+        finally:
+            os.remove(data_path)
+
+    os.replace(zip_path, file_path)
+    return n
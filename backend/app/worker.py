@@ -0,0 +1,89 @@
+"""
+worker.py
+Processo worker de coleta, desacoplado do event loop do FastAPI.
+
+Uso:
+    python -m backend.app.worker            # consome a fila até Ctrl+C/SIGTERM
+    python -m backend.app.worker --once     # processa no máximo um job
+
+A API (com JOBS_USE_WORKER=true) apenas cria o job "queued" no registro
+compartilhado (JOBS_DB_PATH); cada worker reserva um job por vez. Para
+aumentar a vazão, suba mais processos worker (um Chrome/login por worker).
+
+Variáveis:
+- JOBS_WORKER_NAME: nome estável do worker. Quando definido, jobs que ficaram
+  "running" com esse nome (processo anterior morreu) são marcados como failed
+  na partida. Sem ele o nome é "<host>-<pid>" e, como na partida da API, os
+  jobs de processos desta máquina que não existem mais são marcados como failed
+  (jobs.falhar_orfaos_locais).
+- JOBS_POLL_S: intervalo de consulta da fila vazia (padrão 2s).
+- JOBS_WORKER_TIPOS: restringe os tipos atendidos (ex.: "pgc,pncp").
+"""
+import argparse
+import logging
+import os
+import signal
+import time
+
+from backend.app.core.logging_config import setup_logging
+from backend.app.db.jobs_repository import STATUS_FAILED
+from backend.app.services.jobs import falhar_orfaos_locais, get_jobs_repository, nome_processo
+from backend.app.services.job_runner import executar_por_tipo
+
+logger = logging.getLogger("backend.app.worker")
+
+_parar = False
+
+
+def _sinal_parada(signum, frame):
+    global _parar
+    _parar = True
+    logger.info(f"[WORKER] Sinal {signum} recebido; encerrando após o job atual.")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Worker de coleta PGC/PNCP")
+    parser.add_argument("--once", action="store_true", help="Processa no máximo um job e sai.")
+    args = parser.parse_args()
+
+    setup_logging()
+    signal.signal(signal.SIGINT, _sinal_parada)
+    signal.signal(signal.SIGTERM, _sinal_parada)
+
+    nome_fixo = os.getenv("JOBS_WORKER_NAME")
+    worker = nome_fixo or nome_processo()
+    poll_s = float(os.getenv("JOBS_POLL_S", "2"))
+    tipos = [t.strip() for t in os.getenv("JOBS_WORKER_TIPOS", "").split(",") if t.strip()] or None
+
+    repo = get_jobs_repository()
+    if nome_fixo:
+        orfaos = repo.falhar_orfaos(worker)
+        if orfaos:
+            logger.warning(f"[WORKER] {orfaos} job(s) órfão(s) de {worker} marcados como failed.")
+    falhar_orfaos_locais()
+
+    logger.info(f"[WORKER] {worker} aguardando jobs em {repo.db_path} (tipos: {tipos or 'todos'})")
+    while not _parar:
+        job = repo.reservar_proximo(worker, tipos)
+        if job is None:
+            if args.once:
+                break
+            time.sleep(poll_s)
+            continue
+
+        logger.info(f"[WORKER] {worker} executando job {job['id']} ({job['tipo']})")
+        try:
+            executar_por_tipo(job["id"], job["tipo"], job["params"])
+        except Exception as e:
+            # executar_job já registra falhas da coleta; aqui só tipo inválido
+            logger.error(f"[WORKER] Job {job['id']} não executado: {e}")
+            repo.finalizar(job["id"], STATUS_FAILED, erro=str(e))
+        if args.once:
+            break
+
+    logger.info(f"[WORKER] {worker} encerrado.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+"""
+bench_excel_pgc.py
+Regressão de complexidade do upsert por DFD (update_pgc_sheet e sync_to_geral).
+
+Uso:
+    python benchmarks/bench_excel_pgc.py                    # 1k, 2k, 4k, 8k DFDs
+    python benchmarks/bench_excel_pgc.py --tamanhos 2000,8000 --verificar
+
+Cenário por tamanho N: aba PGC com N DFDs, aba Geral com N/2 deles; chegam
+N DFDs (metade já existentes, metade novos). Mede o tempo de cada método e o
+custo por DFD. Com --verificar, sai com código 1 se o custo por DFD no maior
+tamanho passar de --razao-max vezes o do menor (busca linear por DFD cresce
+proporcionalmente a N; com o índice o custo por DFD fica estável).
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+
+def _gerar_planilha(path, n):
+    from openpyxl import Workbook
+    from backend.app.services.excel_persistence import PNCP_HEADERS
+
+    wb = Workbook(write_only=True)
+    pgc = wb.create_sheet("PGC")
+    pgc.append(["Pag", "DFD", "Requisitante", "Descrição", "Valor",
+                "Situação", "Conclusão", "Editor", "Responsáveis", "PTA", "Justificativa"])
+    for i in range(n):
+        pgc.append([1, f"{i}/2025", "DIRAD", f"Descrição {i}", 100.0 + i,
+                    "Em elaboração", "", "Fulano", "Beltrano", "", ""])
+    wb.create_sheet("PNCP").append(PNCP_HEADERS)
+    geral = wb.create_sheet("Geral")
+    geral.append(["Pag"] + [""] * 10)
+    for i in range(0, n, 2):
+        geral.append([1, "", "", "", "", f"{i:04d}"[-4:], f"{i}/2025", "DIRAD", "", 0, ""])
+    wb.save(path)
+
+
+def _dados(n):
+    inicio = n // 2
+    return [
+        {"pag": 2, "dfd": f"{i}/2025", "requisitante": "DIRAD", "descricao": f"Atualizado {i}",
+         "valor": 200.0 + i, "situacao": "Concluído"}
+        for i in range(inicio, inicio + n)
+    ]
+
+
+def _medir(tmp, n):
+    from backend.app.services.excel_persistence import ExcelPersistence
+
+    path = os.path.join(tmp, f"pgc_{n}.xlsx")
+    _gerar_planilha(path, n)
+    persist = ExcelPersistence(path)
+    dados = _dados(n)
+
+    t0 = time.perf_counter()
+    persist.update_pgc_sheet(dados)
+    t1 = time.perf_counter()
+    persist.sync_to_geral()
+    t2 = time.perf_counter()
+    return {
+        "dfds": n,
+        "update_pgc_s": round(t1 - t0, 3),
+        "sync_geral_s": round(t2 - t1, 3),
+        "us_por_dfd": round((t2 - t0) / n * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regressão do upsert por DFD no Excel")
+    parser.add_argument("--tamanhos", default="1000,2000,4000,8000")
+    parser.add_argument("--verificar", action="store_true")
+    parser.add_argument("--razao-max", type=float, default=2.0)
+    parser.add_argument("--json", help="Grava os resultados neste arquivo.")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in [int(t) for t in args.tamanhos.split(",")]:
+            r = _medir(tmp, n)
+            resultados.append(r)
+            print(f"{n:>7} DFDs  update_pgc {r['update_pgc_s']:>7.3f}s  "
+                  f"sync_geral {r['sync_geral_s']:>7.3f}s  {r['us_por_dfd']:>8.1f} µs/DFD")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2)
+
+    if args.verificar and len(resultados) > 1:
+        razao = resultados[-1]["us_por_dfd"] / max(resultados[0]["us_por_dfd"], 1e-9)
+        print(f"Custo por DFD {resultados[-1]['dfds']} / {resultados[0]['dfds']}: {razao:.2f}x "
+              f"(limite {args.razao_max}x)")
+        if razao > args.razao_max:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,118 @@
+"""
+bench_excel_pncp.py
+Compara a gravação da aba PNCP: openpyxl (load_workbook + save) x streaming.
+
+Uso:
+    python benchmarks/bench_excel_pncp.py                  # 10k, 50k, 100k
+    python benchmarks/bench_excel_pncp.py --tamanhos 10000
+
+Para cada tamanho N é gerada uma planilha com N linhas na aba PGC e N linhas
+antigas na aba PNCP (o custo do caminho openpyxl cresce com o total de linhas
+do arquivo). Cada caso roda num subprocesso para medir o pico de RSS isolado.
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+
+def _itens(n):
+    return [
+        {
+            "col_a_contratacao": f"{i:05d}/2025",
+            "col_b_descricao": f"Aquisição de material de consumo lote {i}",
+            "col_c_categoria": "Material",
+            "col_d_valor": 1000.0 + i,
+            "col_e_inicio": "01/02/2025",
+            "col_f_fim": "31/12/2025",
+            "col_g_status": "APROVADA",
+            "col_h_status_tipo": "Contratação",
+            "col_i_dfd": f"{i:04d}",
+        }
+        for i in range(n)
+    ]
+
+
+def _gerar_planilha(path, n):
+    from openpyxl import Workbook
+    from backend.app.services.excel_persistence import PNCP_HEADERS
+
+    wb = Workbook(write_only=True)
+    pgc = wb.create_sheet("PGC")
+    pgc.append(["Pag", "DFD", "Requisitante", "Descrição", "Valor",
+                "Situação", "Conclusão", "Editor", "Responsáveis", "PTA", "Justificativa"])
+    for i in range(n):
+        pgc.append([1, f"{i}/2025", "DIRAD", f"Descrição {i}", 100.0 + i,
+                    "Em elaboração", "", "Fulano", "Beltrano", "", "Justificativa"])
+    pncp = wb.create_sheet("PNCP")
+    pncp.append(PNCP_HEADERS)
+    for i in range(n):
+        pncp.append([f"{i}/2024", "Antigo", "Serviço", 1.0, "", "", "PENDENTE", "", "", "", ""])
+    wb.create_sheet("Geral")
+    wb.save(path)
+
+
+def _caso(path, n, modo):
+    """Executado no subprocesso: grava a aba e devolve métricas."""
+    import logging
+    logging.disable(logging.CRITICAL)
+    from backend.app.services import excel_persistence as ep
+
+    ep.EXCEL_STREAMING_WRITE = modo == "streaming"
+    dados = _itens(n)
+    persist = ep.ExcelPersistence(path)
+    rss_antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    persist.update_pncp_sheet(dados)
+    segundos = time.perf_counter() - inicio
+    rss_pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"modo": modo, "linhas": n, "segundos": round(segundos, 2),
+            "pico_rss_mb": round(rss_pico / 1024, 1),
+            "acrescimo_rss_mb": round((rss_pico - rss_antes) / 1024, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--tamanhos", default="10000,50000,100000")
+    parser.add_argument("--json", help="Grava os resultados neste arquivo.")
+    parser.add_argument("--_caso", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._caso:
+        path, n, modo = args._caso
+        print(json.dumps(_caso(path, int(n), modo)))
+        return 0
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in [int(t) for t in args.tamanhos.split(",")]:
+            base = os.path.join(tmp, f"base_{n}.xlsx")
+            _gerar_planilha(base, n)
+            for modo in ("openpyxl", "streaming"):
+                alvo = os.path.join(tmp, f"{modo}_{n}.xlsx")
+                shutil.copyfile(base, alvo)
+                saida = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--_caso", alvo, str(n), modo],
+                    cwd=tmp, capture_output=True, text=True, check=True,
+                )
+                r = json.loads(saida.stdout.strip().splitlines()[-1])
+                resultados.append(r)
+                print(f"{n:>7} linhas  {modo:<10} {r['segundos']:>7.2f}s  "
+                      f"pico RSS {r['pico_rss_mb']:>7.1f} MB (+{r['acrescimo_rss_mb']} MB)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,100 @@
+"""
+bench_pg_ingest.py
+Mede a ingestão em lote (COPY -> staging) e a consolidação incremental
+(upsert do delta acima da marca) do ColetasRepository.
+
+Uso (banco já migrado com backend/app/db/build.py):
+    DATABASE_URL=postgresql://... python benchmarks/bench_pg_ingest.py
+    DATABASE_URL=postgresql://... python benchmarks/bench_pg_ingest.py --linhas 100000 --fonte PGC
+
+Cada fonte é ingerida duas vezes: a primeira insere, a segunda encontra as
+mesmas linhas (caminho de conflito, sem reescrita). Depois, uma consolidação
+sem execuções novas mede o custo do caminho "nada a fazer" (deve ser ~0,
+independente do histórico). Os DFDs gerados usam o prefixo 9 e são removidos
+no fim (--manter para conservar).
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+
+def _pgc(n):
+    return [
+        {"DFD": f"9{i:05d}/25", "Requisitante": "DIRAD", "Descrição": f"Item de benchmark {i}",
+         "Valor": f"R$ {i % 9999},{i % 100:02d}", "Situação": "Em elaboração"}
+        for i in range(n)
+    ]
+
+
+def _pncp(n):
+    return [
+        {"col_a_contratacao": f"9{i:04d}-00001-2025", "col_b_descricao": f"Contratação {i}",
+         "col_c_categoria": "Bens", "col_d_valor": 1000.0 + i, "col_e_inicio": "2025-01-01",
+         "col_f_fim": "2025-12-31", "col_g_status": "APROVADA", "col_h_status_tipo": "APROVADA",
+         "col_i_dfd": f"{i % 1000:03d}/2025"}
+        for i in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da ingestão Postgres via COPY")
+    parser.add_argument("--linhas", type=int, default=100000)
+    parser.add_argument("--fonte", choices=["PGC", "PNCP", "ambas"], default="ambas")
+    parser.add_argument("--manter", action="store_true")
+    parser.add_argument("--json", help="Grava os resultados neste arquivo.")
+    args = parser.parse_args()
+    if not os.getenv("DATABASE_URL"):
+        print("DATABASE_URL não definida.")
+        return 2
+    logging.disable(logging.CRITICAL)
+
+    from backend.app.db import pg_ingest
+    from backend.app.db.engine import get_engine
+
+    engine = get_engine()
+    fontes = ["PGC", "PNCP"] if args.fonte == "ambas" else [args.fonte]
+    geradores = {"PGC": _pgc, "PNCP": _pncp}
+    resultados = []
+    for fonte in fontes:
+        dados = geradores[fonte](args.linhas)
+        for rodada in ("insercao", "reingestao", "sem_delta"):
+            inicio = time.perf_counter()
+            if rodada != "sem_delta":
+                r = pg_ingest.ingerir(engine, fonte, dados, ano_ref="2025")
+            else:
+                r = {"fonte": fonte}
+            consolidado = pg_ingest.consolidar(engine, [fonte])[0]
+            segundos = time.perf_counter() - inicio
+            r.update({"rodada": rodada, "aplicados": consolidado["aplicados"],
+                      "marca": consolidado["marca"], "segundos": round(segundos, 3),
+                      "linhas_por_s": round(len(dados) / max(segundos, 1e-9)) if "copiados" in r else None})
+            resultados.append(r)
+            print(f"{fonte:<5} {rodada:<11} {r.get('copiados', 0):>7} linhas  {r['segundos']:>7.3f}s  "
+                  f"{r['linhas_por_s'] or '-':>8} linhas/s  aplicados={r['aplicados']}")
+
+    if not args.manter:
+        conn = engine.raw_connection()
+        try:
+            cur = conn.cursor()
+            ids = [r["execucao_id"] for r in resultados if "execucao_id" in r]
+            cur.execute("DELETE FROM PGC_2025 WHERE dfd LIKE '9%%/25'")
+            cur.execute("DELETE FROM PNCP WHERE id_pncp LIKE '9%%-00001-2025'")
+            cur.execute("DELETE FROM coletas_execucoes WHERE id = ANY(%s)", (ids,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,168 @@
+"""
+dados.py
+Massa de dados do portal simulado (servidor de replay).
+
+Um snapshot tem o formato exibido pelo portal (textos, como o scraper lê):
+
+    {
+      "ano_ref": "2025",
+      "pgc": [{"DFD", "Requisitante", "Descrição", "Valor", "Situação"}, ...],
+      "pncp": {
+        "reprovadas": [card, ...], "aprovadas": [...], "pendentes": [...]
+      }
+    }
+
+    card = {"contratacao", "descricao", "categoria", "valor", "inicio", "fim", "status"}
+
+Origens:
+- gerar(): massa determinística com N linhas no PGC e N cards por aba;
+- carregar(): snapshot gravado em JSON (ver gravar());
+- de_ndjson(): reconstrói o snapshot a partir do bruto NDJSON de uma coleta
+  real (dados_locais_temp/PGC_*.ndjson, PNCP_*.ndjson), para reproduzir
+  offline exatamente o que o portal devolveu.
+"""
+import json
+import random
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+ABAS = ("reprovadas", "aprovadas", "pendentes")
+
+_REQUISITANTES = ["DIRAD", "DIGEP", "DITIC", "COMAP", "CGLOG", "SEMAT"]
+_SITUACOES = ["Rascunho", "Em elaboração", "Aguardando aprovação", "Aprovado", "Concluído"]
+_CATEGORIAS = ["Bens", "Serviços", "Obras", "Soluções de TIC", "Serviços de Engenharia"]
+_OBJETOS = [
+    "Aquisição de material de expediente",
+    "Contratação de serviço de limpeza",
+    "Manutenção predial preventiva e corretiva",
+    "Aquisição de computadores e periféricos",
+    "Serviço de vigilância patrimonial",
+    "Locação de veículos",
+]
+_STATUS_PENDENTE = ["Aguardando aprovação", "Em análise", "Devolvida para ajustes"]
+
+
+def _moeda(valor: float) -> str:
+    """1234.5 -> 'R$ 1.234,50' (como o portal exibe)."""
+    inteiro, centavos = f"{valor:,.2f}".split(".")
+    return f"R$ {inteiro.replace(',', '.')},{centavos}"
+
+
+def _data_br(d: Optional[date]) -> str:
+    return d.strftime("%d/%m/%Y") if d else ""
+
+
+def gerar(pgc_itens: int = 200, pncp_itens: Sequence[int] = (20, 60, 20),
+          ano_ref: str = "2025", semente: int = 42) -> Dict[str, Any]:
+    """Massa determinística: `pncp_itens` é a quantidade por aba (reprovadas, aprovadas, pendentes)."""
+    rnd = random.Random(semente)
+    ano2 = ano_ref[-2:]
+
+    pgc = []
+    for i in range(1, pgc_itens + 1):
+        pgc.append({
+            "DFD": f"{i:03d}/{ano2}" if i < 1000 else f"{i}/{ano2}",
+            "Requisitante": rnd.choice(_REQUISITANTES),
+            "Descrição": f"{rnd.choice(_OBJETOS)} - item {i}",
+            "Valor": _moeda(rnd.randint(1000, 5_000_000) / 100),
+            "Situação": rnd.choice(_SITUACOES),
+        })
+
+    pncp: Dict[str, List[Dict[str, str]]] = {}
+    seq = 0
+    inicio_ano = date(int(ano_ref), 1, 1)
+    for aba, total in zip(ABAS, pncp_itens):
+        cards = []
+        for _ in range(total):
+            seq += 1
+            inicio = inicio_ano + timedelta(days=rnd.randint(0, 300))
+            if aba == "aprovadas":
+                status = "Aprovada"
+            elif aba == "pendentes":
+                status = rnd.choice(_STATUS_PENDENTE)
+            else:
+                status = "Reprovada"
+            cards.append({
+                "contratacao": f"{seq:05d}-{rnd.randint(1, 99999):05d}-{ano_ref}",
+                # O scraper deriva o DFD dos 7 primeiros dígitos da descrição
+                "descricao": f"DFD {seq % 1000:03d}/{ano_ref} - {rnd.choice(_OBJETOS)}",
+                "categoria": rnd.choice(_CATEGORIAS),
+                "valor": _moeda(rnd.randint(1000, 5_000_000) / 100),
+                "inicio": _data_br(inicio),
+                "fim": _data_br(inicio + timedelta(days=rnd.randint(30, 365))),
+                "status": status,
+            })
+        pncp[aba] = cards
+
+    return {"ano_ref": ano_ref, "pgc": pgc, "pncp": pncp}
+
+
+def carregar(caminho: str) -> Dict[str, Any]:
+    with open(caminho, "r", encoding="utf-8") as f:
+        snapshot = json.load(f)
+    snapshot.setdefault("pgc", [])
+    snapshot.setdefault("pncp", {})
+    for aba in ABAS:
+        snapshot["pncp"].setdefault(aba, [])
+    return snapshot
+
+
+def gravar(snapshot: Dict[str, Any], caminho: str) -> None:
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False, indent=1)
+
+
+def _ler_ndjson(caminho: Optional[str]) -> List[Dict[str, Any]]:
+    if not caminho:
+        return []
+    with open(caminho, "r", encoding="utf-8") as f:
+        return [json.loads(linha) for linha in f if linha.strip()]
+
+
+def _card_pncp(item: Dict[str, Any]) -> Dict[str, str]:
+    def data_br(valor):
+        if not valor:
+            return ""
+        try:
+            return _data_br(date.fromisoformat(str(valor)[:10]))
+        except ValueError:
+            return ""
+
+    valor = item.get("col_d_valor")
+    return {
+        "contratacao": item.get("col_a_contratacao") or "",
+        "descricao": item.get("col_b_descricao") or "",
+        "categoria": item.get("col_c_categoria") or "",
+        "valor": _moeda(float(valor)) if valor not in (None, "") else "",
+        "inicio": data_br(item.get("col_e_inicio")),
+        "fim": data_br(item.get("col_f_fim")),
+        "status": item.get("col_g_status") or "",
+    }
+
+
+def de_ndjson(pgc_ndjson: Optional[str] = None, pncp_ndjson: Optional[str] = None,
+              ano_ref: str = "2025") -> Dict[str, Any]:
+    """Snapshot a partir do bruto NDJSON de uma coleta real."""
+    pgc = [
+        {k: item.get(k, "") for k in ("DFD", "Requisitante", "Descrição", "Valor", "Situação")}
+        for item in _ler_ndjson(pgc_ndjson)
+    ]
+    pncp: Dict[str, List[Dict[str, str]]] = {aba: [] for aba in ABAS}
+    for item in _ler_ndjson(pncp_ndjson):
+        # Mesma regra de status do PNCPScraperVBA._montar_item, invertida
+        if item.get("col_g_status") == "REPROVADA":
+            aba = "reprovadas"
+        elif item.get("col_h_status_tipo") == "APROVADA":
+            aba = "aprovadas"
+        else:
+            aba = "pendentes"
+        pncp[aba].append(_card_pncp(item))
+    return {"ano_ref": ano_ref, "pgc": pgc, "pncp": pncp}
+
+
+def esperado(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Chaves que uma coleta completa deve devolver (conferência do replay)."""
+    return {
+        "PGC": [linha["DFD"] for linha in snapshot["pgc"]],
+        "PNCP": [card["contratacao"] for aba in ABAS for card in snapshot["pncp"].get(aba, [])],
+    }
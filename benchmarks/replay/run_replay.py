@@ -0,0 +1,157 @@
+"""
+run_replay.py
+Roda PGCScraperVBA e PNCPScraperVBA (headless) contra o portal simulado e
+confere se a coleta devolveu exatamente as chaves do snapshot.
+
+Sobe o servidor de replay num thread (uvicorn) e cria o driver pelo
+driver_factory.create_driver(headless=True), ou seja, com o mesmo
+ChromeDriver/Chrome que a aplicação usaria. Não precisa de rede nem de
+login: a URL inicial já é a tela pós-login.
+
+    python benchmarks/replay/run_replay.py
+    python benchmarks/replay/run_replay.py --fonte PNCP --pncp-itens 50,400,50 --virtual 30
+    python benchmarks/replay/run_replay.py --pgc-ndjson dados_locais_temp/PGC_20250101_120000.ndjson --json replay.json
+
+As flags do scraper (PNCP_STREAMING_SCROLL, PNCP_BATCH_EXTRACT,
+NETWORK_IDLE_WAIT...) são lidas do ambiente como na aplicação. Sai com
+código 1 se alguma fonte divergir do esperado.
+"""
+import argparse
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from typing import Any, Dict, List
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from benchmarks.replay import dados as dados_replay  # noqa: E402
+from benchmarks.replay.server import criar_app, snapshot_dos_argumentos  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+class ServidorReplay:
+    """Portal simulado num thread; use como context manager."""
+
+    def __init__(self, snapshot: Dict[str, Any], porta: int = 0, **opcoes):
+        import uvicorn
+
+        if not porta:
+            with socket.socket() as s:
+                s.bind(("127.0.0.1", 0))
+                porta = s.getsockname()[1]
+        self.url = f"http://127.0.0.1:{porta}"
+        config = uvicorn.Config(criar_app(snapshot, **opcoes), host="127.0.0.1", port=porta, log_level="warning")
+        self._servidor = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._servidor.run, name="replay-server", daemon=True)
+
+    def __enter__(self) -> "ServidorReplay":
+        self._thread.start()
+        inicio = time.time()
+        while not self._servidor.started:
+            if not self._thread.is_alive() or time.time() - inicio > 10:
+                raise RuntimeError("Servidor de replay não subiu.")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._servidor.should_exit = True
+        self._thread.join(timeout=5)
+
+
+def executar_pgc(driver, url: str, ano_ref: str, consulta: str = "") -> List[Dict[str, Any]]:
+    from backend.app.rpa.pgc_scraper_vba_logic import PGCScraperVBA
+
+    driver.get(f"{url}/pgc{consulta}")
+    scraper = PGCScraperVBA(driver, ano_ref=ano_ref)
+    if not scraper.A_Loga_Acessa_PGC():
+        return []
+    return scraper.A1_Demandas_DFD_PCA()
+
+
+def executar_pncp(driver, url: str, ano_ref: str, consulta: str = "") -> List[Dict[str, Any]]:
+    from backend.app.rpa.pncp_scraper_vba_logic import PNCPScraperVBA
+
+    driver.get(f"{url}/pncp{consulta}")
+    return PNCPScraperVBA(driver, ano_ref=ano_ref).Dados_PNCP()
+
+
+EXECUTORES = {"PGC": executar_pgc, "PNCP": executar_pncp}
+CHAVES = {"PGC": "DFD", "PNCP": "col_a_contratacao"}
+
+
+def conferir(fonte: str, dados: List[Dict[str, Any]], esperado: List[str]) -> Dict[str, Any]:
+    """Compara as chaves coletadas com as do snapshot (ordem não importa)."""
+    coletadas = [str(item.get(CHAVES[fonte]) or "") for item in dados]
+    faltando = sorted(set(esperado) - set(coletadas))
+    sobrando = sorted(set(coletadas) - set(esperado))
+    duplicadas = len(coletadas) - len(set(coletadas))
+    return {
+        "ok": not faltando and not sobrando and not duplicadas,
+        "faltando": faltando[:20],
+        "sobrando": sobrando[:20],
+        "duplicadas": duplicadas,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay offline dos scrapers PGC/PNCP")
+    parser.add_argument("--fonte", choices=["PGC", "PNCP", "ambas"], default="ambas")
+    parser.add_argument("--porta", type=int, default=0, help="0 = porta livre")
+    parser.add_argument("--snapshot")
+    parser.add_argument("--pgc-ndjson")
+    parser.add_argument("--pncp-ndjson")
+    parser.add_argument("--ano", default="2025")
+    parser.add_argument("--pgc-itens", type=int, default=200)
+    parser.add_argument("--pncp-itens", default="20,60,20")
+    parser.add_argument("--latencia-ms", type=int, default=150)
+    parser.add_argument("--jitter-ms", type=int, default=0)
+    parser.add_argument("--lote", type=int, default=20)
+    parser.add_argument("--virtual", type=int, default=0)
+    parser.add_argument("--json", help="Grava o resultado neste arquivo.")
+    parser.add_argument("--verbose", action="store_true", help="Mostra os logs dos scrapers.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    from backend.app.rpa.driver_factory import create_driver
+
+    snapshot = snapshot_dos_argumentos(args)
+    ano_ref = str(snapshot.get("ano_ref", args.ano))
+    esperado = dados_replay.esperado(snapshot)
+    fontes = ["PGC", "PNCP"] if args.fonte == "ambas" else [args.fonte]
+
+    resultados = []
+    with ServidorReplay(snapshot, args.porta, latencia_ms=args.latencia_ms, jitter_ms=args.jitter_ms,
+                        lote=args.lote, virtual=args.virtual) as servidor:
+        for fonte in fontes:
+            driver = create_driver(headless=True)
+            try:
+                inicio = time.perf_counter()
+                dados = EXECUTORES[fonte](driver, servidor.url, ano_ref)
+                segundos = time.perf_counter() - inicio
+            finally:
+                driver.quit()
+            r = {"fonte": fonte, "itens": len(dados), "esperados": len(esperado[fonte]),
+                 "segundos": round(segundos, 3), "itens_por_s": round(len(dados) / max(segundos, 1e-9), 2)}
+            r.update(conferir(fonte, dados, esperado[fonte]))
+            resultados.append(r)
+            print(f"{fonte:<5} {r['itens']:>6}/{r['esperados']:<6} itens  {r['segundos']:>8.2f}s  "
+                  f"{r['itens_por_s']:>8.2f} itens/s  {'OK' if r['ok'] else 'DIVERGENTE'}")
+            if not r["ok"]:
+                print(f"      faltando={r['faltando']} sobrando={r['sobrando']} duplicadas={r['duplicadas']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"parametros": vars(args), "resultados": resultados}, f, indent=2, ensure_ascii=False)
+    return 0 if all(r["ok"] for r in resultados) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
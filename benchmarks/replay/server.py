@@ -0,0 +1,169 @@
+"""
+server.py
+Portal Compras.gov.br simulado (PGC e PNCP) para rodar os scrapers offline.
+
+Serve páginas cujo DOM segue os XPaths de pgc_xpaths.json/pncp_xpaths.json
+(p-table do PGC com p-paginator, cards p-card das abas do PNCP e o spinner
+do ng-http-loader), montadas em JS a partir de um snapshot (ver dados.py).
+Cada chamada à API tem latência configurável, o que liga o spinner e o
+monitor de rede exatamente como no portal.
+
+    python benchmarks/replay/server.py --porta 8765 --pgc-itens 500 --pncp-itens 40,120,40
+    python benchmarks/replay/server.py --snapshot snapshot.json --latencia-ms 300 --virtual 30
+
+Páginas:
+    /pgc             tela pós-login (card "PGC")
+    /pgc/artefatos   tabela de DFDs (Compras.gov.br - Fase Interna)
+    /pncp            Formação do PCA, abas reprovadas/aprovadas/pendentes
+
+Parâmetros na URL da página (sobrepõem os do servidor, por execução):
+    latencia_ms, jitter_ms   atraso de cada requisição da API
+    lote                     cards PNCP carregados por rolagem
+    virtual                  máximo de cards no DOM (0 = sem virtualização;
+                             acima disso os primeiros saem, como no PrimeNG)
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, Query
+from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.staticfiles import StaticFiles
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from benchmarks.replay import dados as dados_replay  # noqa: E402
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+_PAGINA = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>{titulo}</title>
+<link rel="stylesheet" href="/static/portal.css">
+</head>
+<body>
+<script>window.REPLAY = {config};</script>
+<script src="/static/portal.js"></script>
+<script>ReplayPortal.{inicio}();</script>
+</body>
+</html>
+"""
+
+
+def criar_app(snapshot: Dict[str, Any], latencia_ms: int = 150, jitter_ms: int = 0,
+              lote: int = 20, virtual: int = 0) -> FastAPI:
+    app = FastAPI(title="Portal simulado (replay)", docs_url=None, redoc_url=None)
+    app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+    ano_ref = str(snapshot.get("ano_ref", "2025"))
+    contadores: Dict[str, int] = {"requisicoes": 0}
+
+    async def atrasar(latencia: Optional[int], jitter: Optional[int]) -> None:
+        contadores["requisicoes"] += 1
+        base = latencia_ms if latencia is None else latencia
+        extra = jitter_ms if jitter is None else jitter
+        atraso = base + (random.uniform(0, extra) if extra else 0)
+        if atraso > 0:
+            await asyncio.sleep(atraso / 1000)
+
+    def pagina(titulo: str, inicio: str) -> HTMLResponse:
+        config = json.dumps({"ano_ref": ano_ref, "lote": lote, "virtual": virtual})
+        return HTMLResponse(_PAGINA.format(titulo=titulo, config=config, inicio=inicio))
+
+    @app.get("/", response_class=HTMLResponse)
+    def indice():
+        return HTMLResponse(
+            '<ul><li><a href="/pgc">PGC</a></li><li><a href="/pncp">PNCP</a></li></ul>'
+        )
+
+    @app.get("/pgc", response_class=HTMLResponse)
+    def pgc_inicio():
+        return pagina("Compras.gov.br", "iniciarPgcInicio")
+
+    @app.get("/pgc/artefatos", response_class=HTMLResponse)
+    def pgc_artefatos():
+        return pagina("Compras.gov.br - Fase Interna", "iniciarPgc")
+
+    @app.get("/pncp", response_class=HTMLResponse)
+    def pncp():
+        return pagina("Compras.gov.br - Fase Interna", "iniciarPncp")
+
+    @app.get("/api/pgc")
+    async def api_pgc(ano: str, pagina_atual: int = Query(1, alias="pagina"), linhas: int = 10,
+                      latencia_ms: Optional[int] = None, jitter_ms: Optional[int] = None):
+        await atrasar(latencia_ms, jitter_ms)
+        itens = snapshot["pgc"] if ano == ano_ref else []
+        linhas = max(1, linhas)
+        inicio = (max(1, pagina_atual) - 1) * linhas
+        return {"total": len(itens), "pagina": pagina_atual, "linhas": linhas,
+                "itens": itens[inicio:inicio + linhas]}
+
+    @app.get("/api/pncp/anos")
+    async def api_pncp_anos(latencia_ms: Optional[int] = None, jitter_ms: Optional[int] = None):
+        await atrasar(latencia_ms, jitter_ms)
+        return {"anos": [ano_ref, str(int(ano_ref) - 1)]}
+
+    @app.get("/api/pncp/resumo")
+    async def api_pncp_resumo(ano: str, latencia_ms: Optional[int] = None, jitter_ms: Optional[int] = None):
+        await atrasar(latencia_ms, jitter_ms)
+        return {aba: len(snapshot["pncp"].get(aba, [])) if ano == ano_ref else 0
+                for aba in dados_replay.ABAS}
+
+    @app.get("/api/pncp/cards")
+    async def api_pncp_cards(ano: str, aba: str, inicio: int = 0, quantidade: int = 20,
+                             latencia_ms: Optional[int] = None, jitter_ms: Optional[int] = None):
+        await atrasar(latencia_ms, jitter_ms)
+        cards = snapshot["pncp"].get(aba, []) if ano == ano_ref else []
+        inicio = max(0, inicio)
+        return {"total": len(cards), "cards": cards[inicio:inicio + max(1, quantidade)]}
+
+    @app.get("/api/estatisticas")
+    def api_estatisticas():
+        return JSONResponse(dict(contadores))
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portal simulado para replay offline dos scrapers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--snapshot", help="Snapshot JSON (dados.gravar / dados.de_ndjson)")
+    parser.add_argument("--pgc-ndjson", help="Bruto NDJSON de uma coleta PGC real")
+    parser.add_argument("--pncp-ndjson", help="Bruto NDJSON de uma coleta PNCP real")
+    parser.add_argument("--ano", default="2025")
+    parser.add_argument("--pgc-itens", type=int, default=200)
+    parser.add_argument("--pncp-itens", default="20,60,20", help="Cards por aba: reprovadas,aprovadas,pendentes")
+    parser.add_argument("--latencia-ms", type=int, default=150)
+    parser.add_argument("--jitter-ms", type=int, default=0)
+    parser.add_argument("--lote", type=int, default=20)
+    parser.add_argument("--virtual", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    uvicorn.run(
+        criar_app(snapshot_dos_argumentos(args), args.latencia_ms, args.jitter_ms, args.lote, args.virtual),
+        host=args.host, port=args.porta, log_level="warning",
+    )
+
+
+def snapshot_dos_argumentos(args) -> Dict[str, Any]:
+    """Snapshot a partir de --snapshot, --pgc-ndjson/--pncp-ndjson ou da massa gerada."""
+    if args.snapshot:
+        return dados_replay.carregar(args.snapshot)
+    if args.pgc_ndjson or args.pncp_ndjson:
+        return dados_replay.de_ndjson(args.pgc_ndjson, args.pncp_ndjson, ano_ref=args.ano)
+    pncp_itens = [int(n) for n in args.pncp_itens.split(",")]
+    return dados_replay.gerar(args.pgc_itens, pncp_itens, ano_ref=args.ano)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+/*
+ * portal.js — portal Compras.gov.br simulado para o replay dos scrapers.
+ *
+ * O DOM é montado com createElement, como o Angular faz: a estrutura segue
+ * os XPaths de pgc_xpaths.json / pncp_xpaths.json, inclusive nós que o
+ * parser HTML não aceitaria (div dentro de thead/tbody). Toda chamada à API
+ * passa por api(), que mantém o div#spinner do ng-http-loader no DOM
+ * enquanto houver requisição em voo.
+ */
+var ReplayPortal = (function () {
+    'use strict';
+
+    var CONFIG = window.REPLAY || {};
+    var params = new URLSearchParams(location.search);
+    var ANO = CONFIG.ano_ref;
+    var LOTE = parseInt(params.get('lote') || CONFIG.lote || 20, 10);
+    var VIRTUAL = parseInt(params.get('virtual') || CONFIG.virtual || 0, 10);
+    var ALTURA_CARD = 140;
+    var TITULO = 'Planejamento e Gerenciamento de Contratações';
+
+    // Parâmetros da página repassados à API (latência por execução)
+    var apiParams = new URLSearchParams();
+    ['latencia_ms', 'jitter_ms'].forEach(function (k) {
+        if (params.has(k)) apiParams.set(k, params.get(k));
+    });
+
+    function h(tag, attrs, filhos) {
+        var el = document.createElement(tag);
+        Object.keys(attrs || {}).forEach(function (k) {
+            var v = attrs[k];
+            if (k === 'text') {
+                el.textContent = v;
+            } else if (k.indexOf('on') === 0) {
+                el.addEventListener(k.slice(2), v);
+            } else if (v !== null && v !== undefined && v !== false) {
+                el.setAttribute(k, v === true ? '' : v);
+            }
+        });
+        (filhos || []).forEach(function (f) {
+            if (f) el.appendChild(typeof f === 'string' ? document.createTextNode(f) : f);
+        });
+        return el;
+    }
+
+    // ------------------------------------------------------------------
+    // ng-http-loader
+    // ------------------------------------------------------------------
+
+    var loader = h('ng-http-loader');
+    var emVoo = 0;
+
+    function spinner(delta) {
+        emVoo += delta;
+        var atual = loader.querySelector('#spinner');
+        if (emVoo > 0 && !atual) {
+            loader.appendChild(h('div', { id: 'spinner', class: 'spinner' }));
+        } else if (emVoo === 0 && atual) {
+            atual.remove();
+        }
+    }
+
+    // aoReceber roda antes de o spinner sair: quem espera o spinner já vê o DOM novo
+    function api(caminho, consulta, aoReceber) {
+        var q = new URLSearchParams(apiParams);
+        Object.keys(consulta || {}).forEach(function (k) { q.set(k, consulta[k]); });
+        spinner(1);
+        return fetch(caminho + '?' + q.toString())
+            .then(function (r) { return r.json(); })
+            .then(aoReceber)
+            .finally(function () { spinner(-1); });
+    }
+
+    function montarRaiz(conteudo) {
+        var raiz = h('app-root', {}, [
+            loader,
+            h('header', {}, [h('span', { text: TITULO })]),
+            h('main', {}, conteudo),
+        ]);
+        document.body.appendChild(raiz);
+        return raiz;
+    }
+
+    // ------------------------------------------------------------------
+    // p-dropdown (painel sobreposto, fechado com Esc)
+    // ------------------------------------------------------------------
+
+    function fecharPaineis() {
+        document.querySelectorAll('.p-dropdown-panel').forEach(function (p) { p.remove(); });
+    }
+
+    document.addEventListener('keydown', function (e) {
+        if (e.key === 'Escape') fecharPaineis();
+    });
+
+    function dropdown(attrs, rotulo, opcoes, aoEscolher) {
+        // opcoes: [{rotulo, aria, valor, selecionada}]
+        var el = h('p-dropdown', attrs, [h('span', { class: 'p-dropdown-label', text: rotulo })]);
+        el.addEventListener('click', function () {
+            fecharPaineis();
+            var lista = h('ul', { role: 'listbox' }, opcoes().map(function (o) {
+                return h('li', {
+                    role: 'option',
+                    'aria-label': o.aria || o.rotulo,
+                    'aria-selected': o.selecionada ? 'true' : 'false',
+                    class: 'p-dropdown-item',
+                    onclick: function (e) {
+                        e.stopPropagation();
+                        fecharPaineis();
+                        el.querySelector('.p-dropdown-label').textContent = o.rotulo;
+                        aoEscolher(o.valor);
+                    },
+                }, [h('span', { text: o.rotulo })]);
+            }));
+            var painel = h('div', { class: 'p-dropdown-panel p-component' }, [lista]);
+            var r = el.getBoundingClientRect();
+            painel.style.left = (r.left + window.scrollX) + 'px';
+            painel.style.top = (r.bottom + window.scrollY) + 'px';
+            document.body.appendChild(painel);
+        });
+        return el;
+    }
+
+    function opcoesPca() {
+        return [ANO, String(parseInt(ANO, 10) - 1)].map(function (ano) {
+            return { rotulo: 'PCA ' + ano + ' - UASG 110511', valor: ano };
+        });
+    }
+
+    // ------------------------------------------------------------------
+    // PGC
+    // ------------------------------------------------------------------
+
+    function iniciarPgcInicio() {
+        // Navegação de SPA (como o roteador do Angular): mesma aba, sem recarregar
+        function abrirPgc() {
+            history.pushState(null, '', '/pgc/artefatos' + location.search);
+            document.querySelector('app-root').remove();
+            iniciarPgc();
+        }
+        montarRaiz([
+            h('div', { class: 'card-acesso', onclick: abrirPgc }, [
+                h('p', { text: 'Acesso ao sistema' }),
+                h('p', { text: 'PGC' }),
+            ]),
+            h('div', { class: 'card-acesso' }, [
+                h('p', { text: 'Acesso ao sistema' }),
+                h('p', { text: 'ETP Digital' }),
+            ]),
+        ]);
+    }
+
+    var CABECALHO_PGC = ['', 'Nº', 'Tipo', 'DFD', 'Data', 'Requisitante', 'Descrição', 'Valor', 'Situação', 'Ações'];
+    var CLASSE_BOTAO = 'p-ripple p-element p-paginator-element p-link';
+
+    function iniciarPgc() {
+        var estado = { ano: null, pagina: 1, linhas: 10, total: 0 };
+        var tbody = h('tbody', { class: 'p-element p-datatable-tbody' });
+        var paginador = h('div', { class: 'p-paginator p-component' });
+
+        var tabela = h('div', { id: 'minhauasg' }, [
+            h('app-artefato-list-resultado', {}, [h('div', {}, [h('div', {}, [h('div', {}, [
+                h('p-table', {}, [h('div', { class: 'p-datatable p-component' }, [
+                    h('div', { class: 'p-datatable-wrapper' }, [
+                        h('table', { role: 'table' }, [
+                            h('thead', {}, [h('tr', {}, CABECALHO_PGC.map(function (c) {
+                                return h('th', { text: c });
+                            }))]),
+                            tbody,
+                        ]),
+                    ]),
+                    h('p-paginator', {}, [paginador]),
+                ])]),
+            ])])])]),
+        ]);
+
+        function carregar(pagina) {
+            return api('/api/pgc', { ano: estado.ano, pagina: pagina, linhas: estado.linhas }, function (r) {
+                estado.pagina = pagina;
+                estado.total = r.total;
+                renderizarLinhas(r.itens, (pagina - 1) * estado.linhas);
+                renderizarPaginador();
+            });
+        }
+
+        function renderizarLinhas(itens, deslocamento) {
+            tbody.replaceChildren.apply(tbody, itens.map(function (it, i) {
+                return h('tr', {}, [
+                    h('td', {}, [h('input', { type: 'checkbox' })]),
+                    h('td', { text: String(deslocamento + i + 1) }),
+                    h('td', { text: 'DFD' }),
+                    h('td', { text: it['DFD'] }),
+                    h('td', { text: '01/01/' + ANO }),
+                    h('td', { text: it['Requisitante'] }),
+                    h('td', { text: it['Descrição'] }),
+                    h('td', { text: it['Valor'] }),
+                    h('td', { text: it['Situação'] }),
+                    h('td', {}, [h('button', { text: 'Detalhar' })]),
+                ]);
+            }));
+        }
+
+        function botao(tipo, extra, habilitado, destino) {
+            var classe = 'p-ripple p-element p-paginator-' + tipo + ' p-paginator-element p-link' + extra;
+            return h('button', {
+                type: 'button',
+                class: habilitado ? classe : classe + ' p-disabled',
+                disabled: !habilitado,
+                onclick: function () { carregar(destino); },
+            });
+        }
+
+        function renderizarPaginador() {
+            var paginas = Math.max(1, Math.ceil(estado.total / estado.linhas));
+            var p = estado.pagina;
+            var ini = Math.max(1, Math.min(p - 2, paginas - 4));
+            var fim = Math.min(paginas, ini + 4);
+            var numeros = [];
+            for (var n = ini; n <= fim; n++) {
+                numeros.push(h('button', {
+                    type: 'button',
+                    class: CLASSE_BOTAO.replace('p-paginator-element', 'p-paginator-page p-paginator-element') +
+                        ' ng-star-inserted' + (n === p ? ' p-highlight' : ''),
+                    text: String(n),
+                    onclick: (function (destino) { return function () { carregar(destino); }; })(n),
+                }));
+            }
+            var primeiro = estado.total ? (p - 1) * estado.linhas + 1 : 0;
+            var ultimo = Math.min(p * estado.linhas, estado.total);
+            paginador.replaceChildren(
+                botao('first', ' ng-star-inserted', p > 1, 1),
+                botao('prev', '', p > 1, p - 1),
+                h('span', { class: 'p-paginator-pages ng-star-inserted' }, numeros),
+                botao('next', '', p < paginas, p + 1),
+                botao('last', ' ng-star-inserted', p < paginas, paginas),
+                dropdown({ class: 'p-paginator-rpp-options' }, String(estado.linhas), function () {
+                    return [10, 25, 50, 100].map(function (n) {
+                        return { rotulo: String(n), valor: n, selecionada: n === estado.linhas };
+                    });
+                }, function (n) {
+                    estado.linhas = n;
+                    carregar(1);
+                }),
+                h('span', {
+                    class: 'p-paginator-current ng-star-inserted',
+                    text: primeiro + ' - ' + ultimo + ' de ' + estado.total.toLocaleString('pt-BR') + ' registros',
+                })
+            );
+        }
+
+        document.title = 'Compras.gov.br - Fase Interna';
+        montarRaiz([
+            h('div', { class: 'filtros' }, [
+                dropdown({ placeholder: 'Selecione PCA' }, 'Selecione PCA', opcoesPca, function (ano) {
+                    estado.ano = ano;
+                }),
+                h('label', {}, [
+                    h('input', {
+                        type: 'radio', id: 'minha-uasg', name: 'uasg',
+                        onchange: function () { if (estado.ano) carregar(1); },
+                    }),
+                    ' Minha UASG',
+                ]),
+            ]),
+            tabela,
+        ]);
+    }
+
+    // ------------------------------------------------------------------
+    // PNCP
+    // ------------------------------------------------------------------
+
+    var ABAS = ['reprovadas', 'aprovadas', 'pendentes'];
+    var ROTULOS = { reprovadas: 'Reprovadas', aprovadas: 'Aprovadas', pendentes: 'Pendentes' };
+
+    function cardPncp(aba, c) {
+        var id = [h('a', { href: '#', text: c.contratacao })];
+        if (aba === 'pendentes') id.push(h('div', {}, [h('span', { text: c.status })]));
+        var grade = h('div', { class: 'grade' }, [
+            h('div', {}, [h('div', {}, [h('div', { class: 'icone', text: '#' }), h('div', {}, id)])]),
+            h('div', {}, [h('p', { text: c.descricao })]),
+            h('div', {}, [h('p', { text: c.categoria })]),
+            h('div', {}, [h('p', { text: 'UASG 110511' })]),
+            h('div', {}, [h('p', { text: c.valor })]),
+            h('div', {}, [h('p', { text: c.inicio })]),
+            h('div', {}, [h('p', { text: c.fim })]),
+            aba === 'aprovadas' ? h('div', {}, [h('p', { text: c.status })]) : h('div', {}),
+        ]);
+        return h('div', { class: 'card-demanda' }, [
+            h('p-card', {}, [h('div', { class: 'p-card p-component' }, [
+                h('div', { class: 'p-card-body' }, [
+                    h('div', { class: 'p-card-content' }, [h('div', {}, [grade])]),
+                ]),
+            ])]),
+        ]);
+    }
+
+    function painelAba(aba) {
+        var painel = h('div', { 'aria-labelledby': aba, role: 'tabpanel', hidden: true });
+        var estado = { carregados: 0, removidos: 0, total: 0, carregando: false, iniciado: false };
+        var tbody = h('tbody', { class: 'p-element p-datatable-tbody' });
+        var rolagem = null;
+
+        function anexar(cards) {
+            cards.forEach(function (c) { tbody.appendChild(cardPncp(aba, c)); });
+            estado.carregados += cards.length;
+            if (VIRTUAL > 0 && tbody.children.length > VIRTUAL) {
+                // Virtualização: os primeiros saem do DOM e viram espaço em branco
+                var sobra = tbody.children.length - VIRTUAL;
+                for (var i = 0; i < sobra; i++) tbody.firstElementChild.remove();
+                estado.removidos += sobra;
+                tbody.style.paddingTop = (estado.removidos * ALTURA_CARD) + 'px';
+            }
+        }
+
+        function proximoLote() {
+            if (estado.carregando || estado.carregados >= estado.total) return;
+            estado.carregando = true;
+            api('/api/pncp/cards', { ano: ANO, aba: aba, inicio: estado.carregados, quantidade: LOTE }, function (r) {
+                anexar(r.cards);
+                estado.carregando = false;
+                setTimeout(completarTela, 0);
+            });
+        }
+
+        function completarTela() {
+            // Sem barra de rolagem não há evento de scroll: carrega até preencher
+            if (rolagem && rolagem.scrollHeight - rolagem.clientHeight <= 10) proximoLote();
+        }
+
+        function renderizar(total, cards) {
+            estado.total = total;
+            var resultados;
+            if (!total) {
+                resultados = h('div', { class: 'search-results' }, [h('div', {}, [h('div', {}, [h('div', {}, [
+                    h('div', {}, [h('div', { text: ROTULOS[aba] }), h('div', {}, [h('span', { text: 'Nenhuma demanda encontrada' })])]),
+                ])])])]);
+                painel.replaceChildren(resultados);
+                return;
+            }
+            rolagem = h('div', { class: 'rolagem' }, [
+                h('p-table', {}, [h('div', { class: 'p-datatable p-component' }, [h('div', { class: 'p-datatable-wrapper' }, [
+                    h('table', { role: 'table' }, [
+                        h('thead', {}, [h('div', {}, [h('div', {}, [h('div', {}, [h('div', {}, [
+                            h('div', { text: ROTULOS[aba] }),
+                            h('div', {}, [h('label', { text: 'Demandas encontradas: ' + total })]),
+                        ])])])])]),
+                        tbody,
+                    ]),
+                ])])]),
+            ]);
+            rolagem.addEventListener('scroll', function () {
+                if (rolagem.scrollTop + rolagem.clientHeight >= rolagem.scrollHeight - 2 * ALTURA_CARD) proximoLote();
+            });
+            painel.replaceChildren(h('div', { class: 'search-results' }, [rolagem]));
+            anexar(cards);
+            completarTela();
+        }
+
+        painel.abrir = function () {
+            if (estado.iniciado) return;
+            estado.iniciado = true;
+            api('/api/pncp/cards', { ano: ANO, aba: aba, inicio: 0, quantidade: LOTE }, function (r) {
+                renderizar(r.total, r.cards);
+            });
+        };
+        return painel;
+    }
+
+    function iniciarPncp() {
+        var conteudo = h('div', { class: 'formacao' });
+        var paineis = {};
+
+        function abas(resumo) {
+            var links = ABAS.map(function (aba) {
+                return h('a', {
+                    id: 'contratacoes-' + aba,
+                    role: 'tab',
+                    text: ROTULOS[aba] + ' (' + resumo[aba] + ')',
+                    onclick: function (e) {
+                        e.preventDefault();
+                        links.forEach(function (l) { l.classList.remove('ativa'); });
+                        e.currentTarget.classList.add('ativa');
+                        ABAS.forEach(function (a) { paineis[a].hidden = (a !== aba); });
+                        paineis[aba].abrir();
+                    },
+                });
+            });
+            ABAS.forEach(function (aba) { paineis[aba] = painelAba(aba); });
+            conteudo.replaceChildren.apply(conteudo, [h('div', { class: 'abas' }, links)].concat(
+                ABAS.map(function (aba) { return paineis[aba]; })
+            ));
+        }
+
+        var formacao = h('button', {
+            type: 'button', class: 'br-button primary',
+            onclick: function () {
+                api('/api/pncp/anos', {}, function () {
+                    conteudo.replaceChildren(dropdown({ placeholder: 'Selecione PCA' }, 'Selecione PCA', opcoesPca,
+                        function (ano) {
+                            api('/api/pncp/resumo', { ano: ano }, function (resumo) {
+                                var dd = conteudo.querySelector('p-dropdown');
+                                abas(resumo);
+                                conteudo.insertBefore(dd, conteudo.firstChild);
+                            });
+                        }));
+                });
+            },
+        }, [h('span', { text: 'Formação do PCA' })]);
+
+        montarRaiz([h('nav', {}, [formacao]), conteudo]);
+    }
+
+    return {
+        iniciarPgcInicio: iniciarPgcInicio,
+        iniciarPgc: iniciarPgc,
+        iniciarPncp: iniciarPncp,
+    };
+})();
@@ -0,0 +1,489 @@
+"""
+suite.py
+Suíte de benchmarks com massa sintética: fluxo PNCP (abas, rolagem,
+extração) e PGC (paginação) no portal simulado de benchmarks/replay,
+gravação Excel (abas PNCP, PGC e Geral) e pipeline de OCR.
+
+Uso:
+    python benchmarks/suite.py                                   # todos os cenários
+    python benchmarks/suite.py --cenarios pncp,pgc --json resultados/suite.json
+    PNCP_STREAMING_SCROLL=true python benchmarks/suite.py --cenarios pncp --virtual 30
+    python benchmarks/suite.py --comparar resultados/base.json --tolerancia 0.2
+
+Cada cenário roda num subprocesso (pico de RSS isolado) e reporta:
+- itens/s e tempo total (cards, linhas, linhas gravadas, páginas de OCR);
+- comandos WebDriver: total, por item e por comando (cenários com navegador);
+- p50/p95 por etapa (comando WebDriver, aba, rolagem, página, gravação, OCR);
+- pico de RSS do processo Python e, com psutil, do chromedriver + Chrome.
+
+As flags de otimização são lidas do ambiente como na aplicação e gravadas no
+JSON junto com o commit, para comparar execuções ao longo do tempo. Com
+--comparar, sai com código 1 se algum cenário perder mais que --tolerancia
+de itens/s em relação ao JSON de referência.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+CENARIOS = ("pncp", "pgc", "excel", "ocr")
+PREFIXOS_FLAGS = ("PNCP_", "PGC_", "EXCEL_", "NETWORK_", "VBA_", "SPINNER_", "NDJSON_", "COLETA_")
+
+
+# ---------------------------------------------------------------------
+# Medição
+# ---------------------------------------------------------------------
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil com interpolação linear (p em 0..100)."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    pos = (len(ordenados) - 1) * p / 100
+    base = int(pos)
+    if base + 1 >= len(ordenados):
+        return ordenados[-1]
+    return ordenados[base] + (ordenados[base + 1] - ordenados[base]) * (pos - base)
+
+
+class Etapas:
+    """Durações por etapa; resumo com n, total, p50 e p95."""
+
+    def __init__(self):
+        self.duracoes: Dict[str, List[float]] = {}
+
+    def registrar(self, nome: str, segundos: float) -> None:
+        self.duracoes.setdefault(nome, []).append(segundos)
+
+    @contextmanager
+    def medir(self, nome: str):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(nome, time.perf_counter() - inicio)
+
+    def cronometrar(self, obj: Any, metodo: str, nome: str) -> None:
+        """Envolve obj.metodo (na instância) para medir cada chamada como `nome`."""
+        original = getattr(obj, metodo)
+
+        def medido(*args, **kwargs):
+            with self.medir(nome):
+                return original(*args, **kwargs)
+
+        setattr(obj, metodo, medido)
+
+    def resumo(self) -> Dict[str, Dict[str, float]]:
+        return {
+            nome: {
+                "n": len(v),
+                "total_s": round(sum(v), 3),
+                "p50_ms": round(percentil(v, 50) * 1000, 2),
+                "p95_ms": round(percentil(v, 95) * 1000, 2),
+            }
+            for nome, v in sorted(self.duracoes.items())
+        }
+
+
+def contar_comandos(driver, etapas: Etapas) -> Counter:
+    """
+    Conta e cronometra todo comando WebDriver do driver. WebElement também
+    despacha pelo driver.execute do pai, então find/click/text entram aqui.
+    """
+    contagem: Counter = Counter()
+    original = driver.execute
+
+    def execute(comando, params=None):
+        contagem[comando] += 1
+        with etapas.medir(f"webdriver:{comando}"):
+            return original(comando, params)
+
+    driver.execute = execute
+    return contagem
+
+
+class MonitorRss:
+    """Amostra o RSS do chromedriver + descendentes (Chrome) e guarda o pico."""
+
+    def __init__(self, pid: Optional[int], intervalo: float = 0.2):
+        self.pid = pid
+        self.intervalo = intervalo
+        self.pico = 0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._rodar, name="monitor-rss", daemon=True)
+
+    def _amostrar(self) -> int:
+        raiz = psutil.Process(self.pid)
+        total = 0
+        for proc in [raiz] + raiz.children(recursive=True):
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+
+    def _rodar(self):
+        while not self._parar.is_set():
+            try:
+                self.pico = max(self.pico, self._amostrar())
+            except psutil.Error:
+                break
+            self._parar.wait(self.intervalo)
+
+    def __enter__(self) -> "MonitorRss":
+        if PSUTIL_AVAILABLE and self.pid:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._parar.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=2)
+
+    @property
+    def pico_mb(self) -> Optional[float]:
+        return round(self.pico / 1024 / 1024, 1) if self.pico else None
+
+
+def _pico_rss_mb() -> float:
+    # ru_maxrss em KB no Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+# ---------------------------------------------------------------------
+# Cenários (executados no subprocesso)
+# ---------------------------------------------------------------------
+def _navegador(opcoes: Dict[str, Any], fonte: str, preparar: Callable, coletar: Callable) -> Dict[str, Any]:
+    """Sobe o portal simulado, cria o driver headless e mede `coletar(scraper)`."""
+    from backend.app.rpa.driver_factory import create_driver
+    from backend.app.rpa.webdriver_trace import rastreador_do_driver
+    from benchmarks.replay import dados as dados_replay
+    from benchmarks.replay.run_replay import ServidorReplay, conferir
+
+    pncp_itens = [int(n) for n in opcoes["pncp_itens"].split(",")]
+    snapshot = dados_replay.gerar(opcoes["pgc_itens"], pncp_itens, ano_ref=opcoes["ano"])
+    esperado = dados_replay.esperado(snapshot)[fonte]
+    etapas = Etapas()
+
+    with ServidorReplay(snapshot, latencia_ms=opcoes["latencia_ms"], jitter_ms=opcoes["jitter_ms"],
+                        lote=opcoes["lote"], virtual=opcoes["virtual"]) as servidor:
+        driver = create_driver(headless=True)
+        try:
+            # Driver remoto não tem processo local: só o RSS do Python é medido
+            processo = getattr(getattr(driver, "service", None), "process", None)
+            with MonitorRss(getattr(processo, "pid", None)) as monitor:
+                scraper = preparar(driver, servidor.url, opcoes["ano"], etapas)
+                comandos = contar_comandos(driver, etapas)
+                inicio = time.perf_counter()
+                dados = coletar(scraper)
+                segundos = time.perf_counter() - inicio
+        finally:
+            driver.quit()
+
+    total = sum(comandos.values())
+    # Com WEBDRIVER_TRACE=true, o agregado por etapa/método do próprio scraper
+    rastreador = rastreador_do_driver(driver)
+    trace = {"webdriver_trace": rastreador.ultimo_resumo} if rastreador is not None else {}
+    return {
+        "itens": len(dados),
+        "esperados": len(esperado),
+        "segundos": round(segundos, 3),
+        "itens_por_s": round(len(dados) / max(segundos, 1e-9), 2),
+        "comandos_webdriver": total,
+        "comandos_por_item": round(total / max(len(dados), 1), 2),
+        "comandos": dict(comandos.most_common()),
+        "etapas": etapas.resumo(),
+        "pico_rss_navegador_mb": monitor.pico_mb,
+        "conferencia": conferir(fonte, dados, esperado),
+        **trace,
+    }
+
+
+def _cenario_pncp(opcoes: Dict[str, Any]) -> Dict[str, Any]:
+    def preparar(driver, url, ano, etapas):
+        from backend.app.rpa.pncp_scraper_vba_logic import PNCPScraperVBA
+
+        driver.get(f"{url}/pncp")
+        scraper = PNCPScraperVBA(driver, ano_ref=ano)
+        etapas.cronometrar(scraper, "_coletar_aba", "aba")
+        etapas.cronometrar(scraper, "_executar_rolagem_tabela", "rolagem")
+        etapas.cronometrar(scraper, "_extrair_itens_tabela", "extracao")
+        etapas.cronometrar(scraper, "_coletar_aba_streaming", "rolagem_extracao")
+        etapas.cronometrar(scraper, "_ler_cards", "leitura_cards")
+        return scraper
+
+    return _navegador(opcoes, "PNCP", preparar, lambda s: s.Dados_PNCP())
+
+
+def _cenario_pgc(opcoes: Dict[str, Any]) -> Dict[str, Any]:
+    def preparar(driver, url, ano, etapas):
+        from backend.app.rpa.pgc_scraper_vba_logic import PGCScraperVBA
+
+        driver.get(f"{url}/pgc")
+        scraper = PGCScraperVBA(driver, ano_ref=ano)
+        etapas.cronometrar(scraper, "A_Loga_Acessa_PGC", "acesso")
+        etapas.cronometrar(scraper, "_maximize_rows_per_page", "linhas_por_pagina")
+        etapas.cronometrar(scraper, "_collect_current_page_rows", "pagina_extracao")
+        etapas.cronometrar(scraper, "_go_next_page", "pagina_navegacao")
+        return scraper
+
+    def coletar(scraper):
+        if not scraper.A_Loga_Acessa_PGC():
+            return []
+        return scraper.A1_Demandas_DFD_PCA()
+
+    return _navegador(opcoes, "PGC", preparar, coletar)
+
+
+def _itens_pncp(n: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "col_a_contratacao": f"{i:05d}-00001-2025",
+            "col_b_descricao": f"DFD {i % 1000:03d}/2025 - Aquisição de material lote {i}",
+            "col_c_categoria": "Bens",
+            "col_d_valor": 1000.0 + i,
+            "col_e_inicio": "2025-02-01",
+            "col_f_fim": "2025-12-31",
+            "col_g_status": "APROVADA",
+            "col_h_status_tipo": "APROVADA",
+            "col_i_dfd": f"{i % 1000:03d}/2025",
+        }
+        for i in range(n)
+    ]
+
+
+def _itens_pgc(n: int, rodada: int) -> List[Dict[str, Any]]:
+    return [
+        {"pag": 1, "dfd": f"{i}/2025", "requisitante": "DIRAD", "descricao": f"Item {i} rodada {rodada}",
+         "valor": 100.0 + i + rodada, "situacao": "Em elaboração"}
+        for i in range(n)
+    ]
+
+
+def _cenario_excel(opcoes: Dict[str, Any]) -> Dict[str, Any]:
+    logging.disable(logging.CRITICAL)
+    from backend.app.services.excel_persistence import ExcelPersistence
+
+    n = opcoes["excel_linhas"]
+    etapas = Etapas()
+    pncp = _itens_pncp(n)
+    gravadas = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        persist = ExcelPersistence(os.path.join(tmp, "suite.xlsx"))
+        inicio = time.perf_counter()
+        for rodada in range(opcoes["excel_repeticoes"]):
+            with etapas.medir("update_pncp_sheet"):
+                persist.update_pncp_sheet(pncp)
+            with etapas.medir("update_pgc_sheet"):
+                persist.update_pgc_sheet(_itens_pgc(n, rodada))
+            with etapas.medir("sync_to_geral"):
+                persist.sync_to_geral()
+            gravadas += 2 * n
+        segundos = time.perf_counter() - inicio
+    return {
+        "itens": gravadas,
+        "segundos": round(segundos, 3),
+        "itens_por_s": round(gravadas / max(segundos, 1e-9), 2),
+        "etapas": etapas.resumo(),
+    }
+
+
+def _paginas_sinteticas(diretorio: str, quantidade: int) -> List[str]:
+    """Páginas A4 (150 dpi) com texto de DFD desenhado em preto sobre branco."""
+    from PIL import Image, ImageDraw
+
+    caminhos = []
+    for p in range(quantidade):
+        img = Image.new("RGB", (1240, 1754), "white")
+        desenho = ImageDraw.Draw(img)
+        for linha in range(40):
+            desenho.text((80, 80 + linha * 40),
+                         f"DFD {p + 1:03d}/2025 - Justificativa da contratação, linha {linha + 1}", fill="black")
+        caminho = os.path.join(diretorio, f"pagina_{p + 1:03d}.png")
+        img.save(caminho)
+        caminhos.append(caminho)
+    return caminhos
+
+
+def _cenario_ocr(opcoes: Dict[str, Any]) -> Dict[str, Any]:
+    logging.disable(logging.CRITICAL)
+    import pytesseract
+    from backend.app.rpa import dfd_ocr
+
+    etapas = Etapas()
+    with tempfile.TemporaryDirectory() as tmp:
+        paginas = _paginas_sinteticas(tmp, opcoes["ocr_paginas"])
+        inicio = time.perf_counter()
+        for caminho in paginas:
+            with etapas.medir("pre_processamento"):
+                img = dfd_ocr._preprocess_image(dfd_ocr._load_image(caminho), do_binarize=True)
+            inicio_ocr = time.perf_counter()
+            try:
+                dfd_ocr._tesseract_ocr_image(img)
+            except pytesseract.TesseractNotFoundError:
+                # Sem o binário só o pré-processamento é medido
+                return {"itens": 0, "segundos": round(time.perf_counter() - inicio, 3), "itens_por_s": None,
+                        "etapas": etapas.resumo(), "indisponivel": "tesseract não encontrado no PATH"}
+            etapas.registrar("tesseract", time.perf_counter() - inicio_ocr)
+        segundos = time.perf_counter() - inicio
+    return {
+        "itens": len(paginas),
+        "segundos": round(segundos, 3),
+        "itens_por_s": round(len(paginas) / max(segundos, 1e-9), 2),
+        "etapas": etapas.resumo(),
+    }
+
+
+EXECUTORES = {"pncp": _cenario_pncp, "pgc": _cenario_pgc, "excel": _cenario_excel, "ocr": _cenario_ocr}
+
+
+def _caso(nome: str, opcoes: Dict[str, Any]) -> Dict[str, Any]:
+    """Executado no subprocesso."""
+    logging.basicConfig(level=logging.CRITICAL)
+    r = {"cenario": nome}
+    r.update(EXECUTORES[nome](opcoes))
+    r["pico_rss_mb"] = _pico_rss_mb()
+    return r
+
+
+# ---------------------------------------------------------------------
+# Orquestração
+# ---------------------------------------------------------------------
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def _flags() -> Dict[str, str]:
+    return {k: v for k, v in sorted(os.environ.items()) if k.startswith(PREFIXOS_FLAGS)}
+
+
+def comparar(resultados: List[Dict[str, Any]], referencia: Dict[str, Any], tolerancia: float) -> List[str]:
+    """Cenários cujo itens/s caiu mais que `tolerancia` (fração) em relação à referência."""
+    base = {r["cenario"]: r for r in referencia.get("resultados", [])}
+    regressoes = []
+    for r in resultados:
+        antes = (base.get(r["cenario"]) or {}).get("itens_por_s")
+        agora = r.get("itens_por_s")
+        if not antes or agora is None:
+            continue
+        variacao = agora / antes - 1
+        print(f"{r['cenario']:<6} itens/s {antes:>10.2f} -> {agora:>10.2f} ({variacao:+.1%})")
+        if variacao < -tolerancia:
+            regressoes.append(r["cenario"])
+    return regressoes
+
+
+def _imprimir(r: Dict[str, Any]) -> None:
+    if "erro" in r:
+        print(f"{r['cenario']:<6} ERRO: {r['erro']}")
+        return
+    ips = f"{r['itens_por_s']:>9.2f} itens/s" if r.get("itens_por_s") is not None else f"{'-':>9} itens/s"
+    linha = f"{r['cenario']:<6} {r['itens']:>7} itens  {r['segundos']:>8.2f}s  {ips}  RSS {r['pico_rss_mb']:>7.1f} MB"
+    if "comandos_webdriver" in r:
+        linha += f"  {r['comandos_webdriver']} cmds ({r['comandos_por_item']}/item)"
+        if r.get("pico_rss_navegador_mb"):
+            linha += f"  Chrome {r['pico_rss_navegador_mb']} MB"
+    if r.get("conferencia") and not r["conferencia"]["ok"]:
+        linha += "  DIVERGENTE"
+    if r.get("indisponivel"):
+        linha += f"  ({r['indisponivel']})"
+    print(linha)
+    for nome, e in r.get("etapas", {}).items():
+        if not nome.startswith("webdriver:") or e["n"] >= 10:
+            print(f"         {nome:<34} n={e['n']:<6} p50 {e['p50_ms']:>9.2f} ms  p95 {e['p95_ms']:>9.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks (scrapers, Excel, OCR)")
+    parser.add_argument("--cenarios", default=",".join(CENARIOS))
+    parser.add_argument("--ano", default="2025")
+    parser.add_argument("--pncp-itens", default="20,200,20", help="Cards por aba: reprovadas,aprovadas,pendentes")
+    parser.add_argument("--pgc-itens", type=int, default=500)
+    parser.add_argument("--latencia-ms", type=int, default=50)
+    parser.add_argument("--jitter-ms", type=int, default=0)
+    parser.add_argument("--lote", type=int, default=20)
+    parser.add_argument("--virtual", type=int, default=0)
+    parser.add_argument("--excel-linhas", type=int, default=5000)
+    parser.add_argument("--excel-repeticoes", type=int, default=3)
+    parser.add_argument("--ocr-paginas", type=int, default=5)
+    parser.add_argument("--json", help="Grava os resultados neste arquivo.")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior (referência).")
+    parser.add_argument("--tolerancia", type=float, default=0.2)
+    parser.add_argument("--_caso", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._caso:
+        nome, opcoes = args._caso
+        print(json.dumps(_caso(nome, json.loads(opcoes)), ensure_ascii=False))
+        return 0
+
+    nomes = [c.strip() for c in args.cenarios.split(",") if c.strip()]
+    invalidos = [c for c in nomes if c not in CENARIOS]
+    if invalidos:
+        parser.error(f"cenários desconhecidos: {', '.join(invalidos)} (disponíveis: {', '.join(CENARIOS)})")
+    opcoes = {k: v for k, v in vars(args).items() if k not in ("_caso", "json", "comparar", "cenarios")}
+
+    resultados = []
+    for nome in nomes:
+        saida = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--_caso", nome, json.dumps(opcoes)],
+            cwd=RAIZ, capture_output=True, text=True,
+        )
+        try:
+            r = json.loads(saida.stdout.strip().splitlines()[-1])
+        except (IndexError, ValueError):
+            erro = (saida.stderr.strip().splitlines() or ["sem saída"])[-1]
+            r = {"cenario": nome, "erro": erro}
+        resultados.append(r)
+        _imprimir(r)
+
+    relatorio = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "parametros": opcoes,
+        "flags": _flags(),
+        "resultados": resultados,
+    }
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+
+    falhou = any("erro" in r or (r.get("conferencia") and not r["conferencia"]["ok"]) for r in resultados)
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            regressoes = comparar(resultados, json.load(f), args.tolerancia)
+        if regressoes:
+            print(f"Regressão acima de {args.tolerancia:.0%} em: {', '.join(regressoes)}")
+            falhou = True
+    return 1 if falhou else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Permite `pytest` na raiz do repositório sem instalar o pacote
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,100 @@
+"""Diff entre coletas (DiffColeta) e confirmação do snapshot só após o save do Excel."""
+from openpyxl import load_workbook
+
+from backend.app.db.diff_coletas import calcular_diff, chave_item, ler_snapshot
+from backend.app.services.excel_persistence import ExcelPersistence
+
+
+def _pncp(chave, valor=1.0):
+    return {"col_a_contratacao": chave, "col_d_valor": valor}
+
+
+def test_chave_item():
+    assert chave_item("PNCP", {"col_a_contratacao": " 123 "}) == "123"
+    assert chave_item("PGC", {"DFD": "001/2025"}) == "001/2025"
+    assert chave_item("PGC", {"dfd": "001/2025"}) == "001/2025"
+    assert chave_item("PGC", {"DFD": "  "}) is None
+    assert chave_item("PNCP", {}) is None
+
+
+def test_primeira_coleta_e_completa(tmp_path):
+    diff = calcular_diff("PNCP", "2025", [_pncp("A"), _pncp("B")], diretorio=str(tmp_path))
+    assert diff.completo and not diff.vazio
+    assert [i["col_a_contratacao"] for i in diff.inseridos] == ["A", "B"]
+    assert diff.removidos == []
+
+
+def test_delta_em_relacao_ao_snapshot(tmp_path):
+    d = str(tmp_path)
+    calcular_diff("PNCP", "2025", [_pncp("A"), _pncp("B"), _pncp("C")], diretorio=d).confirmar()
+
+    diff = calcular_diff("PNCP", "2025", [_pncp("A"), _pncp("B", 2.0), _pncp("D"), {"col_d_valor": 9}],
+                         diretorio=d)
+    assert not diff.completo
+    assert diff.resumo() == {"completo": False, "inseridos": 2, "atualizados": 1, "removidos": 1,
+                             "inalterados": 1, "sem_chave": 1}
+    assert diff.removidos == ["C"]
+    assert diff.chaves_alteradas() == ["D", "B"]
+
+
+def test_chave_repetida_usa_a_ultima_ocorrencia(tmp_path):
+    d = str(tmp_path)
+    calcular_diff("PNCP", "2025", [_pncp("A", 1.0)], diretorio=d).confirmar()
+    diff = calcular_diff("PNCP", "2025", [_pncp("A", 2.0), _pncp("A", 1.0)], diretorio=d)
+    assert diff.vazio and diff.inalterados == 1
+
+
+def test_snapshot_por_fonte_e_ano(tmp_path):
+    d = str(tmp_path)
+    calcular_diff("PNCP", "2025", [_pncp("A")], diretorio=d).confirmar()
+    assert calcular_diff("PNCP", "2024", [_pncp("A")], diretorio=d).completo
+    assert calcular_diff("PGC", "2025", [{"DFD": "A"}], diretorio=d).completo
+    assert calcular_diff("PNCP", "2025", [_pncp("A")], diretorio=d).vazio
+
+
+def test_snapshot_ilegivel_gera_diff_completo(tmp_path):
+    (tmp_path / "snapshot_PNCP_2025.json").write_text("{", encoding="utf-8")
+    assert calcular_diff("PNCP", "2025", [_pncp("A")], diretorio=str(tmp_path)).completo
+
+
+def test_confirmacao_so_apos_o_save_do_excel(tmp_path):
+    d = str(tmp_path / "snap")
+    dados = [{"DFD": "001/2025", "Requisitante": "DIRAD"}]
+    excel = ExcelPersistence(str(tmp_path / "PGC_2025.xlsx"))
+
+    diff = calcular_diff("PGC", "2025", dados, diretorio=d)
+    with ExcelPersistence.sessao():
+        assert excel.update_pgc_sheet(dados, diff=diff, ao_gravar=diff.confirmar) is None
+        assert ler_snapshot(d, "PGC", "2025") is None
+    assert ler_snapshot(d, "PGC", "2025") == {"001/2025": diff._atuais["001/2025"]}
+
+
+def test_falha_no_excel_mantem_o_snapshot(tmp_path):
+    d = str(tmp_path / "snap")
+    caminho = tmp_path / "PGC_2025.xlsx"
+    excel = ExcelPersistence(str(caminho))
+    caminho.write_text("corrompido", encoding="utf-8")
+
+    diff = calcular_diff("PGC", "2025", [{"DFD": "001/2025"}], diretorio=d)
+    assert excel.update_pgc_sheet([{"DFD": "001/2025"}], diff=diff, ao_gravar=diff.confirmar) is False
+    with ExcelPersistence.sessao():
+        excel.update_pgc_sheet([{"DFD": "001/2025"}], diff=diff, ao_gravar=diff.confirmar)
+    assert ler_snapshot(d, "PGC", "2025") is None
+
+
+def test_falha_em_uma_aba_mantem_o_snapshot(tmp_path):
+    d = str(tmp_path / "snap")
+    caminho = str(tmp_path / "PGC_2025.xlsx")
+    excel = ExcelPersistence(caminho)
+    wb = load_workbook(caminho)
+    # Sem a aba PGC o _aplicar_pgc falha; a aba PNCP da mesma sessão é gravada
+    del wb["PGC"]
+    wb.save(caminho)
+
+    diff = calcular_diff("PGC", "2025", [{"DFD": "001/2025"}], diretorio=d)
+    assert excel.update_pgc_sheet([{"DFD": "001/2025"}], diff=diff, ao_gravar=diff.confirmar) is False
+    with ExcelPersistence.sessao():
+        excel.update_pgc_sheet([{"DFD": "001/2025"}], diff=diff, ao_gravar=diff.confirmar)
+        excel.update_pncp_sheet([_pncp("A")])
+    assert load_workbook(caminho)["PNCP"]["A2"].value == "A"
+    assert ler_snapshot(d, "PGC", "2025") is None
@@ -0,0 +1,39 @@
+"""Aba PGC e Geral a partir das linhas como o scraper as produz."""
+from openpyxl import load_workbook
+
+from backend.app.services.excel_persistence import ExcelPersistence
+
+LINHAS_SCRAPER = [
+    {"DFD": "001/2025", "Requisitante": "DIRAD", "Descrição": "Papel A4", "Valor": "R$ 10,00",
+     "Situação": "Em elaboração"},
+    {"DFD": " 002/2025 ", "Requisitante": "DIGEP", "Descrição": "Toner", "Valor": "R$ 20,00",
+     "Situação": "Concluído"},
+    {"DFD": "", "Requisitante": "sem DFD"},
+]
+
+
+def test_aba_pgc_com_chaves_do_scraper(tmp_path):
+    caminho = str(tmp_path / "PGC_2025.xlsx")
+    excel = ExcelPersistence(caminho)
+    assert excel.update_pgc_sheet(LINHAS_SCRAPER) is True
+    assert excel.sync_to_geral() is True
+
+    wb = load_workbook(caminho)
+    pgc = [linha[:6] for linha in wb["PGC"].iter_rows(min_row=2, values_only=True)]
+    assert pgc == [
+        (1, "001/2025", "DIRAD", "Papel A4", "R$ 10,00", "Em elaboração"),
+        (1, "002/2025", "DIGEP", "Toner", "R$ 20,00", "Concluído"),
+    ]
+    geral = [(linha[6], linha[7]) for linha in wb["Geral"].iter_rows(values_only=True) if linha[6]]
+    assert geral == [("001/2025", "DIRAD"), ("002/2025", "DIGEP")]
+
+
+def test_aba_pgc_atualiza_pelo_dfd_e_aceita_chaves_minusculas(tmp_path):
+    caminho = str(tmp_path / "PGC_2025.xlsx")
+    excel = ExcelPersistence(caminho)
+    excel.update_pgc_sheet(LINHAS_SCRAPER)
+    excel.update_pgc_sheet([{"dfd": "001/2025", "requisitante": "DIRAD", "situacao": "Concluído", "pag": 3}])
+
+    linhas = list(load_workbook(caminho)["PGC"].iter_rows(min_row=2, values_only=True))
+    assert len(linhas) == 2
+    assert linhas[0][:3] == (3, "001/2025", "DIRAD") and linhas[0][5] == "Concluído"
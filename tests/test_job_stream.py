@@ -0,0 +1,156 @@
+"""Itens do job gravados durante a coleta e stream lido do registro (job em outro processo)."""
+import asyncio
+import contextvars
+import json
+import threading
+
+import pytest
+
+from backend.app.core import job_context
+from backend.app.db.jobs_repository import JobsRepository, STATUS_SUCCEEDED
+from backend.app.services import job_events, jobs
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    repo = JobsRepository(str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(jobs, "_repo", repo)
+    monkeypatch.setattr(job_context, "PROGRESS_MIN_INTERVAL_S", 0.05)
+    monkeypatch.setattr(job_events, "STREAM_POLL_S", 0.05)
+    return repo
+
+
+def _coleta(n, liberar, publicados):
+    """Scraper + service: publica cada item e registra a lista completa no fim."""
+    dados = []
+    for i in range(n):
+        dados.append({"id": i})
+        jobs.publicar_item("PNCP", dados[-1])
+        if i == n // 2:
+            publicados.set()
+            liberar.wait(5)
+    # Item que não passou por publicar_item
+    dados.append({"id": n})
+    jobs.registrar_resultados("PNCP", dados)
+    return dados
+
+
+def test_itens_gravados_durante_a_coleta_sem_duplicar(repo):
+    job_id = repo.criar("pncp", {})
+    liberar, publicados = threading.Event(), threading.Event()
+    t = threading.Thread(target=jobs.executar_job, args=(job_id, _coleta, 10, liberar, publicados))
+    t.start()
+    assert publicados.wait(5)
+    # Coleta parada no meio: parte dos itens já está no registro
+    assert 1 <= repo.total_resultados(job_id) <= 6
+    liberar.set()
+    t.join(5)
+    itens = [r["item"]["id"] for r in repo.listar_resultados(job_id, limit=100)]
+    assert itens == list(range(11))
+    assert repo.obter(job_id)["status"] == STATUS_SUCCEEDED
+
+
+def test_stream_do_registro_acompanha_job_de_outro_processo(repo):
+    job_id = repo.criar("pncp", {})
+    repo.reservar_proximo("outra-maquina-1")
+    liberar, publicados = threading.Event(), threading.Event()
+
+    async def consumir():
+        linhas = []
+        async for linha in job_events.stream_job(repo, job_id, "ndjson", ao_vivo=True):
+            evento = json.loads(linha)
+            linhas.append(evento)
+            if evento["evento"] == "item" and evento["item"]["id"] == 0:
+                # Item chegou pelo registro antes de a coleta terminar
+                assert repo.obter(job_id)["status"] != STATUS_SUCCEEDED
+                liberar.set()
+        return linhas
+
+    t = threading.Thread(target=jobs.executar_job, args=(job_id, _coleta, 10, liberar, publicados))
+    t.start()
+    eventos = asyncio.run(asyncio.wait_for(consumir(), 10))
+    t.join(5)
+    assert [e["item"]["id"] for e in eventos if e["evento"] == "item"] == list(range(11))
+    assert eventos[-1] == {"evento": "fim", "status": STATUS_SUCCEEDED, "erro": None}
+
+
+def _pncp(i):
+    return {"col_a_contratacao": f"C{i}", "id": i}
+
+
+def _coleta_paralela():
+    """Abas PNCP em janelas paralelas: itens publicados em threads próprios."""
+    def aba(itens):
+        for item in itens:
+            jobs.publicar_item("PNCP", item)
+
+    principal = [_pncp(i) for i in range(3)]
+    aprovadas = [_pncp(i) for i in range(3, 7)]
+    pendentes = [_pncp(i) for i in range(7, 11)]
+    aba(principal)
+    threads = [
+        threading.Thread(target=contextvars.copy_context().run, args=(aba, aprovadas)),
+        # Janela que publica parte da aba e falha: a aba é refeita na principal
+        threading.Thread(target=contextvars.copy_context().run, args=(aba, pendentes[:2])),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    aba(pendentes)
+    dados = principal + aprovadas + pendentes
+    jobs.registrar_resultados("PNCP", dados)
+    return dados
+
+
+def test_itens_de_threads_paralelos_sem_duplicar(repo):
+    job_id = repo.criar("pncp", {})
+    jobs.executar_job(job_id, _coleta_paralela)
+    itens = sorted(r["item"]["id"] for r in repo.listar_resultados(job_id, limit=100))
+    assert itens == list(range(11))
+
+
+def test_assinante_ao_vivo_que_passa_ao_registro_recebe_reinicio(repo, monkeypatch):
+    monkeypatch.setattr(job_events, "STREAM_KEEPALIVE_S", 0.1)
+    job_id = repo.criar("pncp", {})
+    publicados, continuar, liberar = threading.Event(), threading.Event(), threading.Event()
+    outro_processo = threading.Event()
+    monkeypatch.setattr(job_events, "_em_outro_processo", lambda job: outro_processo.is_set())
+
+    def coleta():
+        dados = [{"id": i} for i in range(5)]
+        for item in dados[:3]:
+            jobs.publicar_item("PNCP", item)
+        publicados.set()
+        continuar.wait(5)
+        for item in dados[3:]:
+            jobs.publicar_item("PNCP", item)
+        jobs.registrar_resultados("PNCP", dados)
+        liberar.wait(5)
+        return dados
+
+    async def consumir():
+        eventos = []
+        async for linha in job_events.stream_job(repo, job_id, "ndjson", ao_vivo=True):
+            if not linha.strip():
+                # Keepalive: assinatura feita, a coleta pode seguir
+                continuar.set()
+                continue
+            evento = json.loads(linha)
+            eventos.append(evento)
+            if evento["evento"] == "item" and evento["item"]["id"] == 4:
+                if outro_processo.is_set():
+                    liberar.set()
+                else:
+                    # A partir daqui o stream só acha o job no registro
+                    outro_processo.set()
+        return eventos
+
+    t = threading.Thread(target=jobs.executar_job, args=(job_id, coleta))
+    t.start()
+    assert publicados.wait(5)
+    eventos = asyncio.run(asyncio.wait_for(consumir(), 10))
+    t.join(5)
+    nomes = [e["evento"] if e["evento"] != "item" else e["item"]["id"] for e in eventos]
+    # Assinou no meio do job: 3 e 4 ao vivo, depois o registro inteiro
+    assert nomes == [3, 4, "reinicio", 0, 1, 2, 3, 4, "fim"]
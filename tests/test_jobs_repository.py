@@ -0,0 +1,102 @@
+"""Fila de jobs no SQLite (JobsRepository) e jobs órfãos na partida."""
+import os
+import socket
+import threading
+
+import pytest
+
+from backend.app.db.jobs_repository import (
+    JobsRepository,
+    STATUS_FAILED,
+    STATUS_QUEUED,
+    STATUS_RUNNING,
+    STATUS_SUCCEEDED,
+)
+from backend.app.services import jobs
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    repo = JobsRepository(str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(jobs, "_repo", repo)
+    return repo
+
+
+def test_reservar_proximo_em_ordem_de_criacao(repo):
+    ids = [repo.criar("pgc", {"ano_ref": 2024 + i}) for i in range(3)]
+    job = repo.reservar_proximo("w1")
+    assert job["id"] == ids[0]
+    assert job["status"] == STATUS_RUNNING and job["worker"] == "w1"
+    assert job["params"] == {"ano_ref": 2024}
+    assert repo.reservar_proximo("w2")["id"] == ids[1]
+    assert repo.obter(ids[2])["status"] == STATUS_QUEUED
+
+
+def test_reservar_proximo_filtra_tipos(repo):
+    repo.criar("pgc", {})
+    pncp = repo.criar("pncp", {})
+    assert repo.reservar_proximo("w1", ["pncp"])["id"] == pncp
+    assert repo.reservar_proximo("w1", ["pncp"]) is None
+
+
+def test_reservar_proximo_fila_vazia(repo):
+    assert repo.reservar_proximo("w1") is None
+
+
+def test_reservar_proximo_concorrente_nao_duplica(repo):
+    criados = {repo.criar("pgc", {}) for _ in range(20)}
+    reservados = []
+    lock = threading.Lock()
+
+    def consumir(nome):
+        while True:
+            job = repo.reservar_proximo(nome)
+            if job is None:
+                return
+            with lock:
+                reservados.append(job["id"])
+
+    threads = [threading.Thread(target=consumir, args=(f"w{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(reservados) == sorted(criados)
+
+
+def test_marcar_inicio_mantem_worker_da_reserva(repo):
+    job_id = repo.criar("pgc", {})
+    repo.reservar_proximo("w1")
+    repo.marcar_inicio(job_id, "outro")
+    assert repo.obter(job_id)["worker"] == "w1"
+
+
+def test_falhar_orfaos_locais(repo):
+    host = socket.gethostname()
+    morto = repo.criar("pgc", {})
+    repo.marcar_inicio(morto, f"{host}-{os.getpid()}")  # execução anterior com o mesmo PID
+    sem_worker = repo.criar("pgc", {})
+    repo.marcar_inicio(sem_worker)
+    vivo = repo.criar("pgc", {})
+    repo.marcar_inicio(vivo, f"{host}-{os.getppid()}")
+    remoto = repo.criar("pgc", {})
+    repo.marcar_inicio(remoto, "outra-maquina-123")
+    fixo = repo.criar("pgc", {})
+    repo.marcar_inicio(fixo, "worker-fixo")
+    concluido = repo.criar("pgc", {})
+    repo.marcar_inicio(concluido, f"{host}-{os.getpid()}")
+    repo.finalizar(concluido, STATUS_SUCCEEDED)
+
+    assert jobs.falhar_orfaos_locais() == 2
+    assert repo.obter(morto)["status"] == STATUS_FAILED
+    assert repo.obter(sem_worker)["status"] == STATUS_FAILED
+    for job_id in (vivo, remoto, fixo):
+        assert repo.obter(job_id)["status"] == STATUS_RUNNING
+    assert repo.obter(concluido)["status"] == STATUS_SUCCEEDED
+
+
+def test_executar_job_registra_processo(repo):
+    job_id = repo.criar("pgc", {})
+    vistos = []
+    assert jobs.executar_job(job_id, lambda: vistos.append(repo.obter(job_id)["worker"])) == STATUS_SUCCEEDED
+    assert vistos == [jobs.nome_processo()]
@@ -0,0 +1,84 @@
+"""Gravação bruta NDJSON e manifesto (ndjson_store)."""
+import hashlib
+import json
+import os
+
+import pytest
+
+from backend.app.db import ndjson_store
+from backend.app.db.ndjson_store import gravacao_bruta, ler_ultimo
+
+
+def _ler_json(caminho):
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _conferir(manifesto, caminho):
+    with open(caminho, "rb") as f:
+        conteudo = f.read()
+    assert manifesto["bytes"] == len(conteudo)
+    assert manifesto["total_itens"] == conteudo.count(b"\n")
+    assert manifesto["sha256"] == hashlib.sha256(conteudo).hexdigest()
+
+
+def test_manifesto_da_coleta(tmp_path, monkeypatch):
+    monkeypatch.setenv("NDJSON_FSYNC_ITENS", "2")
+    d = str(tmp_path)
+    with gravacao_bruta("PGC", "2025", diretorio=d) as g:
+        ndjson_store.anexar_item("PGC", {"DFD": "001/2025", "Descrição": "ção"})
+        ndjson_store.anexar_item("PNCP", {"ignorado": True})
+        ndjson_store.anexar_item("PGC", {"DFD": "002/2025"})
+        # fsync a cada 2 itens: o manifesto em disco já acompanha a coleta
+        parcial = _ler_json(g.caminho_manifesto)
+        assert parcial["status"] == ndjson_store.STATUS_EM_ANDAMENTO and parcial["total_itens"] == 2
+
+    manifesto = _ler_json(g.caminho_manifesto)
+    assert manifesto["status"] == ndjson_store.STATUS_COLETADA
+    assert manifesto["fonte"] == "PGC" and manifesto["ano_ref"] == "2025"
+    assert manifesto["arquivo"] == os.path.basename(g.caminho)
+    assert manifesto["finalizado_em"] is not None
+    _conferir(manifesto, g.caminho)
+    assert ler_ultimo(d, "PGC") == manifesto
+    with open(g.caminho, encoding="utf-8") as f:
+        assert [json.loads(linha)["DFD"] for linha in f] == ["001/2025", "002/2025"]
+
+
+def test_coleta_interrompida_preserva_itens(tmp_path):
+    d = str(tmp_path)
+    with pytest.raises(RuntimeError):
+        with gravacao_bruta("PNCP", "2025", diretorio=d) as g:
+            ndjson_store.anexar_item("PNCP", {"col_a_contratacao": "1"})
+            raise RuntimeError("queda")
+    manifesto = ler_ultimo(d, "PNCP")
+    assert manifesto["status"] == ndjson_store.STATUS_INTERROMPIDA
+    _conferir(manifesto, g.caminho)
+    # Fora do bloco nada mais é anexado
+    ndjson_store.anexar_item("PNCP", {"col_a_contratacao": "2"})
+    _conferir(_ler_json(g.caminho_manifesto), g.caminho)
+
+
+def test_coleta_sem_itens_nao_deixa_arquivos(tmp_path):
+    with gravacao_bruta("PGC", "2025", diretorio=str(tmp_path)):
+        pass
+    assert os.listdir(tmp_path) == []
+
+
+def test_reescrever_com_a_lista_final(tmp_path):
+    d = str(tmp_path)
+    with gravacao_bruta("PGC", "2025", diretorio=d) as g:
+        ndjson_store.anexar_item("PGC", {"DFD": "001/2025"})
+    g.reescrever([{"DFD": "001/2025"}, {"DFD": "003/2025"}])
+    manifesto = g.finalizar(ndjson_store.STATUS_CONCLUIDA)
+    assert manifesto["total_itens"] == 2 and manifesto["status"] == ndjson_store.STATUS_CONCLUIDA
+    _conferir(manifesto, g.caminho)
+    assert ler_ultimo(d, "PGC")["status"] == ndjson_store.STATUS_CONCLUIDA
+
+
+def test_gravacoes_no_mesmo_segundo_nao_colidem(tmp_path):
+    d = str(tmp_path)
+    with gravacao_bruta("PGC", diretorio=d) as a, gravacao_bruta("PGC", diretorio=d) as b:
+        ndjson_store.anexar_item("PGC", {"DFD": "1"})
+    assert a.caminho != b.caminho
+    # Só a gravação mais interna (a corrente) recebe o item
+    assert b.total == 1 and a.total == 0
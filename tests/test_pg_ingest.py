@@ -0,0 +1,59 @@
+"""Linhas do staging e formato texto do COPY (pg_ingest), sem Postgres."""
+import datetime
+
+from backend.app.db import pg_ingest
+
+
+class _CursorFalso:
+    def __init__(self):
+        self.copias = []
+
+    def copy_expert(self, sql, buf):
+        self.copias.append((sql, buf.read()))
+
+
+def test_copy_texto_escapa_e_marca_nulos():
+    assert pg_ingest._copy_texto([1, None, "a\tb\nc\\d\re", 2.5]) == "1\t\\N\ta\\tb\\nc\\\\d\\re\t2.5\n"
+    assert pg_ingest._copy_texto(["", "ção"]) == "\tção\n"
+
+
+def test_linha_pgc_chaves_do_scraper_e_minusculas():
+    scraper = {"DFD": " 001/2025 ", "Requisitante": "DIRAD", "Descrição": "Papel",
+               "Valor": "R$ 1.234,56", "Situação": "Concluído"}
+    assert pg_ingest._linha_pgc(7, 1, scraper) == [7, 1, "001/2025", "DIRAD", "Papel", 1234.56, "Concluído"]
+    minusculas = {"dfd": "002/2025", "valor": 10}
+    assert pg_ingest._linha_pgc(7, 2, minusculas) == [7, 2, "002/2025", None, None, 10.0, None]
+
+
+def test_linha_pgc_valor_invalido_ou_fora_do_limite_vira_nulo():
+    assert pg_ingest._linha_pgc(1, 1, {"DFD": "x", "Valor": "n/d"})[5] is None
+    assert pg_ingest._linha_pgc(1, 1, {"DFD": "x", "Valor": 10 ** 13})[5] is None
+    assert pg_ingest._linha_pgc(1, 1, {"DFD": "x", "Valor": float("nan")})[5] is None
+
+
+def test_linha_pncp():
+    item = {
+        "col_a_contratacao": "12345-00001-2025", "col_b_descricao": "Serviço", "col_c_categoria": "TI",
+        "col_d_valor": 99.999, "col_e_inicio": datetime.date(2025, 1, 2), "col_f_fim": "2025-12-31T00:00:00",
+        "col_g_status": "APROVADA", "col_h_status_tipo": "APROVADA", "col_i_dfd": "001/2025",
+    }
+    assert pg_ingest._linha_pncp(3, 9, item) == [
+        3, 9, "12345-00001-2025", "Serviço", "TI", 100.0,
+        "2025-01-02", "2025-12-31", "APROVADA", "APROVADA", "001/2025",
+    ]
+    assert pg_ingest._linha_pncp(3, 10, {"col_e_inicio": "31/12/2025"})[6:8] == [None, None]
+
+
+def test_copiar_em_paginas():
+    cur = _CursorFalso()
+    linhas = ([i, f"item {i}"] for i in range(5))
+    assert pg_ingest.copiar(cur, "stg_x", ["seq", "txt"], linhas, pagina=2) == 5
+    assert [sql for sql, _ in cur.copias] == ["COPY stg_x (seq, txt) FROM STDIN"] * 3
+    assert [dados.count("\n") for _, dados in cur.copias] == [2, 2, 1]
+    assert cur.copias[-1][1] == "4\titem 4\n"
+
+
+def test_copiar_sem_linhas():
+    cur = _CursorFalso()
+    assert pg_ingest.copiar(cur, "stg_x", ["seq"], [], pagina=10) == 0
+    assert cur.copias == []
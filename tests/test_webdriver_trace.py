@@ -0,0 +1,35 @@
+"""Percentis e resumo do rastreador de comandos WebDriver."""
+import pytest
+
+from backend.app.rpa.webdriver_trace import RastreadorWebDriver, _percentil, etapa_webdriver
+
+
+def test_percentil_valor_unico():
+    assert _percentil([5.0], 50) == 5.0
+    assert _percentil([5.0], 95) == 5.0
+
+
+def test_percentil_interpola_e_ordena():
+    assert _percentil([4, 1, 3, 2], 50) == 2.5
+    assert _percentil(list(range(100, 0, -1)), 95) == pytest.approx(95.05)
+    assert _percentil([1, 2], 100) == 2
+    assert _percentil([1, 2], 0) == 1
+
+
+def test_resumo_agrega_por_comando_etapa_e_metodo():
+    r = RastreadorWebDriver()
+    with etapa_webdriver("aba:aprovadas"):
+        r.registrar("findElement", 0.010, "PGC._ler")
+        r.registrar("findElement", 0.030, "PGC._ler")
+    r.registrar("clickElement", 0.005, "PGC._clicar")
+
+    resumo = r.resumo()
+    assert resumo["total_comandos"] == 3
+    assert list(resumo["comandos"]) == ["findElement", "clickElement"]
+    assert resumo["comandos"]["findElement"]["p50_ms"] == 20.0
+    assert resumo["etapas"]["aba:aprovadas"]["comandos"] == {"findElement": 2}
+    assert resumo["etapas"]["sem_etapa"]["n"] == 1
+    assert resumo["metodos"]["PGC._ler"]["n"] == 2
+
+    r.reiniciar()
+    assert r.resumo()["total_comandos"] == 0
@@ -0,0 +1,120 @@
+"""
+Escrita em streaming da aba PNCP (services/xlsx_stream) comparada com o
+caminho openpyxl (_aplicar_pncp) sobre o mesmo arquivo.
+"""
+import datetime
+import shutil
+import zipfile
+
+import pytest
+from openpyxl import load_workbook
+from openpyxl.formatting.rule import CellIsRule
+from openpyxl.styles import PatternFill
+from openpyxl.worksheet.datavalidation import DataValidation
+
+from backend.app.services import excel_persistence, xlsx_stream
+from backend.app.services.excel_persistence import ExcelPersistence
+
+DADOS = [
+    {
+        "col_a_contratacao": f"C{i:03d}",
+        "col_b_descricao": f"Item <{i}> & cia",
+        "col_c_categoria": "Serviços",
+        "col_d_valor": 1234.5 * i,
+        "col_e_inicio": datetime.date(2025, 1, 1 + i % 28),
+        "col_f_fim": datetime.date(2025, 12, 31) if i % 3 else None,
+        "col_g_status": "APROVADA",
+        "col_h_status_tipo": "APROVADA",
+        "col_i_dfd": f"{i:03d}/2025",
+    }
+    for i in range(1, 30)
+]
+
+
+@pytest.fixture
+def planilha(tmp_path):
+    """PGC_{ano}.xlsx com dados antigos na aba PNCP e acréscimos feitos à mão."""
+    caminho = str(tmp_path / "PGC_2025.xlsx")
+    ExcelPersistence(caminho)
+    wb = load_workbook(caminho)
+    ws = wb["PNCP"]
+    for r in range(2, 60):
+        ws.cell(row=r, column=1, value=f"antigo {r}")
+    ws.freeze_panes = "B2"
+    ws.auto_filter.ref = "A1:K60"
+    ws.conditional_formatting.add(
+        "D2:D500", CellIsRule(operator="greaterThan", formula=["10000"], fill=PatternFill(bgColor="FFC7CE"))
+    )
+    dv = DataValidation(type="list", formula1='"APROVADA,REPROVADA"')
+    dv.add("G2:G500")
+    ws.add_data_validation(dv)
+    wb["Geral"]["A1"] = "intocada"
+    wb.save(caminho)
+    return caminho
+
+
+def _celulas(caminho, aba="PNCP"):
+    ws = load_workbook(caminho)[aba]
+    return [[(c.value, c.number_format) for c in linha] for linha in ws.iter_rows()]
+
+
+def _larguras(caminho):
+    ws = load_workbook(caminho)["PNCP"]
+    return {letra: dim.width for letra, dim in ws.column_dimensions.items()}
+
+
+def test_cell_xml():
+    assert xlsx_stream._cell_xml("A1", None, 0) == ""
+    assert xlsx_stream._cell_xml("A1", None, 3) == '<c r="A1" s="3"/>'
+    assert xlsx_stream._cell_xml("A1", True, 0) == '<c r="A1" t="b"><v>1</v></c>'
+    assert xlsx_stream._cell_xml("A1", 2.5, 0) == '<c r="A1"><v>2.5</v></c>'
+    assert xlsx_stream._cell_xml("A1", datetime.date(2025, 1, 1), 7) == '<c r="A1" s="7"><v>45658.0</v></c>'
+    assert xlsx_stream._cell_xml("A1", datetime.datetime(2025, 1, 1, 12), 7) == '<c r="A1" s="7"><v>45658.5</v></c>'
+    # NaN não é número válido no XML: vai como texto
+    assert 't="inlineStr"' in xlsx_stream._cell_xml("A1", float("nan"), 0)
+    assert xlsx_stream._cell_xml("A1", "a<b>&\x01", 0).endswith(
+        '<is><t xml:space="preserve">a&lt;b&gt;&amp;</t></is></c>'
+    )
+
+
+def test_streaming_igual_ao_openpyxl(planilha, tmp_path):
+    referencia = str(tmp_path / "referencia.xlsx")
+    shutil.copy(planilha, referencia)
+    wb = load_workbook(referencia)
+    excel_persistence._aplicar_pncp(wb, DADOS, {})
+    wb.save(referencia)
+
+    assert excel_persistence._gravar_pncp_streaming(planilha, DADOS)
+
+    assert _celulas(planilha) == _celulas(referencia)
+    assert _larguras(planilha) == _larguras(referencia)
+    inicio = load_workbook(planilha)["PNCP"]["E2"]
+    assert isinstance(inicio.value, datetime.datetime) and inicio.is_date
+
+
+def test_preserva_o_restante_da_aba(planilha):
+    assert excel_persistence._gravar_pncp_streaming(planilha, DADOS)
+    wb = load_workbook(planilha)
+    ws = wb["PNCP"]
+    assert ws.max_row == len(DADOS) + 1
+    assert ws.freeze_panes == "B2"
+    assert ws.auto_filter.ref == "A1:K60"
+    assert [str(cf.sqref) for cf in ws.conditional_formatting] == ["D2:D500"]
+    assert [str(dv.sqref) for dv in ws.data_validations.dataValidation] == ["G2:G500"]
+    assert wb["Geral"]["A1"].value == "intocada"
+
+
+def test_regravar_reaproveita_estilos(planilha):
+    excel_persistence._gravar_pncp_streaming(planilha, DADOS)
+    primeiro = _celulas(planilha)
+    with zipfile.ZipFile(planilha) as zf:
+        estilos = zf.read("xl/styles.xml")
+    excel_persistence._gravar_pncp_streaming(planilha, DADOS)
+    with zipfile.ZipFile(planilha) as zf:
+        assert zf.read("xl/styles.xml") == estilos
+    assert _celulas(planilha) == primeiro
+
+
+def test_aba_inexistente(planilha):
+    with pytest.raises(xlsx_stream.XlsxStreamError):
+        xlsx_stream.replace_sheet(planilha, "Outra", ["A"], [])